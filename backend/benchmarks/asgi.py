@@ -0,0 +1,33 @@
+"""In-process requests for the benchmarks: a hand-built ASGI scope, no transport"""
+from typing import List, Tuple
+
+Headers = List[Tuple[bytes, bytes]]
+
+
+async def call(app, method: str, path: str, headers: Headers, body: bytes = b"", query: bytes = b"") -> Tuple[int, bytes]:
+    """Drive one request through an ASGI app; returns the status and the response body"""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": query,
+        "root_path": "", "headers": headers, "client": ("127.0.0.1", 1), "server": ("127.0.0.1", 80),
+    }
+    sent = False
+    status = 0
+    chunks = []
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status, b"".join(chunks)
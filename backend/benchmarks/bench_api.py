@@ -0,0 +1,218 @@
+"""
+Load and regression benchmark for the API, run in process over ASGI.
+
+Drives the real ``main.app`` (lifespan included) without any network:
+login, ``/api/auth/me``, employee listing and every agent endpoint. Each
+route gets ``--requests`` requests from ``--concurrency`` concurrent
+clients; the report shows throughput and p50/p95/p99 latency per route.
+
+Simulated agent latency is off by default, so the numbers measure
+framework and handler cost; ``--latency simulated`` keeps the delays.
+Admission control is off too (every request comes from one user, who
+would be rate limited); ``--admission`` keeps it to measure its overhead
+or to watch load shedding under ``--concurrency``. So is coalescing, since
+every client of a route sends the same message; ``--coalescing`` keeps it.
+
+Regression workflow:
+    python -m benchmarks.bench_api --save            # record benchmarks/baseline.json
+    python -m benchmarks.bench_api --compare         # exit 1 if a route regressed
+
+A route regresses when its ``--metric`` (default p95) exceeds the baseline
+by more than ``--threshold`` (default 25%) and by at least ``--min-delta``
+milliseconds, which keeps sub-millisecond jitter from failing the run.
+
+Run from the backend directory:
+    python -m benchmarks.bench_api --concurrency 32 --routes 'sales-*'
+"""
+import argparse
+import asyncio
+import fnmatch
+import json
+import platform
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from benchmarks.asgi import Headers, call
+from core import admission, coalescing, intents, latency
+from core.agents import agents
+from core.tokens import issue_token
+from main import app, lifespan
+from models import MOCK_USERS
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    method: str
+    path: str
+    query: bytes = b""
+    body: bytes = b""
+    authenticated: bool = True
+
+
+@dataclass
+class Result:
+    name: str
+    requests: int
+    errors: int
+    elapsed: float
+    latencies: List[float]
+
+    @property
+    def throughput(self) -> float:
+        return self.requests / self.elapsed if self.elapsed else 0.0
+
+    def percentile(self, q: float) -> float:
+        """Nearest-rank percentile in milliseconds"""
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))
+        return ordered[index] * 1e3
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "rps": round(self.throughput, 1),
+            "p50": round(self.percentile(50), 3),
+            "p95": round(self.percentile(95), 3),
+            "p99": round(self.percentile(99), 3),
+        }
+
+
+def scenarios() -> List[Scenario]:
+    """Every benchmarked route, named like the latency/agent ids"""
+    admin = next(user for user in MOCK_USERS if user.role == "admin")
+    login = json.dumps({"email": admin.email, "password": "demo123"}).encode()
+    result = [
+        Scenario("auth-login", "POST", "/api/auth/login", body=login, authenticated=False),
+        Scenario("auth-me", "GET", "/api/auth/me"),
+        Scenario("employees-list", "GET", "/api/employees/", query=b"limit=50"),
+    ]
+    for agent in agents.all():
+        rules = intents.registry.rules(agent.id)
+        message = rules[0][1][0] if rules else "hello"
+        result.append(Scenario(agent.id, "POST", agent.path, body=json.dumps({"message": message}).encode()))
+    return result
+
+
+async def run_scenario(scenario: Scenario, headers: Headers, requests: int, concurrency: int) -> Result:
+    latencies: List[float] = []
+    errors = 0
+    remaining = requests
+
+    async def client():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            status, _ = await call(app, scenario.method, scenario.path, headers, scenario.body, scenario.query)
+            latencies.append(time.perf_counter() - start)
+            if not 200 <= status < 300:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return Result(scenario.name, requests, errors, time.perf_counter() - start, latencies)
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            metric: str, threshold: float, min_delta: float) -> List[str]:
+    """Names of routes whose metric regressed past the threshold"""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        limit = previous[metric] * (1 + threshold)
+        if current[metric] > limit and current[metric] - previous[metric] >= min_delta:
+            regressions.append(name)
+    return regressions
+
+
+async def main_async(args) -> int:
+    latency.scheduler.set_mode(args.latency)
+    admission.controller.enabled = args.admission
+    coalescing.coalescer.enabled = args.coalescing
+    async with lifespan(app):
+        admin = next(user for user in MOCK_USERS if user.role == "admin")
+        token_headers = [(b"authorization", f"Bearer {issue_token(admin)}".encode())]
+        json_headers = [(b"content-type", b"application/json")]
+
+        selected = [s for s in scenarios() if any(fnmatch.fnmatch(s.name, pattern) for pattern in args.routes)]
+        if not selected:
+            print("No routes match", " ".join(args.routes))
+            return 2
+
+        baseline: Optional[dict] = None
+        if args.compare:
+            with open(args.baseline) as f:
+                baseline = json.load(f)["routes"]
+
+        print(f"{len(selected)} routes, {args.requests} requests each, concurrency {args.concurrency}, latency {args.latency}\n")
+        print(f"{'route':<28}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}" + ("   vs baseline" if baseline else ""))
+        results: Dict[str, Dict[str, float]] = {}
+        for scenario in selected:
+            headers = (token_headers if scenario.authenticated else []) + json_headers
+            await run_scenario(scenario, headers, args.warmup, min(args.concurrency, max(args.warmup, 1)))
+            result = await run_scenario(scenario, headers, args.requests, args.concurrency)
+            summary = results[scenario.name] = result.summary()
+            line = (f"{scenario.name:<28}{summary['rps']:>10,.0f}{summary['p50']:>10.2f}"
+                    f"{summary['p95']:>10.2f}{summary['p99']:>10.2f}{summary['errors']:>8}")
+            if baseline and scenario.name in baseline:
+                previous = baseline[scenario.name][args.metric]
+                line += f"   {args.metric} {(summary[args.metric] / previous - 1) * 100 if previous else 0.0:+.0f}%"
+            print(line)
+
+    status = 0
+    if any(summary["errors"] for summary in results.values()):
+        print("\nSome requests failed (non-2xx responses)")
+        status = 1
+
+    if args.save:
+        record = {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "settings": {"requests": args.requests, "concurrency": args.concurrency, "latency": args.latency,
+                         "admission": args.admission, "coalescing": args.coalescing},
+            "routes": results,
+        }
+        Path(args.baseline).write_text(json.dumps(record, indent=2) + "\n")
+        print(f"\nBaseline saved to {args.baseline}")
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.metric, args.threshold, args.min_delta)
+        if regressions:
+            print(f"\n{args.metric} regressed more than {args.threshold:.0%} on: {', '.join(regressions)}")
+            status = 1
+        else:
+            print(f"\nNo {args.metric} regressions beyond {args.threshold:.0%}")
+    return status
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500, help="measured requests per route")
+    parser.add_argument("--warmup", type=int, default=50, help="unmeasured requests per route")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", choices=("off", "simulated"), default="off")
+    parser.add_argument("--admission", action="store_true", help="keep admission control (rate limits, concurrency caps) on")
+    parser.add_argument("--coalescing", action="store_true", help="keep coalescing of identical concurrent queries on")
+    parser.add_argument("--routes", nargs="+", default=["*"], help="route name patterns, e.g. 'sales-*' auth-me")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+    parser.add_argument("--save", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--compare", action="store_true", help="fail when a route regressed against the baseline")
+    parser.add_argument("--metric", choices=("p50", "p95", "p99"), default="p95")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative slowdown")
+    parser.add_argument("--min-delta", type=float, default=0.1, help="ignore slowdowns below this many ms")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main_async(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark: UserDirectory lookups and loads as the headcount grows.
+
+Lookups should stay flat from 14 users to 100k+; load time is linear.
+Pass --write to also dump a synthetic CSV usable with ITT_USERS_FILE.
+
+Run from the backend directory:
+    python -m benchmarks.bench_directory
+    python -m benchmarks.bench_directory --sizes 250000 --write /tmp/users.csv
+"""
+import argparse
+import csv
+import os
+import random
+import tempfile
+import time
+import timeit
+import typing
+
+from core.directory import UserDirectory
+from models import User
+
+ROLES = typing.get_args(User.model_fields["role"].annotation)
+DEPARTMENTS = ["Human Resources", "Finance", "Engineering", "Marketing", "Client Delivery", "Executive", "IT & Security"]
+
+
+def synthetic_rows(count):
+    rng = random.Random(count)
+    for i in range(1, count + 1):
+        yield {
+            "id": str(i),
+            "name": f"Employee {i}",
+            "email": f"employee.{i}@intimetec.com",
+            "role": rng.choice(ROLES),
+            "department": rng.choice(DEPARTMENTS),
+            "avatar": "/avatars/dev.png",
+        }
+
+
+def write_csv(path, count):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["id", "name", "email", "role", "department", "avatar"])
+        writer.writeheader()
+        writer.writerows(synthetic_rows(count))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[14, 10_000, 100_000])
+    parser.add_argument("--write", help="also write a synthetic CSV of the largest size here")
+    args = parser.parse_args()
+
+    print(f"{'users':>9}{'csv load s':>12}{'by id ns':>11}{'by email ns':>13}{'by dept ns':>12}")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "users.csv")
+            write_csv(path, size)
+            directory = UserDirectory()
+            start = time.perf_counter()
+            directory.load_file(path)
+            load_seconds = time.perf_counter() - start
+
+        rng = random.Random(1)
+        ids = [str(rng.randint(1, size)) for _ in range(1000)]
+        emails = [f"Employee.{i}@InTimeTec.com" for i in ids]
+
+        def lookup_ids():
+            for user_id in ids:
+                directory.get(user_id)
+
+        def lookup_emails():
+            for email in emails:
+                directory.get_by_email(email)
+
+        def lookup_departments():
+            for department in DEPARTMENTS:
+                directory.by_department(department)
+
+        per_id = min(timeit.repeat(lookup_ids, number=20, repeat=5)) / (20 * len(ids)) * 1e9
+        per_email = min(timeit.repeat(lookup_emails, number=20, repeat=5)) / (20 * len(emails)) * 1e9
+        per_dept = min(timeit.repeat(lookup_departments, number=2000, repeat=5)) / (2000 * len(DEPARTMENTS)) * 1e9
+        print(f"{size:>9}{load_seconds:>12.3f}{per_id:>11.0f}{per_email:>13.0f}{per_dept:>12.0f}")
+
+    if args.write:
+        write_csv(args.write, max(args.sizes))
+        print(f"\nwrote {max(args.sizes)} users to {args.write}")
+
+
+if __name__ == "__main__":
+    main()
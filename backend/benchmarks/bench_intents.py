@@ -0,0 +1,98 @@
+"""
+Micro-benchmark: compiled intent automaton vs. the legacy substring chains.
+
+The legacy chains are regenerated from the registered rules as the exact
+``if "a" in msg or "b" in msg: ... elif ...`` code the routers used to
+contained, so both sides resolve the same intents.
+
+Run from the backend directory:
+    python -m benchmarks.bench_intents
+"""
+import argparse
+import random
+import string
+import timeit
+
+from core.catalog import DEFAULT_DEPARTMENTS, catalog
+from core.intents import IntentRegistry, registry
+
+FILLER = ["quarterly", "update", "for", "the", "team", "please", "share", "numbers", "thanks", "regarding", "our", "plan"]
+
+
+def build_legacy_chain(rules):
+    """Generate the if/elif substring chain equivalent to a rule list"""
+    lines = ["def chain(message):", "    msg = message.lower()"]
+    for rank, (intent, keywords) in enumerate(rules):
+        cond = " or ".join(f"{keyword!r} in msg" for keyword in keywords)
+        lines.append(f"    {'if' if rank == 0 else 'elif'} {cond}:")
+        lines.append(f"        return {intent!r}")
+    lines.append("    return None")
+    namespace = {}
+    exec("\n".join(lines), namespace)
+    return namespace["chain"]
+
+
+def make_message(length, tail=""):
+    """Build a filler message of roughly `length` characters ending in `tail`"""
+    rng = random.Random(length)
+    words = []
+    size = 0
+    while size < length:
+        word = rng.choice(FILLER)
+        words.append(word)
+        size += len(word) + 1
+    return " ".join(words) + (" " + tail if tail else "")
+
+
+def bench(func, message, number):
+    return min(timeit.repeat(lambda: func(message), number=number, repeat=5)) / number * 1e6
+
+
+def bench_agents(lengths, number):
+    print(f"{'agent':<26}{'length':>8}{'chain us':>12}{'automaton us':>14}")
+    for department in DEFAULT_DEPARTMENTS:
+        catalog.router(department)  # registers the department's intent rules
+    registry.compile()
+    for agent in registry.agents():
+        rules = registry.rules(agent)
+        chain = build_legacy_chain(rules)
+        # Worst case for the chain: only the last rule's last keyword matches
+        tail = rules[-1][1][-1]
+        for length in lengths:
+            message = make_message(length, tail)
+            assert chain(message) == registry.resolve(agent, message)
+            legacy = bench(chain, message, number)
+            compiled = bench(lambda m: registry.resolve(agent, m), message, number)
+            print(f"{agent:<26}{len(message):>8}{legacy:>12.2f}{compiled:>14.2f}")
+
+
+def bench_scaling(keyword_counts, length, number):
+    print(f"\n{'keywords':<10}{'length':>8}{'chain us':>12}{'automaton us':>14}")
+    rng = random.Random(7)
+    message = make_message(length)
+    for count in keyword_counts:
+        keywords = {"".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 9))) for _ in range(count)}
+        keywords = sorted(keyword for keyword in keywords if keyword not in message)
+        rules = [(f"intent{i}", tuple(keywords[i::10])) for i in range(10)]
+        local = IntentRegistry()
+        local.register("synthetic", rules)
+        local.compile()
+        chain = build_legacy_chain(rules)
+        legacy = bench(chain, message, number)
+        compiled = bench(lambda m: local.resolve("synthetic", m), message, number)
+        print(f"{len(keywords):<10}{len(message):>8}{legacy:>12.2f}{compiled:>14.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lengths", type=int, nargs="+", default=[64, 1024, 16384])
+    parser.add_argument("--keywords", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+
+    bench_agents(args.lengths, args.number)
+    bench_scaling(args.keywords, max(args.lengths), max(1, args.number // 10))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Benchmark: the Lead Generator's lead store on synthetic leads.
+
+Streams ``--leads`` generated CSV rows through the same import path as
+``POST /api/marketing/leads/import`` into a temporary store, then reports:
+
+- import throughput (parse, segment write and incremental scoring)
+- the time to reopen (memory-map and score) the store, as after a restart
+- a full re-score after a weight change, which is one vectorized pass
+- the tier summary, served from the maintained aggregates, and a top-k query
+
+Run from the backend directory:
+    python -m benchmarks.bench_leads --leads 1000000
+"""
+import argparse
+import asyncio
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from core.leads import INDUSTRY_WEIGHTS, LeadStore
+
+INDUSTRIES = [*INDUSTRY_WEIGHTS, "logistics", "media", "energy", "hospitality", ""]
+HEADER = "id,name,company,industry,employees,opens,clicks,visits,demo,decisionMaker,lastContact\n"
+
+
+def lead_rows(count: int, rng: random.Random):
+    today = date.today()
+    for number in range(count):
+        contact = today - timedelta(days=rng.randint(0, 180)) if rng.random() < 0.9 else ""
+        yield (f"LD-{number},Contact {number},Company {number % 50000},{rng.choice(INDUSTRIES)},"
+               f"{int(rng.paretovariate(1.2) * 10)},{rng.randint(0, 15)},{rng.randint(0, 8)},{rng.randint(0, 20)},"
+               f"{int(rng.random() < 0.1)},{int(rng.random() < 0.3)},{contact}\n")
+
+
+def csv_chunks(count: int, chunk_rows: int, rng: random.Random):
+    """The upload, generated up front so the import timing excludes it"""
+    chunks, lines = [HEADER.encode()], []
+    for line in lead_rows(count, rng):
+        lines.append(line)
+        if len(lines) == chunk_rows:
+            chunks.append("".join(lines).encode())
+            lines = []
+    if lines:
+        chunks.append("".join(lines).encode())
+    return chunks
+
+
+async def stream(chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+def timed(repeat: int, call) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+async def run(args, root: Path) -> None:
+    rng = random.Random(7)
+    chunks = csv_chunks(args.leads, args.chunk, rng)
+    store = LeadStore(root, batch=args.batch)
+    start = time.perf_counter()
+    result = await store.import_stream(stream(chunks), "csv")
+    imported = time.perf_counter() - start
+    print(f"import              {imported:8.2f} s   {result['imported']} leads ({result['imported'] / imported:,.0f}/s "
+          f"from {sum(map(len, chunks)) / 1e6:.0f} MB of CSV), {result['rejected']} rejected, "
+          f"{len(store._leads.segments)} segments")
+    size = sum(path.stat().st_size for path in root.rglob("*") if path.is_file())
+    print(f"store on disk       {size / 1e6:8.1f} MB")
+
+    reopened = LeadStore(root, batch=args.batch)
+    start = time.perf_counter()
+    await reopened.ensure()
+    print(f"reopen + score      {time.perf_counter() - start:8.2f} s")
+
+    rescores = []
+    for decision_maker in (25.0, 10.0, 25.0):
+        rescores.append(await reopened.configure({"decisionMaker": decision_maker}, {}))
+    summary = reopened.summary()
+    print(f"re-score (weights)  {statistics.median(rescores):8.2f} s   hot {summary['hotLeads']}, "
+          f"warm {summary['warmLeads']}, cold {summary['coldLeads']}")
+    print(f"summary             {timed(1000, reopened.summary) * 1e6:8.1f} us")
+    print(f"by industry         {timed(1000, reopened.by_industry) * 1e6:8.1f} us")
+    print(f"top 20 hot          {timed(50, lambda: reopened.top(20, 'hot')) * 1e3:8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--leads", type=int, default=1000000)
+    parser.add_argument("--batch", type=int, default=50000, help="rows per store segment")
+    parser.add_argument("--chunk", type=int, default=2000, help="rows per streamed body chunk")
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="bench-leads-"))
+    try:
+        asyncio.run(run(args, workdir / "leads"))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Benchmark: the finance ledger on synthetic transactions.
+
+Streams ``--transactions`` generated CSV rows (``--months`` of actuals
+across departments and accounts, plus a monthly budget) through the same
+import path as ``POST /api/finance/ledger/import`` into a temporary ledger,
+then reports:
+
+- import throughput (parse, per-month part writes and rollup folds)
+- the time to reopen the ledger, which reads only the rollups
+- P&L, cash-flow, variance and rollup query latency from the rollups,
+  next to the same P&L computed by scanning every transaction's columns
+
+Run from the backend directory:
+    python -m benchmarks.bench_ledger --transactions 1000000
+"""
+import argparse
+import asyncio
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+
+from core.ledger import COGS, COLUMNS, EXPENSE, REVENUE, TYPES, Ledger, period_window
+
+DEPARTMENTS = ["Sales", "Marketing", "Engineering", "Finance", "HR", "Operations", "Support", "Legal", "IT", "Research",
+               "Facilities", "Procurement"]
+ACCOUNTS = ["Product Revenue", "Services Revenue", "Subscription Revenue", "Cost of Sales", "Hosting (COGS)",
+            "Salaries", "Benefits", "Travel", "Software", "Rent", "Utilities", "Marketing Programs", "Consulting",
+            "Training", "Depreciation", "Office Supplies", "Equipment", "Capital Projects", "Loan Proceeds",
+            "Dividends"]
+HEADER = "date,department,account,amount,scenario,cash\n"
+
+
+def csv_chunks(count: int, months: int, chunk_rows: int, rng: random.Random):
+    """The upload, generated up front so the import timing excludes it"""
+    start = date.today().year * 12 - months
+    lines, chunks = [], [HEADER.encode()]
+    for number in range(count):
+        month = start + rng.randrange(months)
+        account = rng.choice(ACCOUNTS)
+        amount = rng.lognormvariate(7, 1.5) * (-1 if rng.random() < 0.02 else 1)
+        lines.append(f"{month // 12}-{month % 12 + 1:02d}-{rng.randint(1, 28):02d},{rng.choice(DEPARTMENTS)},{account},"
+                     f"{amount:.2f},actual,{'false' if account == 'Depreciation' else 'true'}\n")
+        if len(lines) == chunk_rows:
+            chunks.append("".join(lines).encode())
+            lines = []
+    for month in range(start, start + months):
+        for department in DEPARTMENTS:
+            for account in ACCOUNTS[3:16]:
+                lines.append(f"{month // 12}-{month % 12 + 1:02d}-01,{department},{account},{rng.uniform(5e4, 5e5):.2f},budget,\n")
+    chunks.append("".join(lines).encode())
+    return chunks
+
+
+async def stream(chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+def timed(repeat: int, call) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def scanned_pnl(root: Path, ledger: Ledger, period: str):
+    """P&L the slow way: every transaction's columns, read and summed"""
+    first, last = period_window(period)
+    types = np.array([TYPES.index(kind) for kind in ledger.account_types], dtype=np.int64)
+    totals = np.zeros(len(TYPES), dtype=np.int64)
+    for part in root.glob("period-*/part-*"):
+        columns = {name: np.load(part / f"{name}.npy") for name in COLUMNS}
+        month = columns["day"].astype("datetime64[D]").astype("datetime64[M]").astype(np.int64) + 1970 * 12
+        mask = (month >= first) & (month <= last) & (columns["scenario"] == 0)
+        np.add.at(totals, types[columns["account"][mask]], columns["cents"][mask])
+    return totals[REVENUE] - totals[COGS] - totals[EXPENSE]
+
+
+async def run(args, root: Path) -> None:
+    chunks = csv_chunks(args.transactions, args.months, args.chunk, random.Random(7))
+    ledger = Ledger(root, batch=args.batch)
+    start = time.perf_counter()
+    result = await ledger.import_stream(stream(chunks), "csv")
+    imported = time.perf_counter() - start
+    print(f"import              {imported:8.2f} s   {result['imported']} transactions ({result['imported'] / imported:,.0f}/s "
+          f"from {sum(map(len, chunks)) / 1e6:.0f} MB of CSV), {result['rejected']} rejected")
+    size = sum(path.stat().st_size for path in root.rglob("*") if path.is_file())
+    snapshot = ledger.snapshot()
+    print(f"ledger on disk      {size / 1e6:8.1f} MB   {snapshot['parts']} parts, {snapshot['rollupGroups']} rollup rows")
+
+    reopened = Ledger(root, batch=args.batch)
+    start = time.perf_counter()
+    await reopened.ensure()
+    print(f"reopen (rollups)    {(time.perf_counter() - start) * 1e3:8.2f} ms")
+
+    quarter, year = reopened.latest(), reopened.latest(quarter=False)
+    print(f"\nqueries ({quarter} / {year}), median of repeated runs:")
+    print(f"P&L quarter         {timed(200, lambda: reopened.pnl(quarter)) * 1e3:8.3f} ms")
+    print(f"P&L year, one dept  {timed(200, lambda: reopened.pnl(year, 'Sales')) * 1e3:8.3f} ms")
+    print(f"cash flow           {timed(200, lambda: reopened.cash_flow(quarter)) * 1e3:8.3f} ms")
+    print(f"budget variance     {timed(200, lambda: reopened.variance(year)) * 1e3:8.3f} ms")
+    print(f"rollup by quarter   {timed(200, lambda: reopened.rollup('quarter')) * 1e3:8.3f} ms")
+    print(f"rollup by account   {timed(200, lambda: reopened.rollup('account', year)) * 1e3:8.3f} ms")
+    start = time.perf_counter()
+    scanned = scanned_pnl(root, reopened, quarter)
+    print(f"P&L by full scan    {(time.perf_counter() - start) * 1e3:8.3f} ms")
+    net = round(reopened.pnl(quarter)["netIncome"] * 100)
+    print(f"\nrollup and scan agree: {net == scanned} (net income {net / 100:,.2f})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transactions", type=int, default=1000000)
+    parser.add_argument("--months", type=int, default=36)
+    parser.add_argument("--batch", type=int, default=100000, help="rows parsed and appended per batch")
+    parser.add_argument("--chunk", type=int, default=2000, help="rows per streamed body chunk")
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="bench-ledger-"))
+    try:
+        asyncio.run(run(args, workdir / "ledger"))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
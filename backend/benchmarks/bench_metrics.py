@@ -0,0 +1,88 @@
+"""
+Benchmark: per-request overhead of the metrics middleware.
+
+Drives requests in-process through the ASGI interface, with and without
+``MetricsMiddleware`` wrapped around
+
+- a bare ASGI app that answers immediately (isolates the middleware), and
+- the full application with simulated latency off (a real agent request),
+
+interleaving short rounds and keeping the best of each. Also times one
+``/api/metrics`` rendering with every route populated.
+
+Run from the backend directory:
+    python -m benchmarks.bench_metrics
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.asgi import call
+from core import admission, intents, latency
+from core.agents import agents
+from core.metrics import MetricsMiddleware, MetricsRegistry
+from core.security import permissions
+from core.tokens import issue_token
+from main import app
+from models import MOCK_USERS
+
+
+async def bare_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def per_request_us(target, path, headers, body, requests):
+    start = time.perf_counter()
+    for _ in range(requests):
+        await call(target, "POST", path, headers, body)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+async def compare(label, plain, wrapped, path, headers, body, requests, rounds):
+    baseline = measured = float("inf")
+    for _ in range(rounds):
+        baseline = min(baseline, await per_request_us(plain, path, headers, body, requests // rounds))
+        measured = min(measured, await per_request_us(wrapped, path, headers, body, requests // rounds))
+    print(f"{label:<26}{baseline:>12.2f}{measured:>14.2f}{measured - baseline:>12.2f}")
+
+
+async def main_async(requests, rounds):
+    latency.scheduler.set_mode("off")
+    admission.controller.enabled = False  # one benchmark user would hit the per-user rate limit
+    intents.compile_all()
+    permissions.build(app.routes)
+    agents.build(app.routes)
+
+    admin = next(user for user in MOCK_USERS if user.role == "admin")
+    headers = [(b"authorization", f"Bearer {issue_token(admin)}".encode()), (b"content-type", b"application/json")]
+    body = b'{"message": "Build a deck for a fintech client"}'
+    # The application as served, minus the middleware stack main.py adds
+    plain = app.router
+
+    print(f"{'target':<26}{'without us':>12}{'with us':>14}{'added us':>12}")
+    await compare("bare ASGI app", bare_app, MetricsMiddleware(bare_app, MetricsRegistry()),
+                  "/api/sales/deck", headers, body, requests * 10, rounds)
+    await compare("POST /api/sales/deck", plain, MetricsMiddleware(plain, MetricsRegistry()),
+                  "/api/sales/deck", headers, body, requests, rounds)
+
+    registry = MetricsRegistry()
+    wrapped = MetricsMiddleware(plain, registry)
+    for agent in agents.all():
+        await call(wrapped, "POST", agent.path, headers, body)
+    start = time.perf_counter()
+    text = registry.render()
+    elapsed = (time.perf_counter() - start) * 1e3
+    print(f"\nrender {len(registry.routes())} routes ({len(text.splitlines())} lines): {elapsed:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main_async(args.requests, args.rounds))
+
+
+if __name__ == "__main__":
+    main()
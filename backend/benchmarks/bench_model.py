@@ -0,0 +1,118 @@
+"""
+Benchmark: pooled vs unpooled HTTP calls to the model service.
+
+Starts the stand-in model server (``model_server.py``) in process on a
+loopback port with a fixed completion delay, then sends ``--requests``
+completions from ``--concurrency`` concurrent callers three ways:
+
+- ``unpooled``  a new ``httpx.AsyncClient`` (and TCP connection) per call
+- ``pooled``    ``core.model.HttpBackend``: one shared client with keep-alive
+- ``stream``    the same backend streaming every completion token by token
+
+and reports throughput, latency percentiles and how many TCP connections
+the server saw. ``--error-rate`` makes the stand-in answer a share of calls
+with 503 to show the retry cost.
+
+Run from the backend directory:
+    python -m benchmarks.bench_model --concurrency 32 --delay 0.02
+"""
+import argparse
+import asyncio
+import socket
+import time
+from typing import Awaitable, Callable, List
+
+import httpx
+import uvicorn
+
+from core import latency
+from core.model import COMPLETE_PATH, HttpBackend
+from model_server import create_app
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def run(call: Callable[[int], Awaitable[None]], requests: int, concurrency: int):
+    latencies: List[float] = []
+    errors = 0
+    remaining = requests
+
+    async def caller():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            try:
+                await call(remaining)
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(caller() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return requests / elapsed, latencies[len(latencies) // 2] * 1e3, latencies[int(len(latencies) * 0.99)] * 1e3, errors
+
+
+async def main_async(args) -> None:
+    scheduler = latency.LatencyScheduler()
+    scheduler.configure("*", latency.fixed(args.delay))
+    stand_in = create_app(scheduler, tokens=args.tokens, error_rate=args.error_rate, seed=1)
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(stand_in, host="127.0.0.1", port=port, log_level="warning", lifespan="off"))
+    serving = asyncio.ensure_future(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    url = f"http://127.0.0.1:{port}"
+    payload = {"agent": "sales-deck", "prompt": "fintech deck for a bank", "stream": False}
+
+    async def unpooled(_):
+        async with httpx.AsyncClient(base_url=url) as client:
+            response = await client.post(COMPLETE_PATH, json=payload)
+            response.raise_for_status()
+
+    backend = HttpBackend(url, max_connections=args.concurrency, keepalive=args.concurrency)
+    await backend.start()
+
+    async def pooled(_):
+        await backend.complete("sales-deck", payload["prompt"])
+
+    async def streamed(_):
+        async for _token in backend.stream("sales-deck", payload["prompt"]):
+            pass
+
+    print(f"{args.requests} completions, concurrency {args.concurrency}, server delay {args.delay * 1e3:.0f} ms, "
+          f"error rate {args.error_rate:.0%}\n")
+    print(f"{'mode':<12}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}{'connections':>13}")
+    async with httpx.AsyncClient(base_url=url) as probe:
+        for name, call in (("unpooled", unpooled), ("pooled", pooled), ("stream", streamed)):
+            before = (await probe.get("/stats")).json()["connections"]
+            rps, p50, p99, errors = await run(call, args.requests, args.concurrency)
+            opened = (await probe.get("/stats")).json()["connections"] - before
+            print(f"{name:<12}{rps:>10,.0f}{p50:>10.2f}{p99:>10.2f}{errors:>8}{opened:>13}")
+
+    stats = backend.stats()
+    print(f"\nbackend retries {stats['retries']}, failures {stats['failures']}")
+    await backend.close()
+    server.should_exit = True
+    await serving
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--delay", type=float, default=0.01, help="stand-in seconds per completion")
+    parser.add_argument("--tokens", type=int, default=64, help="tokens per completion")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of calls the stand-in answers with 503")
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
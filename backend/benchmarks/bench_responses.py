@@ -0,0 +1,141 @@
+"""
+Benchmark: per-request CPU of every agent endpoint under each response path.
+
+- model:          reply built fresh, then validated and serialized again by
+                  the route's ``response_model`` (the original behaviour)
+- fast:           reply built fresh, serialized once with orjson
+                  (``ITT_FAST_RESPONSES=1``, template cache disabled)
+- template:       served from the reply template cache (the default)
+- template+fast:  template cache plus the fast encoder
+
+Requests go through the full application (routing, auth, body parsing) in
+process over ASGI with simulated latency off, and CPU is measured with
+``time.process_time``.
+
+``--check`` replaces the runtime response validation the fast path skips:
+for every agent and every intent it asserts that the fast path returns a
+body that validates as ``AgentResponse`` and matches the model path.
+
+Run from the backend directory:
+    python -m benchmarks.bench_responses
+    python -m benchmarks.bench_responses --check
+"""
+import argparse
+import asyncio
+import re
+import sys
+import time
+
+from benchmarks.asgi import call
+from core import admission, intents, latency, responses
+from core.agents import agents
+from core.responses import ResponseCache
+from core.security import permissions
+from core.tokens import issue_token
+from main import app
+from models import AgentResponse, MOCK_USERS
+
+MODES = {
+    "model": (False, 0),
+    "fast": (True, 0),
+    "template": (False, 256),
+    "template+fast": (True, 256),
+}
+
+
+def set_mode(mode):
+    fast, cache_size = MODES[mode]
+    responses.FAST_RESPONSES = fast
+    responses.cache = ResponseCache(maxsize=cache_size)
+
+
+def request_body(message):
+    return responses.dumps({"message": message})
+
+
+def messages_for(agent_id):
+    """One message per registered intent of the agent, plus one matching none"""
+    messages = [keywords[0] for _, keywords in intents.registry.rules(agent_id)]
+    return messages + ["hello"]
+
+
+async def cpu_us(path, headers, body, requests):
+    start = time.process_time()
+    for _ in range(requests):
+        await call(app, "POST", path, headers, body)
+    return (time.process_time() - start) / requests * 1e6
+
+
+def normalized(body):
+    """Reply without the fields that legitimately differ between two calls"""
+    reply = AgentResponse.model_validate_json(body).model_dump(mode="json", exclude={"timestamp"})
+    return re.sub(r"\d", "0", responses.dumps(reply).decode())
+
+
+async def check(headers):
+    failures = 0
+    for agent in agents.all():
+        for message in messages_for(agent.id):
+            body = request_body(message)
+            set_mode("model")
+            status, expected = await call(app, "POST", agent.path, headers, body)
+            assert status == 200, (agent.id, status)
+            for mode in ("fast", "template+fast"):
+                set_mode(mode)
+                for _ in range(2):  # template miss, then hit
+                    status, actual = await call(app, "POST", agent.path, headers, body)
+                    try:
+                        assert status == 200, f"status {status}"
+                        assert normalized(actual) == normalized(expected), "differs from the model path"
+                    except Exception as exc:
+                        failures += 1
+                        print(f"FAIL {agent.id} [{mode}] {message!r}: {exc}")
+    return failures
+
+
+async def main_async(requests, rounds, run_check):
+    latency.scheduler.set_mode("off")
+    admission.controller.enabled = False  # one benchmark user would hit the per-user rate limit
+    intents.compile_all()
+    permissions.build(app.routes)
+    agents.build(app.routes)
+
+    admin = next(user for user in MOCK_USERS if user.role == "admin")
+    headers = [(b"authorization", f"Bearer {issue_token(admin)}".encode()), (b"content-type", b"application/json")]
+
+    if run_check:
+        failures = await check(headers)
+        print(f"{len(agents.all())} agents checked, {failures} failures")
+        return 1 if failures else 0
+
+    print(f"{'agent':<32}" + "".join(f"{mode:>15}" for mode in MODES) + "   (CPU us/request)")
+    totals = dict.fromkeys(MODES, 0.0)
+    for agent in agents.all():
+        body = request_body(messages_for(agent.id)[0])
+        best = dict.fromkeys(MODES, float("inf"))
+        # Interleave short rounds and keep the best of each mode
+        for _ in range(rounds):
+            for mode in MODES:
+                set_mode(mode)
+                await call(app, "POST", agent.path, headers, body)
+                best[mode] = min(best[mode], await cpu_us(agent.path, headers, body, requests // rounds))
+        for mode in MODES:
+            totals[mode] += best[mode]
+        print(f"{agent.id:<32}" + "".join(f"{best[mode]:>15.1f}" for mode in MODES))
+
+    count = len(agents.all())
+    print(f"{'mean':<32}" + "".join(f"{totals[mode] / count:>15.1f}" for mode in MODES))
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="requests per endpoint and mode")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--check", action="store_true", help="validate fast-path output instead of timing it")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main_async(args.requests, args.rounds, args.check)))
+
+
+if __name__ == "__main__":
+    main()
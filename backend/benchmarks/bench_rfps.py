@@ -0,0 +1,113 @@
+"""
+Benchmark: RFP matching on a synthetic corpus.
+
+Writes ``--rfps`` synthetic RFPs (titles and descriptions drawn from IT
+and non-IT vocabularies) to a temporary NDJSON file, then reports:
+
+- the time to embed the whole corpus and the matrix size on disk
+- an incremental sync after appending ``--appended`` new RFPs, next to
+  the time a full re-embed would take
+- query latency percentiles for ranking every RFP against a query (one
+  matrix-vector product over the memory-mapped matrix)
+
+Run from the backend directory:
+    python -m benchmarks.bench_rfps --rfps 20000
+"""
+import argparse
+import asyncio
+import json
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from core.rfps import RfpIndex
+
+TOPICS = [
+    "cloud migration aws azure gcp landing zone cost optimization",
+    "machine learning predictive analytics fraud detection model monitoring",
+    "computer vision imagery detection document ai ocr",
+    "generative ai nlp chatbot retrieval assistant",
+    "custom software development agile devops api integration kubernetes",
+    "data warehouse analytics dashboards business intelligence pipelines",
+    "mainframe cobol modernization java microservices",
+    "bridge construction concrete steel traffic control",
+    "janitorial facility maintenance floor care",
+    "medical supplies warehousing distribution",
+]
+AGENCIES = ["State of Ohio", "City of Austin", "Department of Energy", "NYC Education", "Florida DOT", "GSA", "Texas HHS"]
+
+
+def make_rfp(number: int, rng: random.Random):
+    topic = rng.choice(TOPICS).split()
+    words = rng.choices(topic, k=30) + rng.choices(" ".join(TOPICS).split(), k=10)
+    low = rng.randint(1, 30) * 1_000_000
+    return {
+        "id": f"RFP-{number}",
+        "title": " ".join(rng.sample(topic, 4)).title(),
+        "agency": rng.choice(AGENCIES),
+        "valueMin": low,
+        "valueMax": low + rng.randint(1, 10) * 1_000_000,
+        "due": f"2027-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        "description": " ".join(words),
+    }
+
+
+def percentile(values, share: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * share))]
+
+
+async def main_async(args) -> None:
+    rng = random.Random(3)
+    workdir = Path(tempfile.mkdtemp(prefix="bench-rfps-"))
+    source = workdir / "rfps.ndjson"
+    try:
+        with open(source, "w") as f:
+            f.writelines(json.dumps(make_rfp(number, rng)) + "\n" for number in range(args.rfps))
+        index = RfpIndex(source, workdir / "index", dimensions=args.dimensions, refresh=0)
+        index.set_profile(" ".join(TOPICS[:7]))
+        start = time.perf_counter()
+        stats = await index.sync()
+        full = time.perf_counter() - start
+        size = (workdir / "index" / "vectors.f32").stat().st_size
+        print(f"full embed       {full:8.2f} s   {stats['rfps']} RFPs x {args.dimensions} dimensions, {size / 1e6:.1f} MB on disk")
+
+        with open(source, "a") as f:
+            f.writelines(json.dumps(make_rfp(args.rfps + number, rng)) + "\n" for number in range(args.appended))
+        start = time.perf_counter()
+        stats = await index.sync()
+        print(f"append sync      {time.perf_counter() - start:8.2f} s   {stats['embedded']} RFPs embedded, {stats['rfps']} in total")
+
+        reopened = RfpIndex(source, workdir / "index", dimensions=args.dimensions, refresh=0)
+        start = time.perf_counter()
+        stats = await reopened.sync()
+        print(f"reopen           {time.perf_counter() - start:8.2f} s   {stats['embedded']} RFPs embedded")
+
+        queries = [" ".join(rng.sample(rng.choice(TOPICS).split(), 3)) for _ in range(args.queries)]
+        for query in queries[:50]:
+            await index.match(query)
+        latencies = []
+        for query in queries:
+            start = time.perf_counter()
+            await index.match(query)
+            latencies.append(time.perf_counter() - start)
+        print(f"\n{args.queries} queries, top {index.top_k}: p50 {statistics.median(latencies) * 1e3:.2f} ms, "
+              f"p99 {percentile(latencies, 0.99) * 1e3:.2f} ms")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rfps", type=int, default=20000)
+    parser.add_argument("--appended", type=int, default=200, help="RFPs appended before the incremental sync")
+    parser.add_argument("--dimensions", type=int, default=2048)
+    parser.add_argument("--queries", type=int, default=500)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
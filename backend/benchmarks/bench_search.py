@@ -0,0 +1,117 @@
+"""
+Benchmark: the Knowledge Base index on a synthetic corpus.
+
+Writes ``--documents`` markdown files (a few sections each, words drawn from
+a Zipf-distributed vocabulary, like real prose) to a temporary directory,
+then reports:
+
+- the full build time and the index size on disk
+- the time to open (memory-map) the index
+- an incremental reindex after rewriting ``--changed`` of the files, and a
+  rescan with nothing changed
+- BM25 query latency percentiles for 1-4 term queries
+
+Run from the backend directory:
+    python -m benchmarks.bench_search --documents 20000
+"""
+import argparse
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from itertools import accumulate
+from pathlib import Path
+
+from core.search import IndexReader, build
+
+PATTERN = "**/*.md"
+
+
+def vocabulary(size: int, rng: random.Random):
+    syllables = ["ka", "lo", "mi", "ne", "ru", "sa", "ti", "vo", "ze", "pa", "qu", "de", "fi", "go", "ha", "jo"]
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(syllables) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def write_document(path: Path, words, weights, rng: random.Random, sections: int, section_words: int) -> None:
+    lines = []
+    for number in range(sections):
+        lines.append(f"## {' '.join(rng.choices(words, cum_weights=weights, k=3))} {number}")
+        lines.append("")
+        body = rng.choices(words, cum_weights=weights, k=section_words)
+        for start in range(0, len(body), 40):
+            lines.append(" ".join(body[start:start + 40]))
+            lines.append("")
+    path.write_text("\n".join(lines))
+
+
+def percentile(values, share: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * share))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=20000)
+    parser.add_argument("--sections", type=int, default=3, help="headed sections per document")
+    parser.add_argument("--words", type=int, default=100, help="words per section")
+    parser.add_argument("--vocabulary", type=int, default=30000)
+    parser.add_argument("--changed", type=float, default=0.01, help="share of files rewritten before the incremental reindex")
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--top-k", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    words = vocabulary(args.vocabulary, rng)
+    weights = list(accumulate(1.0 / rank for rank in range(1, len(words) + 1)))
+    workdir = Path(tempfile.mkdtemp(prefix="bench-search-"))
+    corpus, root = workdir / "corpus", workdir / "index"
+    try:
+        start = time.perf_counter()
+        for number in range(args.documents):
+            folder = corpus / f"d{number % 100:02d}"
+            folder.mkdir(parents=True, exist_ok=True)
+            write_document(folder / f"doc{number}.md", words, weights, rng, args.sections, args.words)
+        print(f"{args.documents} documents written in {time.perf_counter() - start:.1f} s")
+
+        start = time.perf_counter()
+        generation, stats = build(corpus, PATTERN, root)
+        built = time.perf_counter() - start
+        start = time.perf_counter()
+        reader = IndexReader(generation)
+        opened = time.perf_counter() - start
+        print(f"full build          {built:8.2f} s   {reader.passages} passages, {len(reader.terms)} terms, "
+              f"{reader.size / 1e6:.1f} MB on disk")
+        print(f"open (mmap)         {opened * 1e3:8.2f} ms")
+
+        changed = rng.sample(sorted(corpus.glob(PATTERN)), max(1, int(args.documents * args.changed)))
+        for path in changed:
+            write_document(path, words, weights, rng, args.sections, args.words)
+        start = time.perf_counter()
+        generation, stats = build(corpus, PATTERN, root, reader)
+        print(f"incremental build   {time.perf_counter() - start:8.2f} s   {stats['reindexed']} files reindexed, "
+              f"{stats['reused']} reused")
+        reader = IndexReader(generation)
+        start = time.perf_counter()
+        _, stats = build(corpus, PATTERN, root, reader)
+        print(f"rescan, no changes  {time.perf_counter() - start:8.2f} s")
+
+        queries = [" ".join(rng.choices(words[:5000], k=rng.randint(1, 4))) for _ in range(args.queries)]
+        for query in queries[:100]:
+            reader.search(query, args.top_k)
+        latencies = []
+        for query in queries:
+            start = time.perf_counter()
+            reader.search(query, args.top_k)
+            latencies.append(time.perf_counter() - start)
+        print(f"\n{args.queries} queries, top {args.top_k}: p50 {statistics.median(latencies) * 1e3:.2f} ms, "
+              f"p99 {percentile(latencies, 0.99) * 1e3:.2f} ms, max {max(latencies) * 1e3:.2f} ms")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Benchmark: token verification throughput with the cache cold and warm.
+
+- cold:  every verification does the full split/HMAC/JSON/expiry check
+- warm:  a working set of hot tokens served from the LRU/TTL cache
+
+Run from the backend directory:
+    python -m benchmarks.bench_tokens
+"""
+import argparse
+import secrets
+import time
+
+from core.tokens import TokenService
+from models import MOCK_USERS
+
+
+def throughput(func, tokens, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for token in tokens:
+            func(token)
+    elapsed = time.perf_counter() - start
+    calls = rounds * len(tokens)
+    return calls / elapsed, elapsed / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=1000, help="distinct tokens in the working set")
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    service = TokenService(secret=secrets.token_bytes(32), cache_size=args.tokens * 2)
+    tokens = [service.issue(MOCK_USERS[i % len(MOCK_USERS)], now=time.time() + i) for i in range(args.tokens)]
+
+    print(f"{'mode':<8}{'verifications/s':>18}{'us/verify':>12}")
+    ops, per_call = throughput(service.verify_uncached, tokens, args.rounds)
+    print(f"{'cold':<8}{ops:>18,.0f}{per_call:>12.2f}")
+
+    for token in tokens:
+        service.verify(token)
+    ops, per_call = throughput(service.verify, tokens, args.rounds)
+    print(f"{'warm':<8}{ops:>18,.0f}{per_call:>12.2f}")
+    print(f"\ncache: {service.cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+"""
+Admission control for agent endpoints.
+
+Every agent call passes three checks before its handler runs:
+
+1. a token bucket per (agent, user): ``user_rate`` requests/second with
+   bursts up to ``user_burst``
+2. a token bucket per agent shared by all users (``agent_rate`` /
+   ``agent_burst``)
+3. a concurrency gate per agent around its model call: at most
+   ``concurrency`` calls run at once, up to ``queue`` more wait at most
+   ``queue_timeout`` seconds for a slot. Requests coalesced onto another
+   caller's call (``core.coalescing``) do not take a slot
+
+A request over a rate limit is answered at once with 429, one that finds
+the queue full (or times out in it) with 503; both carry ``Retry-After``.
+Zero means unlimited for every setting.
+
+Limits come from the ``admission`` block of each department in the agent
+catalog (optionally overridden per agent) and can be overridden without a
+deploy through ``ITT_ADMISSION_CONFIG``, a JSON file keyed by department,
+agent id or ``*``::
+
+    {"sales": {"user_rate": 1, "user_burst": 5}, "sales-deck": {"concurrency": 4, "queue": 8}}
+
+The same controller guards the HTTP routes, their SSE variants and the
+batch/WebSocket dispatch, since all of them run the agent handlers.
+
+- ``ITT_ADMISSION``         ``0`` disables admission control (default on)
+- ``ITT_ADMISSION_CONFIG``  path to the JSON overrides above
+"""
+import asyncio
+import json
+import math
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass, fields, replace
+from typing import Any, AsyncIterator, Deque, Dict, List, Mapping, Optional
+
+from fastapi import HTTPException
+
+from core import metrics
+from core.cache import TTLCache
+from core.security import current_principal
+
+# Distinct users tracked per agent (least recently seen are dropped first)
+MAX_USERS = 10000
+
+OUTCOMES = ("admitted", "queued", "rate_limited", "overloaded")
+
+
+@dataclass(frozen=True)
+class Limits:
+    """Admission limits for one agent (0 = unlimited)"""
+    user_rate: float = 0.0
+    user_burst: int = 0
+    agent_rate: float = 0.0
+    agent_burst: int = 0
+    concurrency: int = 0
+    queue: int = 0
+    queue_timeout: float = 1.0
+
+
+def limits_from_dict(spec: Mapping, base: Limits = Limits()) -> Limits:
+    """Overlay a JSON limits block onto `base`"""
+    names = {field.name for field in fields(Limits)}
+    unknown = set(spec) - names
+    if unknown:
+        raise ValueError(f"Unknown admission settings: {', '.join(sorted(unknown))}")
+    return replace(base, **spec)
+
+
+class TokenBucket:
+    """Refills `rate` tokens per second up to `capacity`; one token per request"""
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: int, now: float):
+        self.rate = rate
+        self.capacity = max(capacity, 1)
+        self.tokens = float(self.capacity)
+        self.updated = now
+
+    def take(self, now: float) -> float:
+        """Take a token; returns 0 when admitted, else seconds until one is available"""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def refill_time(self) -> float:
+        """Seconds until the bucket is full again (after which it can be forgotten)"""
+        return (self.capacity - self.tokens) / self.rate
+
+
+class Rejected(Exception):
+    def __init__(self, status_code: int, detail: str, retry_after: float):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+    def to_http(self) -> HTTPException:
+        return HTTPException(
+            status_code=self.status_code,
+            detail=self.detail,
+            headers={"Retry-After": str(max(1, math.ceil(self.retry_after)))},
+        )
+
+
+class AgentGate:
+    """Concurrency limit with a bounded FIFO queue of waiters"""
+
+    def __init__(self, limit: int, queue: int, timeout: float):
+        self.limit = limit
+        self.queue = queue
+        self.timeout = timeout
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> bool:
+        """Take a slot, waiting in the queue if needed; returns whether it queued"""
+        if self.limit <= 0 or (self.active < self.limit and not self._waiters):
+            self.active += 1
+            return False
+        if len(self._waiters) >= self.queue:
+            raise Rejected(503, "Agent is at capacity, try again shortly", self.timeout)
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.timeout)
+        except asyncio.TimeoutError:
+            self._discard(waiter)
+            raise Rejected(503, "Agent is at capacity, try again shortly", self.timeout)
+        except asyncio.CancelledError:
+            self._discard(waiter)
+            if waiter.done() and not waiter.cancelled():
+                # A slot was handed over just as the caller went away
+                self.release()
+            raise
+        return True
+
+    def release(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)  # hand the slot straight to the next waiter
+                return
+        self.active -= 1
+
+    def _discard(self, waiter: asyncio.Future) -> None:
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+
+class AgentAdmission:
+    """Buckets, gate and counters for one agent"""
+
+    def __init__(self, limits: Limits):
+        self.limits = limits
+        now = time.monotonic()
+        self.agent_bucket = TokenBucket(limits.agent_rate, limits.agent_burst, now) if limits.agent_rate > 0 else None
+        self.user_buckets: Optional[TTLCache[TokenBucket]] = (
+            TTLCache(maxsize=MAX_USERS, ttl=float("inf")) if limits.user_rate > 0 else None
+        )
+        self.gate = AgentGate(limits.concurrency, limits.queue, limits.queue_timeout)
+        self.counters: Dict[str, int] = dict.fromkeys(OUTCOMES, 0)
+
+    def check_rates(self, user: str) -> None:
+        now = time.monotonic()
+        if self.user_buckets is not None:
+            bucket = self.user_buckets.get(user)
+            if bucket is None:
+                bucket = TokenBucket(self.limits.user_rate, self.limits.user_burst, now)
+            wait = bucket.take(now)
+            self.user_buckets.set(user, bucket, ttl=bucket.refill_time() + 1.0)
+            if wait:
+                raise Rejected(429, "Rate limit exceeded for this agent", wait)
+        if self.agent_bucket is not None:
+            wait = self.agent_bucket.take(now)
+            if wait:
+                raise Rejected(429, "Agent is receiving too many requests", wait)
+
+
+class AdmissionController:
+    """Per-agent admission state, configured per department or agent"""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._defaults: Dict[str, Limits] = {}
+        self._overrides: Dict[str, Mapping] = {}
+        self._agents: Dict[str, AgentAdmission] = {}
+
+    def register_defaults(self, limits: Mapping[str, Limits]) -> None:
+        """Built-in limits keyed by department or agent id"""
+        self._defaults.update(limits)
+        self._agents.clear()
+
+    def configure(self, key: str, spec: Mapping) -> None:
+        """Override settings for a department, an agent id or ``*``"""
+        limits_from_dict(spec)  # validate now rather than on the next request
+        self._overrides[key] = dict(spec)
+        self._agents.clear()
+
+    def load_config(self, path: str) -> None:
+        with open(path) as f:
+            config = json.load(f)
+        for key, spec in config.items():
+            self.configure(key, spec)
+
+    def limits(self, department: str, agent: str) -> Limits:
+        """Effective limits: catalog department < catalog agent < overrides (* < department < agent)"""
+        limits = self._defaults.get(agent) or self._defaults.get(department) or Limits()
+        for key in ("*", department, agent):
+            if key in self._overrides:
+                limits = limits_from_dict(self._overrides[key], limits)
+        return limits
+
+    def state(self, department: str, agent: str) -> AgentAdmission:
+        state = self._agents.get(agent)
+        if state is None:
+            state = self._agents[agent] = AgentAdmission(self.limits(department, agent))
+        return state
+
+    def check(self, department: str, agent: str) -> None:
+        """Apply the rate limits to the current caller; raises HTTPException 429"""
+        if not self.enabled:
+            return
+        state = self.state(department, agent)
+        principal = current_principal.get()
+        try:
+            state.check_rates(principal.user_id if principal is not None else "anonymous")
+        except Rejected as exc:
+            state.counters["rate_limited"] += 1
+            raise exc.to_http() from None
+
+    @asynccontextmanager
+    async def slot(self, department: str, agent: str) -> AsyncIterator[None]:
+        """Hold one of the agent's concurrency slots; raises HTTPException 503"""
+        if not self.enabled:
+            yield
+            return
+        state = self.state(department, agent)
+        try:
+            queued = await state.gate.acquire()
+        except Rejected as exc:
+            state.counters["overloaded"] += 1
+            raise exc.to_http() from None
+        state.counters["queued" if queued else "admitted"] += 1
+        try:
+            yield
+        finally:
+            state.gate.release()
+
+    @asynccontextmanager
+    async def admit(self, department: str, agent: str) -> AsyncIterator[None]:
+        """Rate limits plus a concurrency slot for the current caller"""
+        self.check(department, agent)
+        async with self.slot(department, agent):
+            yield
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Limits, counters and current load of every agent seen so far"""
+        return {
+            agent: {
+                "limits": asdict(state.limits),
+                "counters": dict(state.counters),
+                "inFlight": state.gate.active,
+                "waiting": state.gate.waiting,
+            }
+            for agent, state in sorted(self._agents.items())
+        }
+
+    def metric_lines(self) -> List[str]:
+        agents = sorted(self._agents.items())
+        return (
+            metrics.family("itt_admission_requests_total", "counter", "Agent calls by admission outcome",
+                           [({"agent": agent, "outcome": outcome}, state.counters[outcome])
+                            for agent, state in agents for outcome in OUTCOMES])
+            + metrics.family("itt_admission_in_flight", "gauge", "Agent model calls holding a concurrency slot",
+                             [({"agent": agent}, state.gate.active) for agent, state in agents])
+            + metrics.family("itt_admission_queue_depth", "gauge", "Agent calls waiting for a concurrency slot",
+                             [({"agent": agent}, state.gate.waiting) for agent, state in agents])
+        )
+
+
+def _controller_from_env() -> AdmissionController:
+    result = AdmissionController(enabled=os.getenv("ITT_ADMISSION", "1").lower() not in ("0", "false", "no", "off"))
+    config_path = os.getenv("ITT_ADMISSION_CONFIG")
+    if config_path:
+        result.load_config(config_path)
+    return result
+
+
+controller = _controller_from_env()
+metrics.register_collector(controller.metric_lines)
+
+
+def register_defaults(limits: Mapping[str, Limits]) -> None:
+    """Register built-in limits on the shared controller"""
+    controller.register_defaults(limits)
+
+
+def check(department: str, agent: str) -> None:
+    """Rate limits of the shared controller"""
+    controller.check(department, agent)
+
+
+def slot(department: str, agent: str):
+    """Concurrency slot on the shared controller (async context manager)"""
+    return controller.slot(department, agent)
+
+
+def admit(department: str, agent: str):
+    """Rate limits plus a concurrency slot on the shared controller (async context manager)"""
+    return controller.admit(department, agent)
@@ -0,0 +1,60 @@
+"""
+Index of every callable department agent.
+
+Built from the application's routes at startup so that transports other
+than the per-agent HTTP endpoints (WebSocket, batch) can dispatch to the
+same handlers. Agents are addressable by their frontend id (``sales-deck``,
+the ``id`` in ``data/mock-data.ts``) or by their endpoint path
+(``/api/sales/deck``).
+"""
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Union
+
+from fastapi.responses import Response
+from fastapi.routing import APIRoute
+
+from models import AgentRequest, AgentResponse
+
+# Agent endpoints return a validated AgentResponse or a pre-serialized one
+AgentHandler = Callable[[AgentRequest], Awaitable[Union[AgentResponse, Response]]]
+
+
+@dataclass(frozen=True)
+class Agent:
+    id: str
+    path: str
+    name: str
+    handler: AgentHandler
+
+
+def agent_id_for(path: str) -> str:
+    """``/api/sales/rfp-search`` -> ``sales-rfp-search``"""
+    return path[len("/api/"):].replace("/", "-") if path.startswith("/api/") else path.strip("/").replace("/", "-")
+
+
+class AgentIndex:
+    """Lookup of agents by id or endpoint path"""
+
+    def __init__(self):
+        self._agents: Dict[str, Agent] = {}
+        self._by_path: Dict[str, Agent] = {}
+
+    def build(self, routes: Iterable) -> None:
+        """Index every agent POST route (called at startup)"""
+        agents: Dict[str, Agent] = {}
+        for route in routes:
+            if isinstance(route, APIRoute) and route.response_model is AgentResponse and "POST" in route.methods:
+                agent = Agent(id=agent_id_for(route.path), path=route.path, name=route.summary or route.name, handler=route.endpoint)
+                agents[agent.id] = agent
+        self._agents = agents
+        self._by_path = {agent.path: agent for agent in agents.values()}
+
+    def get(self, key: str) -> Optional[Agent]:
+        """Find an agent by id or endpoint path"""
+        return self._agents.get(key) or self._by_path.get(key)
+
+    def all(self) -> List[Agent]:
+        return list(self._agents.values())
+
+
+agents = AgentIndex()
@@ -0,0 +1,304 @@
+"""
+Declarative agent catalog.
+
+Each department is one JSON file in ``catalog/`` describing its agents:
+endpoint path, name and description, latency profile, ordered intent rules
+and a response per intent (``default`` when no intent matches). Routes are
+generated from it, so adding an agent is a catalog edit, not new code::
+
+    {"name": "Sales", "prefix": "/api/sales", "tag": "Sales Department",
+     "agents": [{"id": "sales-deck", "path": "/deck", "name": "Deck Builder",
+                 "description": "...", "latency": {"distribution": "fixed", "seconds": 1.5},
+                 "intents": [{"intent": "create", "keywords": ["fintech", "deck"]}],
+                 "responses": {"create": {"message": "...", "data": {...}},
+                               "default": {"message": "..."}}}]}
+
+Every call does its model work through ``core.model`` (the simulated
+backend awaits the agent's ``latency`` profile) with the caller's recent
+turns from ``core.memory`` as context, coalesced with identical concurrent
+queries by ``core.coalescing``. A department's
+``admission`` block sets its rate and concurrency limits (see
+``core.admission``); an agent can override parts of it with its own.
+Slow agents marked ``"jobs": true`` also get a ``<path>/jobs`` route that
+queues the call instead (see ``core.jobs``).
+
+Messages and descriptions may be strings or lists of lines. Response
+strings can use the ``{{@epoch}}``, ``{{@short_id}}``, ``{{@date}}`` and
+``{{@timestamp}}`` placeholders (see ``core.responses``). An agent whose
+reply depends on more than the intent names a ``"handler"``
+(``"module:function"``), imported only when its department is loaded.
+
+Departments are read lazily: only those enabled through ``ITT_DEPARTMENTS``
+(comma-separated, default all) are parsed, registered and routed, so a
+Sales-only deployment never loads the other catalogs or their handlers.
+
+- ``ITT_DEPARTMENTS``  departments to serve, e.g. ``sales`` (default all)
+- ``ITT_CATALOG_DIR``  directory of department files (default ``catalog/``)
+"""
+import importlib
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from fastapi import APIRouter, Depends, FastAPI
+from fastapi.responses import JSONResponse, Response
+
+from core import admission, coalescing, intents, jobs, latency, memory, model, responses
+from core.agents import AgentHandler
+from core.responses import ReplyBuilder, ReplyFields
+from core.security import Principal, current_principal, get_principal
+from core.streaming import add_stream_routes
+from models import AgentRequest, AgentResponse, JobRequest
+
+CATALOG_DIR = Path(os.getenv("ITT_CATALOG_DIR") or Path(__file__).resolve().parent.parent / "catalog")
+
+# Served when ITT_DEPARTMENTS is unset, in API documentation order
+DEFAULT_DEPARTMENTS = ("hr", "finance", "marketing", "sales", "engineering")
+
+# Response used when no intent rule matches
+DEFAULT_INTENT = "default"
+
+
+def _text(value: Union[str, List[str]]) -> str:
+    return "\n".join(value) if isinstance(value, list) else value
+
+
+@dataclass(frozen=True)
+class AgentSpec:
+    """One catalog entry"""
+    id: str
+    path: str
+    name: str
+    description: str
+    latency: latency.LatencyProfile
+    intents: Tuple[Tuple[str, Tuple[str, ...]], ...] = ()
+    responses: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    handler: Optional[str] = None
+    admission: Dict[str, Any] = field(default_factory=dict)
+    jobs: bool = False
+
+    @classmethod
+    def from_dict(cls, spec: Dict[str, Any]) -> "AgentSpec":
+        replies = {}
+        for intent, reply in spec.get("responses", {}).items():
+            replies[intent] = {**reply, "message": _text(reply["message"])}
+        return cls(
+            id=spec["id"],
+            path=spec["path"],
+            name=spec["name"],
+            description=_text(spec.get("description", "")),
+            latency=latency.profile_from_dict(spec.get("latency", {})),
+            intents=tuple((rule["intent"], tuple(rule["keywords"])) for rule in spec.get("intents", ())),
+            responses=replies,
+            handler=spec.get("handler"),
+            admission=spec.get("admission", {}),
+            jobs=spec.get("jobs", False),
+        )
+
+
+@dataclass(frozen=True)
+class DepartmentSpec:
+    """One catalog file"""
+    key: str
+    name: str
+    prefix: str
+    tag: str
+    agents: Tuple[AgentSpec, ...]
+    admission: Dict[str, Any] = field(default_factory=dict)
+
+
+# Custom handlers receive the catalog entry along with the request
+CustomHandler = Callable[[AgentSpec, AgentRequest], Awaitable[Union[AgentResponse, Response]]]
+
+
+def read_department(key: str, directory: Path = CATALOG_DIR) -> DepartmentSpec:
+    """Parse one department's catalog file"""
+    with open(directory / f"{key}.json", encoding="utf-8") as f:
+        spec = json.load(f)
+    return DepartmentSpec(
+        key=key,
+        name=spec["name"],
+        prefix=spec["prefix"],
+        tag=spec["tag"],
+        agents=tuple(AgentSpec.from_dict(agent) for agent in spec["agents"]),
+        admission=spec.get("admission", {}),
+    )
+
+
+def reply_builder(agent: AgentSpec) -> ReplyBuilder:
+    """Reply builder over an agent's catalog responses"""
+    def build(intent: Optional[str], fields: ReplyFields) -> AgentResponse:
+        reply = agent.responses.get(intent or DEFAULT_INTENT) or agent.responses[DEFAULT_INTENT]
+        return AgentResponse(**{"success": True, **responses.fill(reply, fields)})
+
+    return build
+
+
+def load_handler(reference: str) -> CustomHandler:
+    """Import a ``module:function`` handler reference"""
+    module, _, name = reference.partition(":")
+    return getattr(importlib.import_module(module), name)
+
+
+def model_call(agent: AgentSpec, department: str) -> Callable[[str, model.History], Awaitable[model.Completion]]:
+    """An agent's model call, holding one of its concurrency slots"""
+    async def call(message: str, history: model.History) -> model.Completion:
+        async with admission.slot(department, agent.id):
+            return await model.complete(agent.id, message, history)
+
+    return call
+
+
+def agent_runner(agent: AgentSpec, department: str) -> AgentHandler:
+    """Run a catalog agent for a request whose rate limits were already checked"""
+    call = model_call(agent, department)
+    if agent.handler:
+        handler = load_handler(agent.handler)
+
+        async def respond(request: AgentRequest):
+            return await handler(agent, request)
+    else:
+        build = reply_builder(agent)
+        routed = bool(agent.intents)
+
+        async def respond(request: AgentRequest):
+            intent = intents.resolve(agent.id, request.message) if routed else None
+            return responses.reply(agent.id, intent, build)
+
+    async def run(request: AgentRequest):
+        principal = current_principal.get()
+        history = await memory.history(principal.user_id, agent.id) if principal is not None else ()
+        await coalescing.run(agent.id, request.message, call, history)
+        result = await respond(request)
+        if principal is not None:
+            await memory.record(principal.user_id, agent.id, request.message, responses.response_message(result))
+        return result
+
+    return run
+
+
+def _endpoint_name(agent: AgentSpec) -> str:
+    return f"{agent.path.strip('/').replace('-', '_').replace('/', '_')}_agent"
+
+
+def agent_endpoint(agent: AgentSpec, department: str, run: AgentHandler) -> AgentHandler:
+    """Route endpoint for a catalog agent"""
+    def check() -> None:
+        admission.check(department, agent.id)
+
+    async def endpoint(request: AgentRequest):
+        check()
+        return await run(request)
+
+    endpoint.__name__ = _endpoint_name(agent)
+    endpoint.__doc__ = agent.description
+    # The SSE variant checks before its stream starts, so a rejection keeps its status code
+    endpoint.check = check
+    endpoint.run = run
+    return endpoint
+
+
+def job_endpoint(agent: AgentSpec, department: str):
+    """``<path>/jobs`` endpoint queueing a catalog agent call as a job"""
+    async def endpoint(request: JobRequest, principal: Principal = Depends(get_principal)):
+        admission.check(department, agent.id)
+        job = await jobs.queue.submit(agent.id, request.message, principal, request.priority)
+        return JSONResponse(
+            {"success": True, "data": job.to_dict()}, status_code=202, headers={"Location": f"/api/jobs/{job.id}"}
+        )
+
+    endpoint.__name__ = f"{_endpoint_name(agent)}_job"
+    endpoint.__doc__ = (
+        f"Queue a {agent.name} request as a job and return its id at once; "
+        "poll `/api/jobs/{job_id}` or subscribe to `/api/jobs/{job_id}/events` for the result"
+    )
+    return endpoint
+
+
+def build_router(department: DepartmentSpec) -> APIRouter:
+    """Register a department's latency profiles, limits and intents and generate its routes"""
+    router = APIRouter()
+    latency.register_defaults({agent.id: agent.latency for agent in department.agents})
+    limits = admission.limits_from_dict(department.admission)
+    admission.register_defaults({
+        department.key: limits,
+        **{agent.id: admission.limits_from_dict(agent.admission, limits) for agent in department.agents if agent.admission},
+    })
+    for agent in department.agents:
+        if agent.intents:
+            intents.register(agent.id, agent.intents)
+        run = agent_runner(agent, department.key)
+        router.add_api_route(
+            agent.path,
+            agent_endpoint(agent, department.key, run),
+            methods=["POST"],
+            response_model=AgentResponse,
+            summary=agent.name,
+        )
+        if agent.jobs:
+            jobs.register(agent.id, run)
+            router.add_api_route(
+                f"{agent.path}/jobs",
+                job_endpoint(agent, department.key),
+                methods=["POST"],
+                status_code=202,
+                summary=f"{agent.name} (job)",
+            )
+    # SSE variants (<path>/stream) of every agent above
+    add_stream_routes(router)
+    return router
+
+
+def enabled_departments() -> List[str]:
+    """Departments selected by ITT_DEPARTMENTS"""
+    value = os.getenv("ITT_DEPARTMENTS", "").strip().lower()
+    if value in ("", "all", "*"):
+        return list(DEFAULT_DEPARTMENTS)
+    return [key.strip() for key in value.split(",") if key.strip()]
+
+
+class Catalog:
+    """Department catalogs, each read and routed at most once"""
+
+    def __init__(self, directory: Path = CATALOG_DIR):
+        self.directory = directory
+        self._departments: Dict[str, DepartmentSpec] = {}
+        self._routers: Dict[str, APIRouter] = {}
+
+    def available(self) -> List[str]:
+        """Every department with a catalog file"""
+        return sorted(path.stem for path in self.directory.glob("*.json"))
+
+    def department(self, key: str) -> DepartmentSpec:
+        spec = self._departments.get(key)
+        if spec is None:
+            if not (self.directory / f"{key}.json").is_file():
+                raise ValueError(f"Unknown department {key!r}; available: {', '.join(self.available())}")
+            spec = self._departments[key] = read_department(key, self.directory)
+        return spec
+
+    def router(self, key: str) -> APIRouter:
+        router = self._routers.get(key)
+        if router is None:
+            router = self._routers[key] = build_router(self.department(key))
+        return router
+
+    def loaded(self) -> List[DepartmentSpec]:
+        """Departments read so far, in load order"""
+        return list(self._departments.values())
+
+    def include(self, app: FastAPI, keys: Sequence[str], dependencies: Optional[Sequence] = None) -> None:
+        """Load the given departments and mount their routers on the app"""
+        for key in keys:
+            department = self.department(key)
+            app.include_router(self.router(key), prefix=department.prefix, tags=[department.tag], dependencies=dependencies)
+
+
+catalog = Catalog()
+
+
+def include_departments(app: FastAPI, dependencies: Optional[Sequence] = None) -> None:
+    """Mount every department enabled by ITT_DEPARTMENTS on the app"""
+    catalog.include(app, enabled_departments(), dependencies)
@@ -0,0 +1,132 @@
+"""
+Single-flight coalescing of identical agent queries.
+
+When many people send the same prompt to the same agent at once (an
+all-hands asking ``/api/sales/capabilities`` "What are our AI/ML
+capabilities?"), only the first request calls the model backend. Requests
+with the same agent, normalized message (case, whitespace and trailing
+punctuation ignored) and conversation history (usually none, for a
+first question) that arrive while that call is in flight await it and
+share its completion; with a coalescing window the completion is also
+reused by identical requests arriving up to ``window`` seconds after it
+finished. Each caller still builds its own reply (fresh ids and
+timestamps) and still passes its own rate limits, but followers never take
+an agent concurrency slot.
+
+The shared call runs as its own task, so a leader that disconnects does not
+fail its followers. Failures are shared with the requests already waiting
+but never kept for the window.
+
+- ``ITT_COALESCING``         ``0`` disables coalescing (default on)
+- ``ITT_COALESCING_WINDOW``  seconds a finished completion is reused (default 0:
+                             only requests overlapping the call are coalesced)
+"""
+import asyncio
+import os
+import re
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Mapping, Sequence, TypeVar
+
+from core import metrics
+from core.cache import TTLCache
+
+T = TypeVar("T")
+
+# Finished completions kept for the window
+MAX_ENTRIES = 1024
+
+OUTCOMES = ("upstream", "joined", "window")
+
+_TRAILING_PUNCTUATION = re.compile(r"[\s.!?]+$")
+
+
+def normalize(message: str) -> str:
+    """``"  What are our AI/ML capabilities?? "`` -> ``"what are our ai/ml capabilities"``"""
+    return _TRAILING_PUNCTUATION.sub("", " ".join(message.lower().split()))
+
+
+class Coalescer:
+    """Shares one in-flight (and recently finished) call among identical requests"""
+
+    def __init__(self, enabled: bool = True, window: float = 0.0, maxsize: int = MAX_ENTRIES):
+        self.enabled = enabled
+        self.window = window
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._recent: TTLCache[Any] = TTLCache(maxsize=maxsize, ttl=window)
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, agent: str, outcome: str) -> None:
+        counters = self._counters.get(agent)
+        if counters is None:
+            counters = self._counters[agent] = dict.fromkeys(OUTCOMES, 0)
+        counters[outcome] += 1
+
+    async def run(self, agent: str, message: str, call: Callable[[str, Sequence], Awaitable[T]],
+                  history: Sequence[Mapping[str, str]] = ()) -> T:
+        """Result of ``call(message, history)``, shared with identical concurrent requests"""
+        if not self.enabled:
+            return await call(message, history)
+        key: Hashable = (agent, normalize(message), tuple((turn["role"], turn["content"]) for turn in history))
+        if self.window > 0:
+            recent = self._recent.get(key)
+            if recent is not None:
+                self._count(agent, "window")
+                return recent
+        shared = self._inflight.get(key)
+        if shared is not None:
+            self._count(agent, "joined")
+            return await asyncio.shield(shared)
+
+        self._count(agent, "upstream")
+        shared = self._inflight[key] = asyncio.ensure_future(call(message, history))
+        shared.add_done_callback(lambda done: self._finished(key, done))
+        return await asyncio.shield(shared)
+
+    def _finished(self, key: Hashable, done: asyncio.Future) -> None:
+        self._inflight.pop(key, None)
+        if done.cancelled():
+            return
+        if done.exception() is None and self.window > 0:
+            self._recent.set(key, done.result())
+
+    def clear(self) -> None:
+        self._recent.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Per-agent counts of upstream calls made and saved"""
+        return {
+            "enabled": self.enabled,
+            "windowSeconds": self.window,
+            "inFlight": len(self._inflight),
+            "agents": {
+                agent: {**counters, "saved": counters["joined"] + counters["window"]}
+                for agent, counters in sorted(self._counters.items())
+            },
+        }
+
+    def metric_lines(self) -> List[str]:
+        agents = sorted(self._counters.items())
+        return (
+            metrics.family("itt_coalescing_requests_total", "counter",
+                           "Agent model calls by coalescing outcome (upstream call made, joined an in-flight one, reused within the window)",
+                           [({"agent": agent, "outcome": outcome}, counters[outcome])
+                            for agent, counters in agents for outcome in OUTCOMES])
+            + metrics.family("itt_coalescing_saved_calls_total", "counter", "Upstream model calls saved by coalescing",
+                             [({"agent": agent}, counters["joined"] + counters["window"]) for agent, counters in agents])
+        )
+
+
+def _coalescer_from_env() -> Coalescer:
+    return Coalescer(
+        enabled=os.getenv("ITT_COALESCING", "1").lower() not in ("0", "false", "no", "off"),
+        window=float(os.getenv("ITT_COALESCING_WINDOW", "0")),
+    )
+
+
+coalescer = _coalescer_from_env()
+metrics.register_collector(coalescer.metric_lines)
+
+
+async def run(agent: str, message: str, call: Callable[[str, Sequence], Awaitable[T]],
+              history: Sequence[Mapping[str, str]] = ()) -> T:
+    """Coalesced ``call(message, history)`` on the shared coalescer"""
+    return await coalescer.run(agent, message, call, history)
@@ -0,0 +1,196 @@
+"""
+Indexed in-memory user directory.
+
+All lookups go through an immutable snapshot of hash indexes (by id, by
+normalized email, by department and by role), so they stay O(1) no matter
+how many employees are loaded. Reloading builds a complete new snapshot off
+to the side and swaps it in with a single reference assignment: readers
+either see the old indexes or the new ones, never a half-built mix, and
+never wait on a lock.
+
+Set ``ITT_USERS_FILE`` to a ``.json`` or ``.csv`` file to load employees
+from disk instead of the built-in ``MOCK_USERS``.
+"""
+import asyncio
+import bisect
+import csv
+import json
+import os
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from models import User, MOCK_USERS
+
+
+def normalize_email(email: str) -> str:
+    """Canonical form used for the email index"""
+    return email.strip().lower()
+
+
+class _Snapshot:
+    """One immutable generation of the directory indexes"""
+    __slots__ = ("users", "by_id", "by_email", "by_department", "by_role", "position", "department_positions", "role_positions")
+
+    def __init__(self, users: Iterable[User]):
+        ordered: List[User] = []
+        by_id: Dict[str, User] = {}
+        by_email: Dict[str, User] = {}
+        by_department: Dict[str, List[User]] = {}
+        by_role: Dict[str, List[User]] = {}
+        position: Dict[str, int] = {}
+        department_positions: Dict[str, List[int]] = {}
+        role_positions: Dict[str, List[int]] = {}
+
+        for user in users:
+            if user.id in by_id:
+                raise ValueError(f"Duplicate user id: {user.id}")
+            email = normalize_email(user.email)
+            if email in by_email:
+                raise ValueError(f"Duplicate user email: {user.email}")
+            ordered.append(user)
+            by_id[user.id] = user
+            by_email[email] = user
+            by_department.setdefault(user.department, []).append(user)
+            by_role.setdefault(user.role, []).append(user)
+            position[user.id] = len(ordered) - 1
+            department_positions.setdefault(user.department, []).append(len(ordered) - 1)
+            role_positions.setdefault(user.role, []).append(len(ordered) - 1)
+
+        self.users: Tuple[User, ...] = tuple(ordered)
+        self.by_id = by_id
+        self.by_email = by_email
+        self.by_department = {key: tuple(value) for key, value in by_department.items()}
+        self.by_role = {key: tuple(value) for key, value in by_role.items()}
+        # Directory-order positions back the keyset pagination below
+        self.position = position
+        self.department_positions = {key: tuple(value) for key, value in department_positions.items()}
+        self.role_positions = {key: tuple(value) for key, value in role_positions.items()}
+
+    def candidates(self, department: Optional[str], role: Optional[str]) -> Tuple[Sequence[int], Optional[str], Optional[str]]:
+        """Pick the smallest position index for the filters, plus any filter it leaves unchecked"""
+        if department is None and role is None:
+            return range(len(self.users)), None, None
+        if role is None:
+            return self.department_positions.get(department, ()), None, None
+        if department is None:
+            return self.role_positions.get(role, ()), None, None
+        by_department = self.department_positions.get(department, ())
+        by_role = self.role_positions.get(role, ())
+        if len(by_department) <= len(by_role):
+            return by_department, None, role
+        return by_role, department, None
+
+
+def read_users_file(path: str) -> List[User]:
+    """Read users from a JSON (list or ``{"users": [...]}``) or CSV file"""
+    if path.lower().endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = [{key: value for key, value in row.items() if value != ""} for row in csv.DictReader(f)]
+    else:
+        with open(path, encoding="utf-8") as f:
+            rows = json.load(f)
+        if isinstance(rows, dict):
+            rows = rows["users"]
+    return [User.model_validate(row) for row in rows]
+
+
+class UserDirectory:
+    """Constant-time user lookups over an atomically swappable index snapshot"""
+
+    def __init__(self, users: Iterable[User] = ()):
+        self._snapshot = _Snapshot(users)
+
+    def __len__(self) -> int:
+        return len(self._snapshot.users)
+
+    def get(self, user_id: str) -> Optional[User]:
+        """Find a user by id"""
+        return self._snapshot.by_id.get(user_id)
+
+    def get_by_email(self, email: str) -> Optional[User]:
+        """Find a user by email address (case-insensitive)"""
+        return self._snapshot.by_email.get(normalize_email(email))
+
+    def by_department(self, department: str) -> Tuple[User, ...]:
+        """All users in a department, in directory order"""
+        return self._snapshot.by_department.get(department, ())
+
+    def by_role(self, role: str) -> Tuple[User, ...]:
+        """All users with a role, in directory order"""
+        return self._snapshot.by_role.get(role, ())
+
+    def page(
+        self,
+        limit: int,
+        after: Optional[str] = None,
+        department: Optional[str] = None,
+        role: Optional[str] = None,
+    ) -> Tuple[List[User], Optional[str]]:
+        """
+        Keyset pagination in directory order.
+
+        Returns up to `limit` users that come after the user id `after` and
+        match the filters, plus the id to pass as `after` for the next page
+        (None on the last page). Seeking is a bisect into the filter's
+        position index, so deep pages cost the same as the first one.
+        Raises KeyError if `after` is not in the directory.
+        """
+        snapshot = self._snapshot
+        positions, want_department, want_role = snapshot.candidates(department, role)
+        start = 0 if after is None else bisect.bisect_right(positions, snapshot.position[after])
+
+        users = snapshot.users
+        page: List[User] = []
+        for index in range(start, len(positions)):
+            user = users[positions[index]]
+            if want_department is not None and user.department != want_department:
+                continue
+            if want_role is not None and user.role != want_role:
+                continue
+            if len(page) == limit:
+                return page, page[-1].id
+            page.append(user)
+        return page, None
+
+    def iter_users(self, department: Optional[str] = None, role: Optional[str] = None) -> Iterator[User]:
+        """Iterate matching users from one consistent snapshot"""
+        snapshot = self._snapshot
+        positions, want_department, want_role = snapshot.candidates(department, role)
+        users = snapshot.users
+        for index in positions:
+            user = users[index]
+            if want_department is not None and user.department != want_department:
+                continue
+            if want_role is not None and user.role != want_role:
+                continue
+            yield user
+
+    def departments(self) -> List[str]:
+        """Every department present in the directory"""
+        return list(self._snapshot.by_department)
+
+    def all(self) -> Tuple[User, ...]:
+        """Every user, in directory order"""
+        return self._snapshot.users
+
+    def load(self, users: Iterable[User]) -> None:
+        """Replace the directory contents, swapping the indexes atomically"""
+        self._snapshot = _Snapshot(users)
+
+    def load_file(self, path: str) -> None:
+        """Replace the directory contents from a JSON or CSV file"""
+        self.load(read_users_file(path))
+
+    async def reload_file(self, path: str) -> None:
+        """Parse and index a file in a worker thread, then swap it in"""
+        snapshot = await asyncio.to_thread(lambda: _Snapshot(read_users_file(path)))
+        self._snapshot = snapshot
+
+
+def _directory_from_env() -> UserDirectory:
+    path = os.getenv("ITT_USERS_FILE")
+    if path:
+        return UserDirectory(read_users_file(path))
+    return UserDirectory(MOCK_USERS)
+
+
+directory = _directory_from_env()
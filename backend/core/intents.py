@@ -0,0 +1,136 @@
+"""
+Shared intent registry for the department agents.
+
+Each agent registers an ordered list of ``(intent, keywords)`` rules. The
+first rule with any keyword present in the message wins, exactly like the
+``if "x" in msg ... elif ...`` chains it replaces. All keywords from all
+agents are compiled once into a single Aho-Corasick automaton, so resolving
+an intent is one pass over the lower-cased message regardless of how many
+keywords are registered.
+"""
+from collections import deque
+from typing import Dict, List, Optional, Sequence, Tuple
+
+Rules = Sequence[Tuple[str, Sequence[str]]]
+
+
+class _Automaton:
+    """Aho-Corasick automaton with a fully expanded transition table"""
+
+    def __init__(self, patterns: Sequence[str]):
+        goto: List[Dict[str, int]] = [{}]
+        output: List[Tuple[int, ...]] = [()]
+
+        for pattern_id, pattern in enumerate(patterns):
+            state = 0
+            for ch in pattern:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    goto.append({})
+                    output.append(())
+                    nxt = len(goto) - 1
+                    goto[state][ch] = nxt
+                state = nxt
+            output[state] = output[state] + (pattern_id,)
+
+        # Breadth-first pass: resolve failure links and fold them into the
+        # transition table so the scan never has to walk back up the trie.
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [dict(goto[0])]
+        delta.extend({} for _ in range(len(goto) - 1))
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            fallback = fail[state]
+            output[state] = output[state] + output[fallback]
+            delta[state] = {**delta[fallback], **goto[state]}
+            for ch, nxt in goto[state].items():
+                fail[nxt] = delta[fallback].get(ch, 0)
+                queue.append(nxt)
+
+        self.delta = delta
+        self.output = output
+
+
+class IntentRegistry:
+    """Registry of per-agent keyword rules resolved through one automaton"""
+
+    def __init__(self):
+        self._rules: Dict[str, List[Tuple[str, Tuple[str, ...]]]] = {}
+        self._compiled: Optional[Tuple[_Automaton, Dict[str, Tuple[Dict[int, int], Tuple[str, ...]]]]] = None
+
+    def register(self, agent: str, rules: Rules) -> None:
+        """Register the ordered intent rules for an agent (first match wins)"""
+        self._rules[agent] = [
+            (intent, tuple(keyword.lower() for keyword in keywords))
+            for intent, keywords in rules
+        ]
+        self._compiled = None
+
+    def rules(self, agent: str) -> List[Tuple[str, Tuple[str, ...]]]:
+        """Return the registered rules for an agent"""
+        return list(self._rules.get(agent, ()))
+
+    def agents(self) -> List[str]:
+        """Return every agent with registered rules"""
+        return list(self._rules)
+
+    def compile(self) -> None:
+        """Build the shared automaton and the per-agent priority tables"""
+        pattern_ids: Dict[str, int] = {}
+        priorities: Dict[str, Tuple[Dict[int, int], Tuple[str, ...]]] = {}
+
+        for agent, rules in self._rules.items():
+            table: Dict[int, int] = {}
+            for rank, (_, keywords) in enumerate(rules):
+                for keyword in keywords:
+                    pattern_id = pattern_ids.setdefault(keyword, len(pattern_ids))
+                    # A keyword listed under several rules keeps its first rank
+                    table.setdefault(pattern_id, rank)
+            priorities[agent] = (table, tuple(intent for intent, _ in rules))
+
+        self._compiled = (_Automaton(list(pattern_ids)), priorities)
+
+    def resolve(self, agent: str, message: str) -> Optional[str]:
+        """Return the highest-priority intent matched by the message, if any"""
+        if self._compiled is None:
+            self.compile()
+        automaton, priorities = self._compiled
+
+        compiled = priorities.get(agent)
+        if compiled is None:
+            return None
+        table, intents = compiled
+
+        delta = automaton.delta
+        output = automaton.output
+        best = None
+        state = 0
+        for ch in message.lower():
+            state = delta[state].get(ch, 0)
+            for pattern_id in output[state]:
+                rank = table.get(pattern_id)
+                if rank is not None and (best is None or rank < best):
+                    best = rank
+                    if best == 0:
+                        return intents[0]
+
+        return None if best is None else intents[best]
+
+
+registry = IntentRegistry()
+
+
+def register(agent: str, rules: Rules) -> None:
+    """Register intent rules for an agent on the shared registry"""
+    registry.register(agent, rules)
+
+
+def resolve(agent: str, message: str) -> Optional[str]:
+    """Resolve an agent's intent for a message on the shared registry"""
+    return registry.resolve(agent, message)
+
+
+def compile_all() -> None:
+    """Compile the shared registry (called once at startup)"""
+    registry.compile()
@@ -0,0 +1,416 @@
+"""
+Asynchronous jobs for long-running agents.
+
+Agents marked ``"jobs": true`` in the catalog (deck builder, RFP analysis,
+content creation) get a ``POST <path>/jobs`` route next to their normal
+one. Submitting passes the caller's rate limits, stores the job and returns
+``202`` with its id at once; a bounded pool of workers runs queued jobs
+highest priority first (``high``, ``normal``, ``low``; FIFO within a
+priority) through the same agent code as the synchronous route. Clients
+poll ``GET /api/jobs/{id}`` (optionally long-polling with ``?wait=``) or
+subscribe to ``GET /api/jobs/{id}/events`` for Server-Sent Events.
+
+Jobs are written to a SQLite table in the data directory before the submit
+returns and on every state change, so they survive a restart: queued jobs
+are queued again, and jobs that were running when the process stopped run
+again from the start (at-least-once). Finished jobs are purged after
+``ITT_JOB_RETENTION`` seconds. All database work runs on one dedicated
+thread, never on the event loop.
+
+- ``ITT_JOB_WORKERS``    jobs run concurrently (default 4)
+- ``ITT_JOB_QUEUE_SIZE`` queued jobs accepted before submits get 503 (default 1000)
+- ``ITT_JOB_RETENTION``  seconds finished jobs are kept (default 86400)
+- ``ITT_JOBS_DB``        database path (default ``jobs.db`` in ``ITT_DATA_DIR``)
+"""
+import asyncio
+import itertools
+import json
+import logging
+import os
+import secrets
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, TypeVar
+
+from fastapi import HTTPException
+
+from core import metrics, storage
+from core.agents import AgentHandler
+from core.cache import TTLCache
+from core.responses import response_dict
+from core.security import Principal, current_principal
+from core.tokens import TokenClaims
+from models import AgentRequest
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+
+TERMINAL = ("succeeded", "failed", "cancelled")
+
+# Finished jobs answered from memory instead of the database
+RECENT_JOBS = 1024
+
+# Queue wait and run time buckets in seconds (generation takes tens of seconds)
+JOB_BUCKETS = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    agent TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    role TEXT NOT NULL,
+    message TEXT NOT NULL,
+    priority TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    result TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);
+CREATE INDEX IF NOT EXISTS jobs_user ON jobs (user_id, created_at);
+"""
+
+COLUMNS = ("id", "agent", "user_id", "role", "message", "priority", "status",
+           "created_at", "started_at", "finished_at", "result", "error")
+
+
+def _iso(timestamp: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(timestamp).isoformat() if timestamp is not None else None
+
+
+@dataclass
+class Job:
+    id: str
+    agent: str
+    user_id: str
+    role: str
+    message: str
+    priority: str
+    status: str = "queued"
+    created_at: float = 0.0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in TERMINAL
+
+    def to_dict(self) -> Dict[str, Any]:
+        """API view of the job"""
+        return {
+            "id": self.id,
+            "agent": self.agent,
+            "status": self.status,
+            "priority": self.priority,
+            "createdAt": _iso(self.created_at),
+            "startedAt": _iso(self.started_at),
+            "finishedAt": _iso(self.finished_at),
+            "result": self.result,
+            "error": self.error,
+        }
+
+    def row(self) -> tuple:
+        return (self.id, self.agent, self.user_id, self.role, self.message, self.priority, self.status,
+                self.created_at, self.started_at, self.finished_at,
+                json.dumps(self.result) if self.result is not None else None, self.error)
+
+    @classmethod
+    def from_row(cls, row) -> "Job":
+        values = dict(zip(COLUMNS, row))
+        if values["result"] is not None:
+            values["result"] = json.loads(values["result"])
+        return cls(**values)
+
+
+class JobStore:
+    """SQLite table of jobs; every method runs on the store's own thread"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._connection = None
+
+    def open(self) -> None:
+        self._connection = storage.connect(self.path)
+        self._connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def save(self, job: Job) -> None:
+        self._connection.execute(
+            f"INSERT OR REPLACE INTO jobs ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})", job.row()
+        )
+
+    def get(self, job_id: str) -> Optional[Job]:
+        row = self._connection.execute(f"SELECT {', '.join(COLUMNS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return Job.from_row(row) if row is not None else None
+
+    def unfinished(self) -> List[Job]:
+        """Queued and interrupted jobs, oldest first"""
+        rows = self._connection.execute(
+            f"SELECT {', '.join(COLUMNS)} FROM jobs WHERE status IN ('queued', 'running') ORDER BY created_at"
+        ).fetchall()
+        return [Job.from_row(row) for row in rows]
+
+    def for_user(self, user_id: str, limit: int) -> List[Job]:
+        rows = self._connection.execute(
+            f"SELECT {', '.join(COLUMNS)} FROM jobs WHERE user_id = ? ORDER BY created_at DESC LIMIT ?", (user_id, limit)
+        ).fetchall()
+        return [Job.from_row(row) for row in rows]
+
+    def purge(self, before: float) -> int:
+        """Delete jobs that finished before `before`"""
+        cursor = self._connection.execute(
+            "DELETE FROM jobs WHERE status IN ('succeeded', 'failed', 'cancelled') AND finished_at < ?", (before,)
+        )
+        return cursor.rowcount
+
+
+class JobQueue:
+    """Durable priority queue of agent jobs with a bounded worker pool"""
+
+    def __init__(self, store: JobStore, workers: int = 4, max_queued: int = 1000, retention: float = 86400.0):
+        self.store = store
+        self.workers = workers
+        self.max_queued = max_queued
+        self.retention = retention
+        self._runners: Dict[str, AgentHandler] = {}
+        self._live: Dict[str, Job] = {}
+        self._recent: TTLCache[Job] = TTLCache(maxsize=RECENT_JOBS, ttl=300.0)
+        self._waiters: Dict[str, List[asyncio.Future]] = {}
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._order = itertools.count()
+        self._tasks: List[asyncio.Task] = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.wait_time = metrics.Histogram(JOB_BUCKETS)
+        self.run_time = metrics.Histogram(JOB_BUCKETS)
+        self._outcomes: Dict[tuple, int] = {}
+
+    def register(self, agent: str, runner: AgentHandler) -> None:
+        """Make an agent runnable as a job; `runner` skips the rate limits already applied at submit"""
+        self._runners[agent] = runner
+
+    def runnable(self, agent: str) -> bool:
+        return agent in self._runners
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def _db(self, fn: Callable[..., T], *args) -> T:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def start(self) -> None:
+        """Open the store, requeue unfinished jobs and start the workers"""
+        if self.running:
+            return
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="job-store")
+        self._queue = asyncio.PriorityQueue()
+        await self._db(self.store.open)
+        purged = await self._db(self.store.purge, time.time() - self.retention)
+        recovered = await self._db(self.store.unfinished)
+        for job in recovered:
+            if job.status == "running":
+                job.status, job.started_at = "queued", None
+                await self._db(self.store.save, job)
+            self._enqueue(job)
+        if recovered or purged:
+            logger.info("Job queue: %d unfinished jobs requeued, %d finished jobs purged", len(recovered), purged)
+        self._tasks = [asyncio.get_running_loop().create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Stop the workers; interrupted jobs stay unfinished and run again on the next start"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._executor is not None:
+            await self._db(self.store.close)
+            self._executor.shutdown()
+            self._executor = None
+        self._live.clear()
+        self._recent.clear()
+
+    def _enqueue(self, job: Job) -> None:
+        self._live[job.id] = job
+        self._queue.put_nowait((PRIORITIES[job.priority], next(self._order), job.id))
+
+    def queued(self) -> int:
+        return sum(1 for job in self._live.values() if job.status == "queued")
+
+    async def submit(self, agent: str, message: str, principal: Principal, priority: str = "normal") -> Job:
+        """Store a job and queue it; raises HTTPException 503 when the queue is full or stopped"""
+        if not self.running:
+            raise HTTPException(status_code=503, detail="Job queue is not running")
+        if self.queued() >= self.max_queued:
+            raise HTTPException(status_code=503, detail="Job queue is full, try again later", headers={"Retry-After": "5"})
+        job = Job(
+            id=f"job_{secrets.token_hex(8)}", agent=agent, user_id=principal.user_id, role=principal.role,
+            message=message, priority=priority, created_at=time.time(),
+        )
+        await self._db(self.store.save, job)
+        self._enqueue(job)
+        self._count(agent, "submitted")
+        return job
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        job = self._live.get(job_id) or self._recent.get(job_id)
+        if job is None and self._executor is not None:
+            job = await self._db(self.store.get, job_id)
+        return job
+
+    async def for_user(self, user_id: str, limit: int = 20) -> List[Job]:
+        return await self._db(self.store.for_user, user_id, limit)
+
+    async def cancel(self, job_id: str) -> Job:
+        """Cancel a queued job; raises HTTPException 409 once it has started"""
+        job = self._live.get(job_id)
+        if job is None or job.status != "queued":
+            raise HTTPException(status_code=409, detail="Only queued jobs can be cancelled")
+        await self._finish(job, "cancelled")
+        return job
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[Job]:
+        """The job once finished, or as it is after `timeout` seconds"""
+        job = await self.get(job_id)
+        deadline = time.monotonic() + timeout
+        while job is not None and not job.done:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                job = await asyncio.wait_for(self._changed(job_id), remaining)
+            except asyncio.TimeoutError:
+                break
+        return job
+
+    async def changes(self, job_id: str) -> AsyncIterator[Job]:
+        """
+        Snapshots of the job now and after every state change, ending with
+        its final state. The next change is awaited from before each yield,
+        so changes made while the consumer is busy are not missed (several
+        of them may arrive as one snapshot of the latest state).
+        """
+        job = await self.get(job_id)
+        while job is not None:
+            changed = None if job.done else self._changed(job_id)
+            yield replace(job)
+            if changed is None:
+                return
+            job = await changed
+
+    def _changed(self, job_id: str) -> "asyncio.Future[Job]":
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(job_id, []).append(future)
+        return future
+
+    def _notify(self, job: Job) -> None:
+        for future in self._waiters.pop(job.id, ()):
+            if not future.done():
+                future.set_result(job)
+
+    def _count(self, agent: str, outcome: str) -> None:
+        self._outcomes[(agent, outcome)] = self._outcomes.get((agent, outcome), 0) + 1
+
+    async def _finish(self, job: Job, status: str, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None) -> None:
+        job.status, job.finished_at, job.result, job.error = status, time.time(), result, error
+        if job.started_at is not None:
+            self.run_time.observe(job.finished_at - job.started_at)
+        await self._db(self.store.save, job)
+        self._live.pop(job.id, None)
+        self._recent.set(job.id, job)
+        self._count(job.agent, status)
+        self._notify(job)
+
+    async def _worker(self) -> None:
+        while True:
+            _, _, job_id = await self._queue.get()
+            job = self._live.get(job_id)
+            if job is None or job.status != "queued":
+                continue
+            try:
+                await self._run(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Job %s could not be recorded", job.id)
+
+    async def _run(self, job: Job) -> None:
+        runner = self._runners.get(job.agent)
+        if runner is None:
+            await self._finish(job, "failed", error=f"Agent {job.agent} is not available for jobs")
+            return
+        job.status, job.started_at = "running", time.time()
+        self.wait_time.observe(job.started_at - job.created_at)
+        await self._db(self.store.save, job)
+        self._notify(job)
+        # Run as the submitter, so per-user state (limits, memory) applies to them
+        current_principal.set(TokenClaims(user_id=job.user_id, role=job.role, expires_at=0))
+        try:
+            result = response_dict(await runner(AgentRequest(message=job.message)))
+        except asyncio.CancelledError:
+            # Shutting down: leave the job unfinished so it runs again after a restart
+            job.status, job.started_at = "queued", None
+            raise
+        except HTTPException as exc:
+            await self._finish(job, "failed", error=str(exc.detail))
+        except Exception:
+            logger.exception("Job %s (%s) failed", job.id, job.agent)
+            await self._finish(job, "failed", error="Agent failed to respond")
+        else:
+            await self._finish(job, "succeeded", result=result)
+
+    def snapshot(self) -> Dict[str, Any]:
+        by_priority = dict.fromkeys(PRIORITIES, 0)
+        for job in self._live.values():
+            if job.status == "queued":
+                by_priority[job.priority] += 1
+        return {
+            "workers": self.workers,
+            "queued": by_priority,
+            "running": sum(1 for job in self._live.values() if job.status == "running"),
+            "agents": sorted(self._runners),
+        }
+
+    def metric_lines(self) -> List[str]:
+        state = self.snapshot()
+        return (
+            metrics.family("itt_jobs_queue_depth", "gauge", "Jobs waiting for a worker",
+                           [({"priority": priority}, count) for priority, count in state["queued"].items()])
+            + metrics.family("itt_jobs_running", "gauge", "Jobs being run by a worker", [({}, state["running"])])
+            + metrics.family("itt_jobs_total", "counter", "Jobs submitted and finished by agent and outcome",
+                             [({"agent": agent, "outcome": outcome}, count)
+                              for (agent, outcome), count in sorted(self._outcomes.items())])
+            + metrics.histogram("itt_job_wait_seconds", "Time jobs spent queued before a worker started them",
+                                [({}, self.wait_time)])
+            + metrics.histogram("itt_job_run_seconds", "Time from a job starting to it finishing", [({}, self.run_time)])
+        )
+
+
+def _queue_from_env() -> JobQueue:
+    return JobQueue(
+        JobStore(os.getenv("ITT_JOBS_DB") or str(storage.DATA_DIR / "jobs.db")),
+        workers=int(os.getenv("ITT_JOB_WORKERS", "4")),
+        max_queued=int(os.getenv("ITT_JOB_QUEUE_SIZE", "1000")),
+        retention=float(os.getenv("ITT_JOB_RETENTION", "86400")),
+    )
+
+
+queue = _queue_from_env()
+metrics.register_collector(queue.metric_lines)
+
+
+def register(agent: str, runner: AgentHandler) -> None:
+    """Make an agent runnable as a job on the shared queue"""
+    queue.register(agent, runner)
@@ -0,0 +1,160 @@
+"""
+Central latency simulation for the mock endpoints.
+
+Every endpoint awaits ``latency.simulate("<endpoint>")`` instead of sleeping
+inline. Each endpoint registers a default profile (fixed, uniform or
+lognormal) and deployments can override them without touching handlers:
+
+- ``ITT_LATENCY_MODE``   ``simulated`` (default) or ``off`` for zero latency
+- ``ITT_LATENCY_SCALE``  multiplier applied to every sampled delay
+- ``ITT_LATENCY_CONFIG`` path to a JSON file of per-endpoint overrides, e.g.
+  ``{"sales-deck": {"distribution": "lognormal", "median": 1.5, "sigma": 0.4},
+  "*": {"distribution": "fixed", "seconds": 0.05}}``
+
+In ``off`` mode ``simulate`` returns without suspending, so load tests
+exercise the real request path with no sleeps at all.
+"""
+import asyncio
+import json
+import math
+import os
+import random
+from dataclasses import dataclass
+from typing import Dict, Literal, Mapping, Optional
+
+Distribution = Literal["fixed", "uniform", "lognormal"]
+LatencyMode = Literal["simulated", "off"]
+
+
+@dataclass(frozen=True)
+class LatencyProfile:
+    """Delay distribution for one endpoint (all values in seconds)"""
+    distribution: Distribution
+    low: float = 0.0
+    high: float = 0.0
+    median: float = 0.0
+    sigma: float = 0.0
+    maximum: Optional[float] = None
+
+    def sample(self, rng: random.Random) -> float:
+        """Draw one delay from the distribution"""
+        if self.distribution == "fixed":
+            delay = self.low
+        elif self.distribution == "uniform":
+            delay = rng.uniform(self.low, self.high)
+        else:
+            delay = rng.lognormvariate(math.log(self.median), self.sigma) if self.median > 0 else 0.0
+        if self.maximum is not None:
+            delay = min(delay, self.maximum)
+        return max(delay, 0.0)
+
+
+def fixed(seconds: float) -> LatencyProfile:
+    """Always wait exactly `seconds`"""
+    return LatencyProfile("fixed", low=seconds, high=seconds)
+
+
+def uniform(low: float, high: float) -> LatencyProfile:
+    """Wait a uniformly distributed time between `low` and `high`"""
+    return LatencyProfile("uniform", low=low, high=high)
+
+
+def lognormal(median: float, sigma: float, maximum: Optional[float] = None) -> LatencyProfile:
+    """Wait a lognormally distributed time (long right tail, like real models)"""
+    return LatencyProfile("lognormal", median=median, sigma=sigma, maximum=maximum)
+
+
+def profile_from_dict(spec: Mapping) -> LatencyProfile:
+    """Build a profile from a JSON config entry"""
+    distribution = spec.get("distribution", "fixed")
+    if distribution == "fixed":
+        return fixed(float(spec.get("seconds", 0.0)))
+    if distribution == "uniform":
+        return uniform(float(spec["low"]), float(spec["high"]))
+    if distribution == "lognormal":
+        maximum = spec.get("max")
+        return lognormal(float(spec["median"]), float(spec.get("sigma", 0.25)), float(maximum) if maximum is not None else None)
+    raise ValueError(f"Unknown latency distribution: {distribution}")
+
+
+class LatencyScheduler:
+    """Samples and awaits per-endpoint delays without blocking the event loop"""
+
+    def __init__(self, mode: LatencyMode = "simulated", scale: float = 1.0, seed: Optional[int] = None):
+        self.mode: LatencyMode = mode
+        self.scale = scale
+        self._rng = random.Random(seed)
+        self._defaults: Dict[str, LatencyProfile] = {}
+        self._overrides: Dict[str, LatencyProfile] = {}
+
+    def register_defaults(self, profiles: Mapping[str, LatencyProfile]) -> None:
+        """Register the built-in profiles for a group of endpoints"""
+        self._defaults.update(profiles)
+
+    def configure(self, endpoint: str, profile: LatencyProfile) -> None:
+        """Override the profile for one endpoint (``*`` applies to all)"""
+        self._overrides[endpoint] = profile
+
+    def set_mode(self, mode: LatencyMode) -> None:
+        """Switch between simulated and zero latency at runtime"""
+        self.mode = mode
+
+    def load_config(self, path: str) -> None:
+        """Load per-endpoint overrides from a JSON file"""
+        with open(path) as f:
+            config = json.load(f)
+        for endpoint, spec in config.items():
+            self.configure(endpoint, profile_from_dict(spec))
+
+    def profile(self, endpoint: str) -> Optional[LatencyProfile]:
+        """Return the effective profile for an endpoint"""
+        return self._overrides.get(endpoint) or self._overrides.get("*") or self._defaults.get(endpoint)
+
+    def profiles(self) -> Dict[str, LatencyProfile]:
+        """Return the effective profile of every registered endpoint"""
+        return {endpoint: self.profile(endpoint) for endpoint in {**self._defaults, **self._overrides} if endpoint != "*"}
+
+    def sample(self, endpoint: str) -> float:
+        """Draw the delay the next request to `endpoint` would wait"""
+        if self.mode == "off":
+            return 0.0
+        profile = self.profile(endpoint)
+        if profile is None:
+            return 0.0
+        return profile.sample(self._rng) * self.scale
+
+    async def simulate(self, endpoint: str) -> float:
+        """Await the simulated delay for an endpoint and return it"""
+        delay = self.sample(endpoint)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+
+def _scheduler_from_env() -> LatencyScheduler:
+    mode = os.getenv("ITT_LATENCY_MODE", "simulated").lower()
+    if mode not in ("simulated", "off"):
+        raise ValueError(f"ITT_LATENCY_MODE must be 'simulated' or 'off', got {mode!r}")
+    seed = os.getenv("ITT_LATENCY_SEED")
+    result = LatencyScheduler(
+        mode=mode,
+        scale=float(os.getenv("ITT_LATENCY_SCALE", "1.0")),
+        seed=int(seed) if seed is not None else None,
+    )
+    config_path = os.getenv("ITT_LATENCY_CONFIG")
+    if config_path:
+        result.load_config(config_path)
+    return result
+
+
+scheduler = _scheduler_from_env()
+
+
+def register_defaults(profiles: Mapping[str, LatencyProfile]) -> None:
+    """Register built-in profiles on the shared scheduler"""
+    scheduler.register_defaults(profiles)
+
+
+async def simulate(endpoint: str) -> float:
+    """Await the simulated delay for an endpoint on the shared scheduler"""
+    return await scheduler.simulate(endpoint)
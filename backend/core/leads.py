@@ -0,0 +1,495 @@
+"""
+Lead store and batch lead scoring for the Lead Generator agent.
+
+Leads are bulk-imported from CSV (a header row, then one lead per line) or
+NDJSON streamed to ``POST /api/marketing/leads/import``. The body is read
+as it arrives and every ``ITT_LEAD_BATCH`` rows are parsed in a worker
+thread and written as one immutable segment: one NumPy array per numeric
+column (company size, industry code, email opens, clicks, site visits,
+demo requested, decision maker, last contact day) plus the id, name and
+company text. Segments are memory-mapped when loaded, so startup does not
+parse anything. Imports append: a lead imported twice is two rows.
+
+Scores are a weighted sum of normalized features computed with whole-column
+NumPy operations, never row by row:
+
+- ``size``           ``log10(employees + 1) / 4``, capped at 1 (10,000 employees)
+- ``industry``       the industry's weight (``INDUSTRY_WEIGHTS``, others ``DEFAULT_INDUSTRY_WEIGHT``)
+- ``opens`` / ``clicks`` / ``visits``  engagement counts against 10 / 5 / 10, capped at 1
+- ``demo`` / ``decisionMaker``         1 when set
+- ``recency``        ``exp(-days since last contact / 30)``
+
+scaled to 0-100: ``hot`` from 80, ``warm`` from 50, ``cold`` below. Tier
+counts (overall and per industry) and the score total are kept as
+aggregates: an import scores only its new rows and adds their counts, so
+the agent's numbers never require a scan. Changing the weights re-scores
+every lead in one vectorized pass and rebuilds the aggregates; so does the
+first read on a new day, because recency ages.
+
+- ``ITT_LEAD_DIR``    lead store directory (default ``leads/`` in ``ITT_DATA_DIR``)
+- ``ITT_LEAD_BATCH``  rows parsed and written per segment during an import (default 50000)
+"""
+import asyncio
+import json
+import logging
+import os
+import re
+import shutil
+import time
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from core import metrics, storage, uploads
+
+try:
+    import fcntl
+except ImportError:  # POSIX only; elsewhere a single writer process is assumed
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+TIERS = ("hot", "warm", "cold")
+HOT, WARM = 80.0, 50.0
+
+WEIGHTS = {"size": 20.0, "industry": 20.0, "opens": 10.0, "clicks": 10.0, "visits": 10.0,
+           "demo": 15.0, "decisionMaker": 10.0, "recency": 5.0}
+
+INDUSTRY_WEIGHTS = {"technology": 1.0, "financial services": 0.9, "healthcare": 0.8, "manufacturing": 0.6,
+                    "government": 0.5, "retail": 0.5, "education": 0.4}
+DEFAULT_INDUSTRY_WEIGHT = 0.3
+
+# Numeric columns and their on-disk types
+NUMERIC = {"employees": np.int32, "industry": np.uint16, "opens": np.int32, "clicks": np.int32, "visits": np.int32,
+           "demo": np.bool_, "decision_maker": np.bool_, "last_contact": np.int32}
+TEXT = ("id", "name", "company")
+
+# Accepted input names per column, compared lowercase without punctuation
+ALIASES = {
+    "id": ("id", "leadid"),
+    "name": ("name", "contact", "contactname"),
+    "company": ("company", "account", "companyname"),
+    "industry": ("industry",),
+    "employees": ("employees", "companysize", "size", "headcount"),
+    "opens": ("opens", "emailopens"),
+    "clicks": ("clicks", "emailclicks"),
+    "visits": ("visits", "sitevisits", "websitevisits"),
+    "demo": ("demo", "demorequested"),
+    "decision_maker": ("decisionmaker",),
+    "last_contact": ("lastcontact", "lastcontacted", "lastactivity"),
+}
+_FIELD = {alias: column for column, aliases in ALIASES.items() for alias in aliases}
+
+_EPOCH = date(1970, 1, 1).toordinal()
+_TRUE = frozenset(("1", "true", "yes", "y", "t"))
+
+
+def _key(name: str) -> str:
+    return re.sub(r"[^a-z0-9]", "", name.lower())
+
+
+_COUNT_MAX = int(np.iinfo(np.int32).max)
+
+
+def _count(value: Any) -> int:
+    """A non-negative count that fits its int32 column (ValueError otherwise)"""
+    count = max(0, int(float(value))) if value not in (None, "") else 0
+    if count > _COUNT_MAX:
+        raise ValueError(f"{value!r} is out of range")
+    return count
+
+
+def _day(value: Any) -> int:
+    """Days since 1970-01-01 of an ISO date (-1 when unknown)"""
+    return date.fromisoformat(str(value)[:10]).toordinal() - _EPOCH if value not in (None, "") else -1
+
+
+def today() -> int:
+    return date.today().toordinal() - _EPOCH
+
+
+def score(columns: Dict[str, np.ndarray], weights: Dict[str, float], industry_weights: np.ndarray, day: int) -> np.ndarray:
+    """Scores 0-100 for whole columns at once"""
+    total = sum(weights.values()) or 1.0
+    since = np.where(columns["last_contact"] >= 0, day - columns["last_contact"].astype(np.float32), np.inf)
+    features = {
+        "size": np.minimum(np.log10(columns["employees"].astype(np.float32) + 1.0) / 4.0, 1.0),
+        "industry": industry_weights[columns["industry"]],
+        "opens": np.minimum(columns["opens"] / np.float32(10.0), 1.0),
+        "clicks": np.minimum(columns["clicks"] / np.float32(5.0), 1.0),
+        "visits": np.minimum(columns["visits"] / np.float32(10.0), 1.0),
+        "demo": columns["demo"],
+        "decisionMaker": columns["decision_maker"],
+        "recency": np.exp(-np.maximum(since, 0.0) / np.float32(30.0)),
+    }
+    scores = np.zeros(len(columns["employees"]), dtype=np.float32)
+    for name, weight in weights.items():
+        if weight:
+            scores += np.float32(weight) * features[name]
+    return scores * np.float32(100.0 / total)
+
+
+def tiers_of(scores: np.ndarray) -> np.ndarray:
+    return np.where(scores >= HOT, 0, np.where(scores >= WARM, 1, 2)).astype(np.uint8)
+
+
+class Segment:
+    """One imported batch of leads, memory-mapped"""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.columns = {name: np.load(directory / f"{name}.npy", mmap_mode="r") for name in NUMERIC}
+        self.size = len(self.columns["employees"])
+        self._text = {name: (np.load(directory / f"{name}_offsets.npy"), directory / f"{name}.bin") for name in TEXT}
+
+    def text(self, name: str, row: int) -> str:
+        offsets, path = self._text[name]
+        with open(path, "rb") as f:
+            f.seek(int(offsets[row]))
+            return f.read(int(offsets[row + 1] - offsets[row])).decode()
+
+    @staticmethod
+    def write(directory: Path, columns: Dict[str, np.ndarray], text: Dict[str, List[str]]) -> None:
+        directory.mkdir()
+        for name, dtype in NUMERIC.items():
+            np.save(directory / f"{name}.npy", columns[name].astype(dtype))
+        for name in TEXT:
+            encoded = [value.encode() for value in text[name]]
+            offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+            np.cumsum([len(value) for value in encoded], out=offsets[1:])
+            (directory / f"{name}.bin").write_bytes(b"".join(encoded))
+            np.save(directory / f"{name}_offsets.npy", offsets)
+
+
+@dataclass
+class _Leads:
+    """Every loaded lead as concatenated columns, with scores and aggregates"""
+    segments: List[Segment]
+    starts: np.ndarray
+    columns: Dict[str, np.ndarray]
+    scores: np.ndarray
+    tiers: np.ndarray
+    tier_counts: np.ndarray
+    industry_tiers: np.ndarray
+    score_sum: float
+    scored_on: int
+
+    @property
+    def size(self) -> int:
+        return len(self.scores)
+
+
+class LeadStore:
+    """Columnar lead segments with vectorized scoring and incrementally maintained tier counts"""
+
+    def __init__(self, root: Path, batch: int = 50000):
+        self.root = root
+        self.batch = batch
+        self.weights = dict(WEIGHTS)
+        self.industry_weights = dict(INDUSTRY_WEIGHTS)
+        self.industries: List[str] = []
+        self._leads: Optional[_Leads] = None
+        self._root_mtime = 0
+        self._lock: Optional[asyncio.Lock] = None
+        self.imported = 0
+        self.rejected = 0
+        self.rescores = 0
+        self.last_rescore_seconds = 0.0
+        self.import_time = metrics.Histogram((0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0))
+
+    @property
+    def lock(self) -> asyncio.Lock:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    # Loading, parsing, writing and scoring run in worker threads
+
+    def _segment_dirs(self) -> List[Path]:
+        return sorted(self.root.glob("segment-*"), key=lambda path: int(path.name[8:]))
+
+    def _read_settings(self) -> None:
+        try:
+            self.industries = json.loads((self.root / "industries.json").read_text())
+        except FileNotFoundError:
+            self.industries = []
+        try:
+            settings = json.loads((self.root / "weights.json").read_text())
+            self.weights = {**WEIGHTS, **settings.get("weights", {})}
+            self.industry_weights = {**INDUSTRY_WEIGHTS, **settings.get("industries", {})}
+        except FileNotFoundError:
+            pass
+
+    def _industry_array(self) -> np.ndarray:
+        return np.array([self.industry_weights.get(name, DEFAULT_INDUSTRY_WEIGHT) for name in self.industries] or [0.0],
+                        dtype=np.float32)
+
+    def _aggregate(self, segments: List[Segment], columns: Dict[str, np.ndarray], scores: np.ndarray, day: int) -> _Leads:
+        tiers = tiers_of(scores)
+        industry_tiers = np.zeros((max(len(self.industries), 1), len(TIERS)), dtype=np.int64)
+        np.add.at(industry_tiers, (columns["industry"].astype(np.int64), tiers.astype(np.int64)), 1)
+        return _Leads(
+            segments=segments,
+            starts=np.cumsum([0] + [segment.size for segment in segments]),
+            columns=columns,
+            scores=scores,
+            tiers=tiers,
+            tier_counts=np.bincount(tiers, minlength=len(TIERS)).astype(np.int64),
+            industry_tiers=industry_tiers,
+            score_sum=float(scores.sum(dtype=np.float64)),
+            scored_on=day,
+        )
+
+    def _load(self) -> _Leads:
+        """Every segment on disk, fully scored"""
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._read_settings()
+        segments = [Segment(directory) for directory in self._segment_dirs()]
+        columns = {name: np.concatenate([segment.columns[name] for segment in segments]) if segments
+                   else np.zeros(0, dtype=dtype) for name, dtype in NUMERIC.items()}
+        day = today()
+        return self._aggregate(segments, columns, score(columns, self.weights, self._industry_array(), day), day)
+
+    def _rescore(self, leads: _Leads) -> _Leads:
+        day = today()
+        return self._aggregate(leads.segments, leads.columns, score(leads.columns, self.weights, self._industry_array(), day), day)
+
+    def _parse(self, rows: Sequence[Dict[str, Any]]) -> Tuple[Dict[str, np.ndarray], Dict[str, List[str]], int]:
+        """Column arrays from parsed records, skipping rows with unusable values"""
+        values: Dict[str, List[Any]] = {name: [] for name in (*NUMERIC, *TEXT)}
+        codes = {name: code for code, name in enumerate(self.industries)}
+        rejected = 0
+        # Records of one upload share their field names: map each name once
+        mapped: Dict[str, Optional[str]] = {}
+        for record in rows:
+            fields = {}
+            for name, value in record.items():
+                column = mapped.get(name, "")
+                if column == "":
+                    column = mapped[name] = _FIELD.get(_key(str(name)))
+                if column is not None:
+                    fields[column] = value
+            try:
+                parsed = (_count(fields.get("employees")), _count(fields.get("opens")), _count(fields.get("clicks")),
+                          _count(fields.get("visits")), _day(fields.get("last_contact")))
+            except (TypeError, ValueError, OverflowError):
+                rejected += 1
+                continue
+            industry = str(fields.get("industry") or "").strip().lower()
+            code = codes.get(industry)
+            if code is None and len(self.industries) > np.iinfo(np.uint16).max:
+                rejected += 1
+                continue
+            if code is None:
+                code = codes[industry] = len(self.industries)
+                self.industries.append(industry)
+            for name, value in zip(("employees", "opens", "clicks", "visits", "last_contact"), parsed):
+                values[name].append(value)
+            values["industry"].append(code)
+            values["demo"].append(str(fields.get("demo", "")).strip().lower() in _TRUE)
+            values["decision_maker"].append(str(fields.get("decision_maker", "")).strip().lower() in _TRUE)
+            for name in TEXT:
+                values[name].append(str(fields.get(name) or ""))
+        columns = {name: np.array(values[name], dtype=dtype) for name, dtype in NUMERIC.items()}
+        return columns, {name: values[name] for name in TEXT}, rejected
+
+    def _add(self, leads: _Leads, segments: List[Segment], known: int) -> _Leads:
+        """Leads with new segments appended, scoring only their rows"""
+        merged = {name: np.concatenate([leads.columns[name], *(segment.columns[name] for segment in segments)])
+                  for name in NUMERIC}
+        if len(self.industries) > known or leads.scored_on != today():
+            # New industries change the weight table's shape; a new day ages recency
+            return self._aggregate(leads.segments + segments, merged,
+                                   score(merged, self.weights, self._industry_array(), today()), today())
+        columns = {name: merged[name][leads.size:] for name in NUMERIC}
+        scores = score(columns, self.weights, self._industry_array(), leads.scored_on)
+        tiers = tiers_of(scores)
+        industry_tiers = leads.industry_tiers.copy()
+        np.add.at(industry_tiers, (columns["industry"].astype(np.int64), tiers.astype(np.int64)), 1)
+        return _Leads(
+            segments=leads.segments + segments,
+            starts=np.concatenate([leads.starts, leads.starts[-1] + np.cumsum([segment.size for segment in segments])]),
+            columns=merged,
+            scores=np.concatenate([leads.scores, scores]),
+            tiers=np.concatenate([leads.tiers, tiers]),
+            tier_counts=leads.tier_counts + np.bincount(tiers, minlength=len(TIERS)),
+            industry_tiers=industry_tiers,
+            score_sum=leads.score_sum + float(scores.sum(dtype=np.float64)),
+            scored_on=leads.scored_on,
+        )
+
+    def _refresh(self, leads: _Leads) -> _Leads:
+        """Pick up segments and weights written by other processes"""
+        known, weights = len(self.industries), (self.weights, self.industry_weights)
+        self._read_settings()
+        if (self.weights, self.industry_weights) != weights:
+            return self._load()
+        loaded = {segment.directory.name for segment in leads.segments}
+        new = [Segment(directory) for directory in self._segment_dirs() if directory.name not in loaded]
+        return self._add(leads, new, known) if new or len(self.industries) > known else leads
+
+    def _ingest(self, leads: _Leads, rows: Sequence[Dict[str, Any]]) -> Tuple[_Leads, int, int]:
+        """Write a batch as a new segment and add it, scored, to the aggregates"""
+        with open(self.root / "lock", "w") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            leads = self._refresh(leads)
+            known = len(self.industries)
+            columns, text, rejected = self._parse(rows)
+            if not len(columns["employees"]):
+                return leads, 0, rejected
+            existing = self._segment_dirs()
+            number = int(existing[-1].name[8:]) + 1 if existing else 1
+            staging = self.root / f"tmp-{os.getpid()}-{number}"
+            shutil.rmtree(staging, ignore_errors=True)
+            Segment.write(staging, columns, text)
+            (self.root / "industries.json.tmp").write_text(json.dumps(self.industries))
+            os.replace(self.root / "industries.json.tmp", self.root / "industries.json")
+            directory = self.root / f"segment-{number}"
+            os.rename(staging, directory)
+        segment = Segment(directory)
+        return self._add(leads, [segment], known), segment.size, rejected
+
+    def _changed_on_disk(self) -> bool:
+        try:
+            return os.stat(self.root).st_mtime_ns != self._root_mtime
+        except FileNotFoundError:
+            return False
+
+    async def ensure(self) -> _Leads:
+        """Loaded leads, scored as of today and including other processes' imports"""
+        if self._leads is None:
+            async with self.lock:
+                if self._leads is None:
+                    self._leads = await asyncio.to_thread(self._load)
+                    self._root_mtime = os.stat(self.root).st_mtime_ns
+        elif self._changed_on_disk():
+            async with self.lock:
+                self._root_mtime = os.stat(self.root).st_mtime_ns
+                self._leads = await asyncio.to_thread(self._refresh, self._leads)
+        if self._leads.scored_on != today():
+            await self.rescore()
+        return self._leads
+
+    async def import_stream(self, chunks: AsyncIterator[bytes], kind: str) -> Dict[str, Any]:
+        """Import a streamed CSV or NDJSON body, one segment per ``batch`` rows"""
+        await self.ensure()
+        started = time.perf_counter()
+        imported = rejected = 0
+        async with self.lock:
+            async for rows, skipped in uploads.batches(chunks, kind, self.batch):
+                rejected += skipped
+                if rows:
+                    self._leads, added, invalid = await asyncio.to_thread(self._ingest, self._leads, rows)
+                    imported += added
+                    rejected += invalid
+        seconds = time.perf_counter() - started
+        self.imported += imported
+        self.rejected += rejected
+        self.import_time.observe(seconds)
+        logger.info("Imported %d leads (%d rejected) in %.1f s", imported, rejected, seconds)
+        return {"imported": imported, "rejected": rejected, "seconds": round(seconds, 3), **self.summary()}
+
+    async def rescore(self) -> float:
+        """Score every lead with the current weights and rebuild the aggregates"""
+        async with self.lock:
+            started = time.perf_counter()
+            leads = self._leads if self._leads is not None else await asyncio.to_thread(self._load)
+            self._leads = await asyncio.to_thread(self._rescore, leads)
+            self.rescores += 1
+            self.last_rescore_seconds = time.perf_counter() - started
+            return self.last_rescore_seconds
+
+    async def configure(self, weights: Dict[str, float], industries: Dict[str, float]) -> float:
+        """Change scoring weights, persist them and re-score every lead"""
+        unknown = set(weights) - set(WEIGHTS)
+        if unknown:
+            raise ValueError(f"Unknown weights {sorted(unknown)}; known: {sorted(WEIGHTS)}")
+        if any(value < 0 for value in (*weights.values(), *industries.values())):
+            raise ValueError("Weights must not be negative")
+        await self.ensure()
+        self.weights = {**self.weights, **weights}
+        self.industry_weights = {**self.industry_weights, **{name.strip().lower(): value for name, value in industries.items()}}
+        settings = {"weights": self.weights, "industries": self.industry_weights}
+        (self.root / "weights.json.tmp").write_text(json.dumps(settings, indent=2))
+        os.replace(self.root / "weights.json.tmp", self.root / "weights.json")
+        return await self.rescore()
+
+    def top(self, count: int = 5, tier: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Highest-scoring leads, optionally within one tier"""
+        leads = self._leads
+        if leads is None or not leads.size:
+            return []
+        candidates = np.flatnonzero(leads.tiers == TIERS.index(tier)) if tier else np.arange(leads.size)
+        if len(candidates) > count:
+            candidates = candidates[np.argpartition(leads.scores[candidates], -count)[-count:]]
+        candidates = candidates[np.argsort(-leads.scores[candidates], kind="stable")]
+        result = []
+        for row in candidates.tolist():
+            position = int(np.searchsorted(leads.starts, row, side="right")) - 1
+            segment, local = leads.segments[position], row - int(leads.starts[position])
+            result.append({
+                **{name: segment.text(name, local) for name in TEXT},
+                "industry": self.industries[int(leads.columns["industry"][row])] or None,
+                "score": round(float(leads.scores[row]), 1),
+                "tier": TIERS[int(leads.tiers[row])],
+            })
+        return result
+
+    def summary(self) -> Dict[str, Any]:
+        """Tier counts and average score from the aggregates"""
+        leads = self._leads
+        counts = leads.tier_counts.tolist() if leads is not None else [0, 0, 0]
+        total = sum(counts)
+        return {
+            "totalLeads": total,
+            **{f"{tier}Leads": count for tier, count in zip(TIERS, counts)},
+            "averageScore": round(leads.score_sum / total, 1) if total else None,
+        }
+
+    def by_industry(self) -> Dict[str, Dict[str, int]]:
+        leads = self._leads
+        if leads is None:
+            return {}
+        return {
+            (self.industries[code] or "unknown"): dict(zip(TIERS, counts))
+            for code, counts in enumerate(leads.industry_tiers.tolist()) if code < len(self.industries) and sum(counts)
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        leads = self._leads
+        return {
+            **self.summary(),
+            "segments": len(leads.segments) if leads is not None else 0,
+            "weights": self.weights,
+            "industryWeights": self.industry_weights,
+            "imported": self.imported,
+            "rejected": self.rejected,
+            "rescores": self.rescores,
+            "lastRescoreSeconds": round(self.last_rescore_seconds, 3),
+        }
+
+    def metric_lines(self) -> List[str]:
+        leads = self._leads
+        counts = leads.tier_counts.tolist() if leads is not None else [0, 0, 0]
+        return (
+            metrics.family("itt_leads", "gauge", "Leads in the store by score tier",
+                           [({"tier": tier}, count) for tier, count in zip(TIERS, counts)])
+            + metrics.family("itt_leads_imported_total", "counter", "Leads imported", [({}, self.imported)])
+            + metrics.family("itt_leads_rejected_total", "counter", "Import rows rejected as unparseable", [({}, self.rejected)])
+            + metrics.histogram("itt_leads_import_seconds", "Time to import one upload", [({}, self.import_time)])
+        )
+
+
+def _store_from_env() -> LeadStore:
+    return LeadStore(
+        Path(os.getenv("ITT_LEAD_DIR") or storage.DATA_DIR / "leads"),
+        batch=int(os.getenv("ITT_LEAD_BATCH", "50000")),
+    )
+
+
+store = _store_from_env()
+metrics.register_collector(store.metric_lines)
@@ -0,0 +1,594 @@
+"""
+Transaction ledger and its rollups for the Budget Analyst and Financial Reporter.
+
+Transactions are bulk-appended from CSV (a header row, then one transaction
+per line) or NDJSON streamed to ``POST /api/finance/ledger/import``. A
+transaction has a ``date``, ``department``, ``account`` and ``amount``, and
+optionally a ``scenario`` (``actual``, the default, or ``budget``), the
+account ``type`` and ``cash`` (``false`` for non-cash entries such as
+depreciation).
+
+The ledger is partitioned by month: ``period-YYYY-MM/`` holds immutable
+append parts (one NumPy array per column: day, department code, account
+code, scenario, cash flag and amount in cents) and ``rollup.npz``, the
+amount and row count per department, account, scenario and cash flag for
+that month. An append writes one part per month it touches and folds only
+its own rows into those months' rollups, so queries never read the parts:
+P&L, cash-flow, budget variance and department / quarter / account
+breakdowns are sums over the rollups, which stay small however many
+transactions there are. A month whose rollup does not cover all of its
+parts (a crash between the two writes) is refolded from the parts on load.
+
+Account types drive the statements (unknown accounts are typed from their
+name, else ``expense``):
+
+- ``revenue`` - ``cogs`` = gross profit; gross profit - ``expense`` = net income
+- cash flow: operating = cash revenue - cash cogs and expenses,
+  investing = - ``capex``, financing = ``financing`` (signed, inflows positive)
+- budget variance: ``budget`` vs ``actual`` spend (cogs, expense and capex)
+
+- ``ITT_LEDGER_DIR``    ledger directory (default ``ledger/`` in ``ITT_DATA_DIR``)
+- ``ITT_LEDGER_BATCH``  rows parsed and appended per batch during an import (default 100000)
+"""
+import asyncio
+import json
+import logging
+import os
+import re
+import shutil
+import time
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from core import metrics, storage, uploads
+
+try:
+    import fcntl
+except ImportError:  # POSIX only; elsewhere a single writer process is assumed
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+TYPES = ("revenue", "cogs", "expense", "capex", "financing")
+REVENUE, COGS, EXPENSE, CAPEX, FINANCING = range(len(TYPES))
+SCENARIOS = ("actual", "budget")
+ACTUAL, BUDGET = range(len(SCENARIOS))
+
+# Account name fragments that imply a type, checked in order ("cost of sales" is cogs, not revenue)
+TYPE_HINTS = (
+    ("cogs", ("cost of", "cogs")),
+    ("revenue", ("revenue", "sales", "income")),
+    ("capex", ("capex", "capital", "equipment")),
+    ("financing", ("loan", "debt", "equity", "dividend", "financing")),
+)
+
+# Columns of a part and their on-disk types
+COLUMNS = {"day": np.int32, "department": np.uint16, "account": np.uint16, "scenario": np.uint8,
+           "cash": np.bool_, "cents": np.int64}
+
+# Accepted input names per field, compared lowercase without punctuation
+ALIASES = {
+    "date": ("date", "day", "postedon", "transactiondate"),
+    "department": ("department", "dept", "costcenter"),
+    "account": ("account", "accountname", "glaccount"),
+    "amount": ("amount", "value"),
+    "scenario": ("scenario", "kind"),
+    "type": ("type", "accounttype"),
+    "cash": ("cash",),
+}
+_FIELD = {alias: field for field, aliases in ALIASES.items() for alias in aliases}
+
+_EPOCH = date(1970, 1, 1).toordinal()
+# Largest amount accepted, in cents: parsed exactly from a float, and far from overflowing int64 rollup sums
+_CENTS_MAX = 2 ** 53
+_CODE_MAX = int(np.iinfo(np.uint16).max)
+_FALSE = frozenset(("0", "false", "no", "n", "f"))
+_MONTHS = ("january", "february", "march", "april", "may", "june", "july", "august", "september", "october",
+           "november", "december")
+
+
+def _key(name: str) -> str:
+    return re.sub(r"[^a-z0-9]", "", name.lower())
+
+
+def account_type(name: str) -> str:
+    lowered = name.lower()
+    for kind, hints in TYPE_HINTS:
+        if any(hint in lowered for hint in hints):
+            return kind
+    return "expense"
+
+
+def month_name(month: int) -> str:
+    """Month index (``year * 12 + month - 1``) -> ``"2024-10"``"""
+    return f"{month // 12:04d}-{month % 12 + 1:02d}"
+
+
+def period_window(period: str) -> Tuple[int, int]:
+    """``"2024"``, ``"2024-Q4"`` or ``"2024-10"`` -> first and last month index"""
+    match = re.fullmatch(r"(\d{4})(?:-(?:Q([1-4])|(\d{2})))?", period.strip().upper())
+    if not match or (match.group(3) and not 1 <= int(match.group(3)) <= 12):
+        raise ValueError(f"Unknown period {period!r}; use YYYY, YYYY-Qn or YYYY-MM")
+    year, quarter, month = int(match.group(1)), match.group(2), match.group(3)
+    if quarter:
+        first = year * 12 + (int(quarter) - 1) * 3
+        return first, first + 2
+    if month:
+        return year * 12 + int(month) - 1, year * 12 + int(month) - 1
+    return year * 12, year * 12 + 11
+
+
+def period_label(period: str) -> str:
+    """``"2024-Q4"`` -> ``"Q4 2024"``, ``"2024"`` -> ``"FY2024"``, ``"2024-10"`` -> ``"October 2024"``"""
+    first, last = period_window(period)
+    if first == last:
+        return f"{_MONTHS[first % 12].title()} {first // 12}"
+    if last - first == 2:
+        return f"Q{first % 12 // 3 + 1} {first // 12}"
+    return f"FY{first // 12}"
+
+
+def find_period(text: str) -> Optional[str]:
+    """A period mentioned in a message ("Q3 2024", "2024-Q3", "October 2024", "FY2023"), canonicalized"""
+    lowered = text.lower()
+    match = re.search(r"\bq([1-4])\s*(?:fy\s*)?((?:19|20)\d{2})\b", lowered)
+    if match:
+        return f"{match.group(2)}-Q{match.group(1)}"
+    match = re.search(r"\b((?:19|20)\d{2})[-\s]?q([1-4])\b", lowered)
+    if match:
+        return f"{match.group(1)}-Q{match.group(2)}"
+    match = re.search(r"\b(" + "|".join(_MONTHS) + r")\s+((?:19|20)\d{2})\b", lowered)
+    if match:
+        return f"{match.group(2)}-{_MONTHS.index(match.group(1)) + 1:02d}"
+    match = re.search(r"\b((?:19|20)\d{2})-(0[1-9]|1[0-2])\b", lowered)
+    if match:
+        return f"{match.group(1)}-{match.group(2)}"
+    match = re.search(r"\b(?:fy\s*)?((?:19|20)\d{2})\b", lowered)
+    return match.group(1) if match else None
+
+
+def _group_key(department: np.ndarray, account: np.ndarray, scenario: np.ndarray, cash: np.ndarray) -> np.ndarray:
+    return ((department.astype(np.int64) << 18) | (account.astype(np.int64) << 2)
+            | (scenario.astype(np.int64) << 1) | cash.astype(np.int64))
+
+
+def _group(keys: np.ndarray, cents: np.ndarray, counts: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Sum amounts and counts per key (exact int64 sums, keys sorted)"""
+    if not len(keys):
+        return keys, cents, counts
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    return keys[starts], np.add.reduceat(cents[order], starts), np.add.reduceat(counts[order], starts)
+
+
+@dataclass
+class _Rollup:
+    """Amount and row count per group key for one month, covering its first ``parts`` parts"""
+    keys: np.ndarray
+    cents: np.ndarray
+    counts: np.ndarray
+    parts: int
+
+    @classmethod
+    def empty(cls) -> "_Rollup":
+        return cls(np.zeros(0, np.int64), np.zeros(0, np.int64), np.zeros(0, np.int64), 0)
+
+    def fold(self, columns: Dict[str, np.ndarray], parts: int) -> "_Rollup":
+        keys = _group_key(columns["department"], columns["account"], columns["scenario"], columns["cash"])
+        grouped = _group(np.concatenate([self.keys, keys]), np.concatenate([self.cents, columns["cents"]]),
+                         np.concatenate([self.counts, np.ones(len(keys), np.int64)]))
+        return _Rollup(*grouped, parts=self.parts + parts)
+
+
+@dataclass
+class _Cube:
+    """Every month's rollup, concatenated and decoded: what queries sum over"""
+    rollups: Dict[int, _Rollup]
+    month: np.ndarray
+    department: np.ndarray
+    account: np.ndarray
+    scenario: np.ndarray
+    cash: np.ndarray
+    cents: np.ndarray
+    counts: np.ndarray
+
+    @classmethod
+    def of(cls, rollups: Dict[int, _Rollup]) -> "_Cube":
+        months = sorted(rollups)
+        keys = np.concatenate([rollups[month].keys for month in months] or [np.zeros(0, np.int64)])
+        return cls(
+            rollups=rollups,
+            month=np.repeat(np.array(months, dtype=np.int64), [len(rollups[month].keys) for month in months]),
+            department=keys >> 18,
+            account=(keys >> 2) & 0xFFFF,
+            scenario=(keys >> 1) & 1,
+            cash=(keys & 1).astype(bool),
+            cents=np.concatenate([rollups[month].cents for month in months] or [np.zeros(0, np.int64)]),
+            counts=np.concatenate([rollups[month].counts for month in months] or [np.zeros(0, np.int64)]),
+        )
+
+
+def _dollars(cents: Any) -> float:
+    return round(int(cents) / 100, 2)
+
+
+class Ledger:
+    """Month-partitioned columnar transactions with incrementally maintained rollups"""
+
+    def __init__(self, root: Path, batch: int = 100000):
+        self.root = root
+        self.batch = batch
+        self.departments: List[str] = []
+        self.accounts: List[str] = []
+        self.account_types: List[str] = []
+        self._cube: Optional[_Cube] = None
+        self._root_mtime = 0
+        self._lock: Optional[asyncio.Lock] = None
+        self.imported = 0
+        self.rejected = 0
+        self.import_time = metrics.Histogram((0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0))
+
+    @property
+    def lock(self) -> asyncio.Lock:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    # Loading, parsing and writing run in worker threads, holding the lock file
+
+    def _exclusive(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        lock = open(self.root / "lock", "w")
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        return lock
+
+    def _read_dictionaries(self) -> None:
+        try:
+            names = json.loads((self.root / "dictionaries.json").read_text())
+        except FileNotFoundError:
+            names = {"departments": [], "accounts": []}
+        self.departments = names["departments"]
+        self.accounts = [name for name, _ in names["accounts"]]
+        self.account_types = [kind for _, kind in names["accounts"]]
+
+    def _write_dictionaries(self) -> None:
+        names = {"departments": self.departments, "accounts": [list(pair) for pair in zip(self.accounts, self.account_types)]}
+        (self.root / "dictionaries.json.tmp").write_text(json.dumps(names))
+        os.replace(self.root / "dictionaries.json.tmp", self.root / "dictionaries.json")
+
+    @staticmethod
+    def _parts(directory: Path) -> List[Path]:
+        return sorted(directory.glob("part-*"), key=lambda path: int(path.name[5:]))
+
+    @staticmethod
+    def _write_rollup(directory: Path, rollup: _Rollup) -> None:
+        with open(directory / "rollup.tmp", "wb") as f:
+            np.savez(f, keys=rollup.keys, cents=rollup.cents, counts=rollup.counts, parts=np.int64(rollup.parts))
+        os.replace(directory / "rollup.tmp", directory / "rollup.npz")
+
+    def _read_rollup(self, directory: Path) -> _Rollup:
+        """The month's rollup, refolding any parts it does not cover"""
+        try:
+            with np.load(directory / "rollup.npz") as saved:
+                rollup = _Rollup(saved["keys"], saved["cents"], saved["counts"], int(saved["parts"]))
+        except (FileNotFoundError, ValueError, KeyError):
+            rollup = _Rollup.empty()
+        parts = self._parts(directory)
+        if len(parts) != rollup.parts:
+            if len(parts) < rollup.parts:
+                rollup = _Rollup.empty()
+            logger.warning("Ledger rollup of %s covers %d of %d parts; refolding", directory.name, rollup.parts, len(parts))
+            for part in parts[rollup.parts:]:
+                rollup = rollup.fold({name: np.load(part / f"{name}.npy") for name in COLUMNS}, 1)
+            self._write_rollup(directory, rollup)
+        return rollup
+
+    def _read(self) -> Dict[int, _Rollup]:
+        self._read_dictionaries()
+        rollups = {}
+        for directory in self.root.glob("period-*"):
+            year, month = directory.name[7:].split("-")
+            rollups[int(year) * 12 + int(month) - 1] = self._read_rollup(directory)
+        self._root_mtime = os.stat(self.root).st_mtime_ns
+        return rollups
+
+    def _load(self) -> _Cube:
+        with self._exclusive():
+            return _Cube.of(self._read())
+
+    def _parse(self, rows: Sequence[Dict[str, Any]]) -> Tuple[Dict[str, np.ndarray], np.ndarray, int]:
+        """Column arrays and month indexes from parsed records, skipping rows with unusable values"""
+        values: Dict[str, List[Any]] = {name: [] for name in COLUMNS}
+        months: List[int] = []
+        # New names go to copies, published once the whole batch has parsed
+        department_names, account_names, account_types = list(self.departments), list(self.accounts), list(self.account_types)
+        departments = {name.lower(): code for code, name in enumerate(department_names)}
+        accounts = {name.lower(): code for code, name in enumerate(account_names)}
+        rejected = 0
+        # Records of one upload share their field names: map each name once
+        mapped: Dict[str, Optional[str]] = {}
+        for record in rows:
+            fields = {}
+            for name, value in record.items():
+                field = mapped.get(name, "")
+                if field == "":
+                    field = mapped[name] = _FIELD.get(_key(str(name)))
+                if field is not None:
+                    fields[field] = value
+            department = str(fields.get("department") or "").strip()
+            account = str(fields.get("account") or "").strip()
+            scenario = str(fields.get("scenario") or "actual").strip().lower()
+            try:
+                day = date.fromisoformat(str(fields["date"])[:10])
+                cents = round(float(fields["amount"]) * 100)
+            except (KeyError, TypeError, ValueError, OverflowError):
+                rejected += 1
+                continue
+            department_code, account_code = departments.get(department.lower()), accounts.get(account.lower())
+            if (not account or scenario not in SCENARIOS or abs(cents) > _CENTS_MAX
+                    or (department_code is None and len(department_names) > _CODE_MAX)
+                    or (account_code is None and len(account_names) > _CODE_MAX)):
+                rejected += 1
+                continue
+            if department_code is None:
+                department_code = departments[department.lower()] = len(department_names)
+                department_names.append(department)
+            if account_code is None:
+                account_code = accounts[account.lower()] = len(account_names)
+                given = str(fields.get("type") or "").strip().lower()
+                account_names.append(account)
+                account_types.append(given if given in TYPES else account_type(account))
+            values["department"].append(department_code)
+            values["account"].append(account_code)
+            values["day"].append(day.toordinal() - _EPOCH)
+            values["scenario"].append(SCENARIOS.index(scenario))
+            values["cash"].append(str(fields.get("cash", "")).strip().lower() not in _FALSE)
+            values["cents"].append(cents)
+            months.append(day.year * 12 + day.month - 1)
+        columns = {name: np.array(values[name], dtype=dtype) for name, dtype in COLUMNS.items()}
+        self.departments, self.accounts, self.account_types = department_names, account_names, account_types
+        return columns, np.array(months, np.int64), rejected
+
+    def _append(self, cube: _Cube, rows: Sequence[Dict[str, Any]]) -> Tuple[_Cube, int, int]:
+        """Append a batch: one new part per month it touches, folded into that month's rollup"""
+        with self._exclusive():
+            # Another process appended since this one last looked: start from its rollups
+            rollups = self._read() if os.stat(self.root).st_mtime_ns != self._root_mtime else dict(cube.rollups)
+            columns, months, rejected = self._parse(rows)
+            if not len(months):
+                return _Cube.of(rollups), 0, rejected
+            self._write_dictionaries()
+            order = np.argsort(months, kind="stable")
+            months = months[order]
+            starts = np.flatnonzero(np.r_[True, months[1:] != months[:-1]])
+            for start, end in zip(starts, np.r_[starts[1:], len(months)]):
+                month, rows_of_month = int(months[start]), order[start:end]
+                directory = self.root / f"period-{month_name(month)}"
+                directory.mkdir(exist_ok=True)
+                rollup = self._read_rollup(directory)
+                part = {name: column[rows_of_month] for name, column in columns.items()}
+                staging = directory / f"tmp-{os.getpid()}"
+                shutil.rmtree(staging, ignore_errors=True)
+                staging.mkdir()
+                for name, column in part.items():
+                    np.save(staging / f"{name}.npy", column)
+                os.rename(staging, directory / f"part-{rollup.parts + 1}")
+                rollups[month] = rollup.fold(part, 1)
+                self._write_rollup(directory, rollups[month])
+            self._root_mtime = os.stat(self.root).st_mtime_ns
+        return _Cube.of(rollups), len(months), rejected
+
+    async def ensure(self) -> _Cube:
+        """Rollups of every month, including other processes' appends"""
+        try:
+            changed = self._cube is None or os.stat(self.root).st_mtime_ns != self._root_mtime
+        except FileNotFoundError:
+            changed = self._cube is None
+        if changed:
+            async with self.lock:
+                self._cube = await asyncio.to_thread(self._load)
+        return self._cube
+
+    async def import_stream(self, chunks: AsyncIterator[bytes], kind: str) -> Dict[str, Any]:
+        """Append a streamed CSV or NDJSON body, ``batch`` rows at a time"""
+        await self.ensure()
+        started = time.perf_counter()
+        imported = rejected = 0
+        async with self.lock:
+            async for rows, skipped in uploads.batches(chunks, kind, self.batch):
+                rejected += skipped
+                if rows:
+                    self._cube, added, invalid = await asyncio.to_thread(self._append, self._cube, rows)
+                    imported += added
+                    rejected += invalid
+        seconds = time.perf_counter() - started
+        self.imported += imported
+        self.rejected += rejected
+        self.import_time.observe(seconds)
+        logger.info("Appended %d transactions (%d rejected) in %.1f s", imported, rejected, seconds)
+        return {"imported": imported, "rejected": rejected, "seconds": round(seconds, 3), **self.summary()}
+
+    # Queries: sums over the rollups, on the event loop
+
+    def _mask(self, first: int, last: int, scenario: int, department: Optional[str] = None,
+              account: Optional[str] = None) -> np.ndarray:
+        cube = self._cube
+        mask = (cube.month >= first) & (cube.month <= last) & (cube.scenario == scenario)
+        for names, column, wanted in ((self.departments, cube.department, department),
+                                      (self.accounts, cube.account, account)):
+            if wanted is not None:
+                codes = [code for code, name in enumerate(names) if name.lower() == wanted.strip().lower()]
+                mask &= column == (codes[0] if codes else -1)
+        return mask
+
+    def _type_codes(self) -> np.ndarray:
+        """Type index per account code"""
+        return np.array([TYPES.index(kind) for kind in self.account_types] or [0], dtype=np.int64)
+
+    def _by_type(self, mask: np.ndarray) -> np.ndarray:
+        """Cents per account type"""
+        totals = np.zeros(len(TYPES), dtype=np.int64)
+        np.add.at(totals, self._type_codes()[self._cube.account[mask]], self._cube.cents[mask])
+        return totals
+
+    def latest(self, scenario: int = ACTUAL, quarter: bool = True) -> Optional[str]:
+        """The most recent quarter (or year) with transactions of a scenario"""
+        months = self._cube.month[self._cube.scenario == scenario] if self._cube is not None else []
+        if not len(months):
+            return None
+        month = int(months.max())
+        return f"{month // 12}-Q{month % 12 // 3 + 1}" if quarter else str(month // 12)
+
+    def _previous(self, period: str) -> str:
+        first, last = period_window(period)
+        before = first - (last - first + 1)
+        if last == first:
+            return month_name(before)
+        return f"{before // 12}-Q{before % 12 // 3 + 1}" if last - first == 2 else str(before // 12)
+
+    def pnl(self, period: str, department: Optional[str] = None) -> Dict[str, Any]:
+        """Revenue, gross profit and net income for a period, with revenue growth over the one before"""
+        totals = self._by_type(self._mask(*period_window(period), ACTUAL, department))
+        previous = self._previous(period)
+        before = int(self._by_type(self._mask(*period_window(previous), ACTUAL, department))[REVENUE])
+        revenue, gross = int(totals[REVENUE]), int(totals[REVENUE] - totals[COGS])
+        net = gross - int(totals[EXPENSE])
+        return {
+            "period": period,
+            "revenue": _dollars(revenue),
+            "costOfGoodsSold": _dollars(totals[COGS]),
+            "grossProfit": _dollars(gross),
+            "grossMargin": round(gross * 100 / revenue, 1) if revenue else None,
+            "operatingExpenses": _dollars(totals[EXPENSE]),
+            "netIncome": _dollars(net),
+            "netMargin": round(net * 100 / revenue, 1) if revenue else None,
+            "previousPeriod": previous,
+            "revenueChange": round((revenue - before) * 100 / before, 1) if before else None,
+        }
+
+    def cash_flow(self, period: str, department: Optional[str] = None) -> Dict[str, Any]:
+        """Operating, investing and financing cash flows for a period"""
+        mask = self._mask(*period_window(period), ACTUAL, department) & self._cube.cash
+        totals = self._by_type(mask)
+        operating = int(totals[REVENUE] - totals[COGS] - totals[EXPENSE])
+        investing, financing = -int(totals[CAPEX]), int(totals[FINANCING])
+        return {
+            "period": period,
+            "operating": _dollars(operating),
+            "investing": _dollars(investing),
+            "financing": _dollars(financing),
+            "netCashFlow": _dollars(operating + investing + financing),
+        }
+
+    def variance(self, period: str, department: Optional[str] = None) -> Dict[str, Any]:
+        """Budgeted vs actual spend for a period, overall and per department"""
+        first, last = period_window(period)
+        cube = self._cube
+        spend = np.isin(self._type_codes()[cube.account], (COGS, EXPENSE, CAPEX))
+        totals = np.zeros((max(len(self.departments), 1), len(SCENARIOS)), dtype=np.int64)
+        for scenario in (ACTUAL, BUDGET):
+            mask = self._mask(first, last, scenario, department) & spend
+            np.add.at(totals[:, scenario], cube.department[mask], cube.cents[mask])
+        departments = []
+        for code in np.flatnonzero(totals.any(axis=1)).tolist():
+            budget, spent = totals[code].tolist()[::-1]
+            departments.append({
+                "department": self.departments[code] or "Unassigned",
+                "budget": _dollars(budget),
+                "spent": _dollars(spent),
+                "remaining": _dollars(budget - spent),
+                "usedPercent": round(spent * 100 / budget, 1) if budget else None,
+            })
+        departments.sort(key=lambda row: -(row["usedPercent"] or 0))
+        budget, spent = (int(value) for value in totals.sum(axis=0)[::-1])
+        return {
+            "period": period,
+            "totalBudget": _dollars(budget),
+            "spent": _dollars(spent),
+            "remaining": _dollars(budget - spent),
+            "usedPercent": round(spent * 100 / budget, 1) if budget else None,
+            "departments": departments,
+        }
+
+    def rollup(self, by: str, period: Optional[str] = None, scenario: str = "actual", department: Optional[str] = None,
+               account: Optional[str] = None, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Amounts and transaction counts grouped by department, account, account type, quarter or month"""
+        cube = self._cube
+        first, last = period_window(period) if period else (0, 1 << 30)
+        mask = self._mask(first, last, SCENARIOS.index(scenario), department, account)
+        if kind is not None:
+            mask &= self._type_codes()[cube.account] == TYPES.index(kind)
+        if by == "department":
+            codes, names = cube.department[mask], self.departments
+        elif by == "account":
+            codes, names = cube.account[mask], self.accounts
+        elif by == "type":
+            codes, names = self._type_codes()[cube.account[mask]], TYPES
+        elif by in ("quarter", "month"):
+            codes = cube.month[mask] // 3 if by == "quarter" else cube.month[mask]
+            names = None
+        else:
+            raise ValueError(f"Unknown grouping {by!r}")
+        groups, inverse = np.unique(codes, return_inverse=True)
+        cents = np.zeros(len(groups), dtype=np.int64)
+        counts = np.zeros(len(groups), dtype=np.int64)
+        np.add.at(cents, inverse, cube.cents[mask])
+        np.add.at(counts, inverse, cube.counts[mask])
+        result = []
+        for group, total, count in zip(groups.tolist(), cents.tolist(), counts.tolist()):
+            if names is not None:
+                key = names[group] or "Unassigned"
+            else:
+                key = f"{group // 4}-Q{group % 4 + 1}" if by == "quarter" else month_name(group)
+            result.append({by: key, "amount": _dollars(total), "transactions": count})
+        return result
+
+    def summary(self) -> Dict[str, Any]:
+        cube = self._cube
+        months = sorted(cube.rollups) if cube is not None else []
+        return {
+            "transactions": int(cube.counts.sum()) if cube is not None else 0,
+            "firstPeriod": month_name(months[0]) if months else None,
+            "lastPeriod": month_name(months[-1]) if months else None,
+            "departments": len(self.departments),
+            "accounts": len(self.accounts),
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        cube = self._cube
+        return {
+            **self.summary(),
+            "parts": sum(rollup.parts for rollup in cube.rollups.values()) if cube is not None else 0,
+            "rollupGroups": len(cube.cents) if cube is not None else 0,
+            "imported": self.imported,
+            "rejected": self.rejected,
+        }
+
+    def metric_lines(self) -> List[str]:
+        cube = self._cube
+        return (
+            metrics.family("itt_ledger_transactions", "gauge", "Transactions in the ledger",
+                           [({}, int(cube.counts.sum()) if cube is not None else 0)])
+            + metrics.family("itt_ledger_rollup_groups", "gauge", "Rows in the ledger's rollups",
+                             [({}, len(cube.cents) if cube is not None else 0)])
+            + metrics.family("itt_ledger_imported_total", "counter", "Transactions appended", [({}, self.imported)])
+            + metrics.family("itt_ledger_rejected_total", "counter", "Import rows rejected as unparseable", [({}, self.rejected)])
+            + metrics.histogram("itt_ledger_import_seconds", "Time to import one upload", [({}, self.import_time)])
+        )
+
+
+def _ledger_from_env() -> Ledger:
+    return Ledger(
+        Path(os.getenv("ITT_LEDGER_DIR") or storage.DATA_DIR / "ledger"),
+        batch=int(os.getenv("ITT_LEDGER_BATCH", "100000")),
+    )
+
+
+ledger = _ledger_from_env()
+metrics.register_collector(ledger.metric_lines)
@@ -0,0 +1,313 @@
+"""
+Per-user conversation memory for the agents.
+
+Each (user, agent) pair has a conversation. Its most recent turns live in
+memory as a ring buffer of ``(timestamp, role, text)`` tuples, bounded to
+``ITT_MEMORY_TURNS`` turns, and only ``ITT_MEMORY_CONVERSATIONS``
+conversations are kept (least recently used are dropped first). An agent
+call reads that history to give the model its context, so clients keep
+sending just the new ``message``.
+
+Every turn is also appended to a SQLite database (WAL) by a background
+writer: turns are queued in memory and committed in batches of up to
+``ITT_MEMORY_BATCH`` rows every ``ITT_MEMORY_FLUSH_INTERVAL`` seconds (or as
+soon as a batch fills) on a dedicated thread, so recording a turn never
+waits on disk. If the writer falls far behind, the oldest queued turns
+are dropped and counted rather than growing without bound. A conversation
+that is not in memory (after a restart or eviction) is reloaded from the
+database once, the first time it is needed, on a second thread with its
+own read connection, so the load never queues behind a batch of writes.
+Clearing a conversation empties it in memory at once and queues the
+delete behind the writes already in flight.
+
+- ``ITT_MEMORY``                 ``0`` disables conversation memory (default on)
+- ``ITT_MEMORY_TURNS``           turns kept and sent as context per conversation (default 20)
+- ``ITT_MEMORY_CONVERSATIONS``   conversations kept in memory (default 10000)
+- ``ITT_MEMORY_FLUSH_INTERVAL``  seconds between background writes (default 0.5)
+- ``ITT_MEMORY_BATCH``           turns per write transaction (default 500)
+- ``ITT_MEMORY_RETENTION``       seconds turns are kept on disk (default 30 days)
+- ``ITT_MEMORY_DB``              database path (default ``memory.db`` in ``ITT_DATA_DIR``)
+"""
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Deque, Dict, List, Optional, Tuple, TypeVar
+
+from core import metrics, storage
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+Turn = Tuple[float, str, str]
+Key = Tuple[str, str]
+
+# Queued turns kept when the writer falls behind (older ones are dropped)
+MAX_PENDING = 100000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS turns (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    agent TEXT NOT NULL,
+    role TEXT NOT NULL,
+    text TEXT NOT NULL,
+    at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS turns_conversation ON turns (user_id, agent, id);
+CREATE INDEX IF NOT EXISTS turns_at ON turns (at);
+"""
+
+
+class TurnStore:
+    """SQLite table of turns; writes run on the writer thread, ``recent`` on the reader thread"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._connection = None
+        self._reader = None
+
+    def open(self) -> None:
+        self._connection = storage.connect(self.path)
+        self._connection.executescript(SCHEMA)
+
+    def open_reader(self) -> None:
+        self._reader = storage.connect(self.path)
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def close_reader(self) -> None:
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+    def append(self, rows: List[Tuple[str, str, str, str, float]]) -> None:
+        """Write a batch of turns in one transaction"""
+        with self._connection:
+            self._connection.execute("BEGIN")
+            self._connection.executemany("INSERT INTO turns (user_id, agent, role, text, at) VALUES (?, ?, ?, ?, ?)", rows)
+
+    def recent(self, user_id: str, agent: str, limit: int) -> List[Turn]:
+        rows = self._reader.execute(
+            "SELECT at, role, text FROM turns WHERE user_id = ? AND agent = ? ORDER BY id DESC LIMIT ?", (user_id, agent, limit)
+        ).fetchall()
+        return [tuple(row) for row in reversed(rows)]
+
+    def delete(self, user_id: str, agent: str) -> None:
+        self._connection.execute("DELETE FROM turns WHERE user_id = ? AND agent = ?", (user_id, agent))
+
+    def purge(self, before: float) -> int:
+        return self._connection.execute("DELETE FROM turns WHERE at < ?", (before,)).rowcount
+
+
+class ConversationMemory:
+    """Bounded in-memory recent turns with a write-behind SQLite store"""
+
+    def __init__(self, store: TurnStore, enabled: bool = True, turns: int = 20, conversations: int = 10000,
+                 flush_interval: float = 0.5, batch: int = 500, retention: float = 30 * 86400.0):
+        self.store = store
+        self.enabled = enabled
+        self.turns = turns
+        self.conversations = conversations
+        self.flush_interval = flush_interval
+        self.batch = batch
+        self.retention = retention
+        self._recent: "OrderedDict[Key, Deque[Turn]]" = OrderedDict()
+        self._pending: Deque[Tuple[str, str, str, str, float]] = deque()
+        # Batch being committed: already off the queue, maybe not yet visible to the reader
+        self._flushing: List[Tuple[str, str, str, str, float]] = []
+        # Deletes queued behind the writes in flight, per conversation
+        self._deleting: Dict[Key, asyncio.Future] = {}
+        self._wake: Optional[asyncio.Event] = None
+        self._writer: Optional[asyncio.Task] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._reader: Optional[ThreadPoolExecutor] = None
+        self.written = 0
+        self.dropped = 0
+        self.flushes = 0
+        self.flush_time = metrics.Histogram(metrics.DEFAULT_BUCKETS)
+
+    @property
+    def running(self) -> bool:
+        return self._writer is not None and not self._writer.done()
+
+    async def _db(self, fn: Callable[..., T], *args) -> T:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def _read(self, fn: Callable[..., T], *args) -> T:
+        return await asyncio.get_running_loop().run_in_executor(self._reader, fn, *args)
+
+    async def start(self) -> None:
+        """Open the store and start the background writer"""
+        if not self.enabled or self.running:
+            return
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="memory-writer")
+        await self._db(self.store.open)
+        await self._db(self.store.purge, time.time() - self.retention)
+        self._reader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="memory-reader")
+        await self._read(self.store.open_reader)
+        self._wake = asyncio.Event()
+        self._writer = asyncio.get_running_loop().create_task(self._write_behind())
+
+    async def stop(self) -> None:
+        """Stop the writer after committing every queued turn"""
+        if self._writer is not None:
+            self._writer.cancel()
+            await asyncio.gather(self._writer, return_exceptions=True)
+            self._writer = None
+        if self._executor is not None:
+            await self._flush()
+            await self._db(self.store.close)
+            self._executor.shutdown()
+            self._executor = None
+        if self._reader is not None:
+            await self._read(self.store.close_reader)
+            self._reader.shutdown()
+            self._reader = None
+        self._deleting.clear()
+        self._recent.clear()
+
+    async def history(self, user_id: str, agent: str) -> List[Dict[str, str]]:
+        """Recent turns of a conversation as ``{"role", "content"}`` messages, oldest first"""
+        if not self.running:
+            return []
+        turns = await self._conversation((user_id, agent))
+        return [{"role": role, "content": text} for _, role, text in turns]
+
+    async def _conversation(self, key: Key) -> Deque[Turn]:
+        turns = self._recent.get(key)
+        if turns is not None:
+            self._recent.move_to_end(key)
+            return turns
+        deleting = self._deleting.get(key)
+        if deleting is not None:  # evicted again before its delete ran
+            await asyncio.shield(deleting)
+        # Turns not yet committed are newer than anything on disk; the batch in flight may commit during the read
+        unsaved = [(at, role, text) for rows in (self._flushing, self._pending)
+                   for user_id, agent, role, text, at in rows if (user_id, agent) == key]
+        loaded = await self._read(self.store.recent, key[0], key[1], self.turns)
+        turns = self._recent.get(key)  # recorded while the load was running
+        if turns is None:
+            seen = set(loaded)
+            turns = deque(loaded + [turn for turn in unsaved if turn not in seen], maxlen=self.turns)
+            self._recent[key] = turns
+            while len(self._recent) > self.conversations:
+                self._recent.popitem(last=False)
+        return turns
+
+    async def record(self, user_id: str, agent: str, message: str, reply: str) -> None:
+        """Add a user message and the agent's reply to the conversation"""
+        if not self.running:
+            return
+        turns = await self._conversation((user_id, agent))
+        now = time.time()
+        for role, text in (("user", message), ("agent", reply)):
+            turns.append((now, role, text))
+            self._pending.append((user_id, agent, role, text, now))
+        while len(self._pending) > MAX_PENDING:
+            self._pending.popleft()
+            self.dropped += 1
+        if len(self._pending) >= self.batch:
+            self._wake.set()
+
+    async def clear(self, user_id: str, agent: str) -> None:
+        """Forget a conversation in memory, in the write queue and on disk"""
+        if not self.running:
+            return
+        key = (user_id, agent)
+        # Served empty from memory until the delete, queued behind the writes in flight, has run
+        self._recent[key] = deque(maxlen=self.turns)
+        self._recent.move_to_end(key)
+        while len(self._recent) > self.conversations:
+            self._recent.popitem(last=False)
+        self._pending = deque(row for row in self._pending if (row[0], row[1]) != key)
+        deleting = asyncio.ensure_future(self._db(self.store.delete, user_id, agent))
+        self._deleting[key] = deleting
+        deleting.add_done_callback(lambda done: self._deleted(key, done))
+
+    def _deleted(self, key: Key, done: asyncio.Future) -> None:
+        if self._deleting.get(key) is done:
+            del self._deleting[key]
+        if not done.cancelled() and done.exception() is not None:
+            logger.error("Could not delete conversation %s from disk", key, exc_info=done.exception())
+
+    async def _write_behind(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self._flush()
+            except Exception:
+                logger.exception("Conversation memory write failed; %d turns still queued", len(self._pending))
+
+    async def _flush(self) -> None:
+        while self._pending:
+            rows = [self._pending.popleft() for _ in range(min(self.batch, len(self._pending)))]
+            self._flushing = rows
+            start = time.perf_counter()
+            try:
+                await self._db(self.store.append, rows)
+            except Exception:
+                self._pending.extendleft(reversed(rows))
+                raise
+            finally:
+                self._flushing = []
+            self.flush_time.observe(time.perf_counter() - start)
+            self.flushes += 1
+            self.written += len(rows)
+
+    def snapshot(self) -> Dict[str, object]:
+        return {
+            "enabled": self.enabled,
+            "conversations": len(self._recent),
+            "pendingWrites": len(self._pending),
+            "written": self.written,
+            "dropped": self.dropped,
+            "flushes": self.flushes,
+        }
+
+    def metric_lines(self) -> List[str]:
+        return (
+            metrics.family("itt_memory_conversations", "gauge", "Conversations held in memory", [({}, len(self._recent))])
+            + metrics.family("itt_memory_pending_writes", "gauge", "Turns queued for the background writer",
+                             [({}, len(self._pending))])
+            + metrics.family("itt_memory_turns_written_total", "counter", "Turns committed to the database", [({}, self.written)])
+            + metrics.family("itt_memory_turns_dropped_total", "counter", "Queued turns dropped because the writer fell behind",
+                             [({}, self.dropped)])
+            + metrics.histogram("itt_memory_flush_seconds", "Time to commit one batch of turns", [({}, self.flush_time)])
+        )
+
+
+def _memory_from_env() -> ConversationMemory:
+    return ConversationMemory(
+        TurnStore(os.getenv("ITT_MEMORY_DB") or str(storage.DATA_DIR / "memory.db")),
+        enabled=os.getenv("ITT_MEMORY", "1").lower() not in ("0", "false", "no", "off"),
+        turns=int(os.getenv("ITT_MEMORY_TURNS", "20")),
+        conversations=int(os.getenv("ITT_MEMORY_CONVERSATIONS", "10000")),
+        flush_interval=float(os.getenv("ITT_MEMORY_FLUSH_INTERVAL", "0.5")),
+        batch=int(os.getenv("ITT_MEMORY_BATCH", "500")),
+        retention=float(os.getenv("ITT_MEMORY_RETENTION", str(30 * 86400))),
+    )
+
+
+memory = _memory_from_env()
+metrics.register_collector(memory.metric_lines)
+
+
+async def history(user_id: str, agent: str) -> List[Dict[str, str]]:
+    """Recent turns of a conversation in the shared memory"""
+    return await memory.history(user_id, agent)
+
+
+async def record(user_id: str, agent: str, message: str, reply: str) -> None:
+    """Add a turn to a conversation in the shared memory"""
+    await memory.record(user_id, agent, message, reply)
@@ -0,0 +1,234 @@
+"""
+Per-route request metrics in Prometheus text format.
+
+``MetricsMiddleware`` wraps the whole application and records, for every
+route template (``/api/sales/deck``, ``/api/employees/{employee_id}``):
+
+- ``itt_http_requests_total``            counter by method, route and status
+- ``itt_http_request_errors_total``      5xx responses and unhandled exceptions
+- ``itt_http_requests_in_flight``        gauge of requests currently running
+- ``itt_http_request_duration_seconds``  histogram over fixed buckets
+
+All updates happen on the event loop thread, so the hot path is a few
+dict/list increments and one ``bisect`` with no locking. Requests that
+match no route are recorded under ``route="unmatched"`` so unknown URLs
+cannot grow the label set. The route is only known once the router has
+matched it, so a raw path's label is remembered after its first request;
+that first request is missing from the in-flight gauge, nothing else.
+
+Other subsystems append their own series through ``register_collector``:
+a callable returning Prometheus text lines, run on every scrape.
+
+- ``ITT_METRICS``  ``0`` disables the middleware (default on)
+"""
+import os
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Upper bounds in seconds; agent replies simulate 0.5-2s of model latency
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Raw paths whose route label is remembered (bounds memory under URL scans)
+MAX_LABELS = 10000
+
+UNMATCHED = "unmatched"
+
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+METRICS_ENABLED = os.getenv("ITT_METRICS", "1").lower() not in ("0", "false", "no", "off")
+
+
+class Histogram:
+    """Fixed-bucket histogram; counts[i] holds values in (bounds[i-1], bounds[i]]"""
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[int]:
+        total = 0
+        result = []
+        for count in self.counts:
+            total += count
+            result.append(total)
+        return result
+
+
+class RouteMetrics:
+    """Counters for one (method, route)"""
+    __slots__ = ("statuses", "errors", "in_flight", "duration")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.statuses: Dict[int, int] = {}
+        self.errors = 0
+        self.in_flight = 0
+        self.duration = Histogram(buckets)
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def family(name: str, kind: str, help_text: str, samples: Iterable[Tuple[Dict[str, str], float]]) -> List[str]:
+    """Prometheus text lines for one metric family (for collectors)"""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        rendered = ",".join(f'{key}="{_label(str(item))}"' for key, item in labels.items())
+        lines.append(f"{name}{{{rendered}}} {_number(value)}" if rendered else f"{name} {_number(value)}")
+    return lines
+
+
+def histogram(name: str, help_text: str, samples: Iterable[Tuple[Dict[str, str], Histogram]]) -> List[str]:
+    """Prometheus text lines for one histogram family (for collectors)"""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for labels, histogram in samples:
+        rendered = ",".join(f'{key}="{_label(str(item))}"' for key, item in labels.items())
+        prefix = rendered + "," if rendered else ""
+        bounds = [_number(bound) for bound in histogram.bounds] + ["+Inf"]
+        for bound, count in zip(bounds, histogram.cumulative()):
+            lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {count}')
+        suffix = f"{{{rendered}}}" if rendered else ""
+        lines.append(f"{name}_sum{suffix} {histogram.sum!r}")
+        lines.append(f"{name}_count{suffix} {histogram.count}")
+    return lines
+
+
+class MetricsRegistry:
+    """Route metrics for one application"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._routes: Dict[Tuple[str, str], RouteMetrics] = {}
+        self._collectors: List[Callable[[], List[str]]] = []
+
+    def register_collector(self, collector: Callable[[], List[str]]) -> None:
+        """Add a callable whose lines are appended to every rendering"""
+        if collector not in self._collectors:
+            self._collectors.append(collector)
+
+    def route(self, method: str, route: str) -> RouteMetrics:
+        key = (method, route)
+        metrics = self._routes.get(key)
+        if metrics is None:
+            metrics = self._routes[key] = RouteMetrics(self.buckets)
+        return metrics
+
+    def routes(self) -> Dict[Tuple[str, str], RouteMetrics]:
+        return dict(self._routes)
+
+    def reset(self) -> None:
+        self._routes.clear()
+
+    def render(self) -> str:
+        """Prometheus text exposition of every route"""
+        routes = sorted(self._routes.items())
+        lines = [
+            "# HELP itt_http_requests_total HTTP requests by route and response status",
+            "# TYPE itt_http_requests_total counter",
+        ]
+        for (method, route), metrics in routes:
+            for status, count in sorted(metrics.statuses.items()):
+                lines.append(f'itt_http_requests_total{{method="{method}",route="{_label(route)}",status="{status}"}} {count}')
+
+        lines += [
+            "# HELP itt_http_request_errors_total Requests that failed with a 5xx status or an unhandled exception",
+            "# TYPE itt_http_request_errors_total counter",
+        ]
+        for (method, route), metrics in routes:
+            lines.append(f'itt_http_request_errors_total{{method="{method}",route="{_label(route)}"}} {metrics.errors}')
+
+        lines += [
+            "# HELP itt_http_requests_in_flight Requests currently being handled",
+            "# TYPE itt_http_requests_in_flight gauge",
+        ]
+        for (method, route), metrics in routes:
+            lines.append(f'itt_http_requests_in_flight{{method="{method}",route="{_label(route)}"}} {metrics.in_flight}')
+
+        lines += [
+            "# HELP itt_http_request_duration_seconds Time from request start until the response completed",
+            "# TYPE itt_http_request_duration_seconds histogram",
+        ]
+        bounds = [_number(bound) for bound in self.buckets] + ["+Inf"]
+        for (method, route), metrics in routes:
+            labels = f'method="{method}",route="{_label(route)}"'
+            histogram = metrics.duration
+            for bound, count in zip(bounds, histogram.cumulative()):
+                lines.append(f'itt_http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f"itt_http_request_duration_seconds_sum{{{labels}}} {histogram.sum!r}")
+            lines.append(f"itt_http_request_duration_seconds_count{{{labels}}} {histogram.count}")
+
+        for collector in self._collectors:
+            lines += collector()
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+def register_collector(collector: Callable[[], List[str]]) -> None:
+    """Add extra series to the shared registry's rendering"""
+    registry.register_collector(collector)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route request metrics"""
+
+    def __init__(self, app, registry: MetricsRegistry = registry):
+        self.app = app
+        self.registry = registry
+        self._labels: Dict[Tuple[str, str], str] = {}
+
+    async def __call__(self, scope, receive, send):
+        kind = scope["type"]
+        if kind != "http" and kind != "websocket":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope.get("method", "WS")
+        path_key = (method, scope["path"])
+        label = self._labels.get(path_key)
+        metrics: Optional[RouteMetrics] = None
+        if label is not None:
+            metrics = self.registry.route(method, label)
+            metrics.in_flight += 1
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status if kind == "http" else send)
+            if kind == "websocket":
+                status = 101
+        finally:
+            elapsed = time.perf_counter() - start
+            if metrics is not None:
+                metrics.in_flight -= 1
+            else:
+                route = scope.get("route")
+                label = route.path if route is not None else UNMATCHED
+                if len(self._labels) < MAX_LABELS:
+                    self._labels[path_key] = label
+                metrics = self.registry.route(method, label)
+            metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+            if status >= 500:
+                metrics.errors += 1
+            metrics.duration.observe(elapsed)
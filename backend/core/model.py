@@ -0,0 +1,284 @@
+"""
+Model backend behind every agent handler.
+
+Agent endpoints call ``model.complete(agent_id, prompt, history)`` for the
+model work of a request instead of sleeping inline; ``history`` holds the
+conversation's earlier ``{"role", "content"}`` turns. Two backends exist:
+
+- ``simulated`` (default) awaits the agent's latency profile from
+  ``core.latency``, exactly as before
+- ``http`` calls a model service over one shared, connection-pooled
+  ``httpx.AsyncClient`` (keep-alive, connect/read timeouts). Connection
+  errors, timeouts and 429/5xx answers are retried with exponential
+  backoff and full jitter, honouring ``Retry-After``; a request that still
+  fails is answered with 502 (504 on timeout), as is an answer that is not
+  the JSON described below. Streaming completions are only retried before
+  their first token.
+
+The service contract is small: ``POST /v1/complete`` with
+``{"agent", "prompt", "history", "stream"}`` returns ``{"text", "model", "usage"}``,
+or Server-Sent Events of ``{"token"}`` ending with ``[DONE]`` when
+streaming. ``python model_server.py`` runs a local stand-in for it.
+
+- ``ITT_MODEL_BACKEND``          ``simulated`` (default) or ``http``
+- ``ITT_MODEL_URL``              service base URL (default ``http://127.0.0.1:8100``)
+- ``ITT_MODEL_API_KEY``          sent as a Bearer token when set
+- ``ITT_MODEL_TIMEOUT``          read timeout in seconds (default 30)
+- ``ITT_MODEL_CONNECT_TIMEOUT``  connect/pool timeout in seconds (default 2)
+- ``ITT_MODEL_MAX_CONNECTIONS``  pooled connections (default 100)
+- ``ITT_MODEL_KEEPALIVE``        idle keep-alive connections kept (default 20)
+- ``ITT_MODEL_RETRIES``          retries after the first attempt (default 2)
+"""
+import abc
+import asyncio
+import json
+import os
+import random
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Optional, Sequence
+
+from fastapi import HTTPException
+
+from core import latency, metrics
+
+try:
+    import httpx
+except ImportError:  # optional: only the http backend needs it
+    httpx = None
+
+# Earlier conversation turns, ``{"role": "user" | "agent", "content": ...}``
+History = Sequence[Dict[str, str]]
+
+# Statuses worth another attempt (throttled or temporarily unavailable)
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+COMPLETE_PATH = "/v1/complete"
+
+
+@dataclass(frozen=True)
+class Completion:
+    text: str
+    model: str
+    seconds: float
+    attempts: int = 1
+
+
+class ModelBackend(abc.ABC):
+    """Interface of a model backend"""
+    name = "base"
+
+    def __init__(self):
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+        self.duration = metrics.Histogram(metrics.DEFAULT_BUCKETS)
+
+    async def start(self) -> None:
+        """Acquire shared resources (called from the application lifespan)"""
+
+    async def close(self) -> None:
+        """Release shared resources"""
+
+    @abc.abstractmethod
+    async def complete(self, agent: str, prompt: str, history: History = ()) -> Completion:
+        """The agent's completion of the prompt"""
+
+    async def stream(self, agent: str, prompt: str, history: History = ()) -> AsyncIterator[str]:
+        """Completion tokens as they are produced"""
+        completion = await self.complete(agent, prompt, history)
+        if completion.text:
+            yield completion.text
+
+    def stats(self) -> Dict[str, object]:
+        return {"backend": self.name, "calls": self.calls, "retries": self.retries, "failures": self.failures}
+
+    def metric_lines(self) -> List[str]:
+        labels = {"backend": self.name}
+        return (
+            metrics.family("itt_model_calls_total", "counter", "Model backend calls", [(labels, self.calls)])
+            + metrics.family("itt_model_retries_total", "counter", "Model calls retried after a failed attempt",
+                             [(labels, self.retries)])
+            + metrics.family("itt_model_failures_total", "counter", "Model calls that failed after every retry",
+                             [(labels, self.failures)])
+            + metrics.histogram("itt_model_call_duration_seconds", "Model call time including retries",
+                                [(labels, self.duration)])
+        )
+
+
+class SimulatedBackend(ModelBackend):
+    """Awaits the agent's simulated latency and returns no text"""
+    name = "simulated"
+
+    async def complete(self, agent: str, prompt: str, history: History = ()) -> Completion:
+        self.calls += 1
+        seconds = await latency.simulate(agent)
+        self.duration.observe(seconds)
+        return Completion(text="", model=self.name, seconds=seconds)
+
+
+def _token(data: str) -> str:
+    """The token of one streamed ``{"token"}`` event; ValueError when malformed"""
+    event = json.loads(data)
+    if not isinstance(event, dict) or not isinstance(event.get("token"), str):
+        raise ValueError(f"Malformed stream event: {data[:100]!r}")
+    return event["token"]
+
+
+class HttpBackend(ModelBackend):
+    """Model service over a shared pooled HTTP client"""
+    name = "http"
+
+    def __init__(self, base_url: str, api_key: Optional[str] = None, timeout: float = 30.0,
+                 connect_timeout: float = 2.0, max_connections: int = 100, keepalive: int = 20,
+                 retries: int = 2, backoff: float = 0.1, max_backoff: float = 2.0):
+        if httpx is None:
+            raise RuntimeError("The http model backend requires httpx (pip install httpx)")
+        super().__init__()
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout, pool=connect_timeout)
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=keepalive)
+        self.max_retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._client: Optional["httpx.AsyncClient"] = None
+
+    @property
+    def client(self) -> "httpx.AsyncClient":
+        if self._client is None or self._client.is_closed:
+            headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else None
+            self._client = httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout, limits=self.limits, headers=headers)
+        return self._client
+
+    async def start(self) -> None:
+        self.client
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Full-jitter exponential backoff, or the server's Retry-After when given"""
+        if retry_after is not None:
+            try:
+                return min(float(retry_after), self.max_backoff)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def _failed(self, exc: Exception) -> HTTPException:
+        self.failures += 1
+        if isinstance(exc, httpx.TimeoutException):
+            return HTTPException(status_code=504, detail="Model service timed out")
+        if isinstance(exc, ValueError):
+            return HTTPException(status_code=502, detail="Model service sent an invalid response")
+        return HTTPException(status_code=502, detail="Model service unavailable")
+
+    async def complete(self, agent: str, prompt: str, history: History = ()) -> Completion:
+        self.calls += 1
+        start = time.perf_counter()
+        payload = {"agent": agent, "prompt": prompt, "history": list(history), "stream": False}
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            try:
+                response = await self.client.post(COMPLETE_PATH, json=payload)
+                if response.status_code not in RETRY_STATUSES:
+                    response.raise_for_status()
+                    body = response.json()
+                    if not isinstance(body, dict):
+                        raise ValueError(f"Expected a JSON object, got {type(body).__name__}")
+                    elapsed = time.perf_counter() - start
+                    self.duration.observe(elapsed)
+                    return Completion(text=body.get("text", ""), model=body.get("model", ""), seconds=elapsed, attempts=attempt + 1)
+                retry_after = response.headers.get("Retry-After")
+                error: Exception = httpx.HTTPStatusError(f"{response.status_code}", request=response.request, response=response)
+            except (httpx.HTTPStatusError, ValueError) as exc:
+                self.duration.observe(time.perf_counter() - start)
+                raise self._failed(exc) from exc
+            except httpx.TransportError as exc:
+                error = exc
+            if attempt == self.max_retries:
+                break
+            self.retries += 1
+            await asyncio.sleep(self.delay(attempt, retry_after))
+        self.duration.observe(time.perf_counter() - start)
+        raise self._failed(error) from error
+
+    async def stream(self, agent: str, prompt: str, history: History = ()) -> AsyncIterator[str]:
+        self.calls += 1
+        start = time.perf_counter()
+        payload = {"agent": agent, "prompt": prompt, "history": list(history), "stream": True}
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            started = False
+            try:
+                async with self.client.stream("POST", COMPLETE_PATH, json=payload) as response:
+                    if response.status_code not in RETRY_STATUSES:
+                        response.raise_for_status()
+                        # Read through to the end of the body so the connection returns to the pool
+                        async for line in response.aiter_lines():
+                            data = line[len("data: "):] if line.startswith("data: ") else None
+                            if data is None or data == "[DONE]":
+                                continue
+                            started = True
+                            yield _token(data)
+                        self.duration.observe(time.perf_counter() - start)
+                        return
+                    retry_after = response.headers.get("Retry-After")
+                    error: Exception = httpx.HTTPStatusError(f"{response.status_code}", request=response.request, response=response)
+            except (httpx.HTTPStatusError, ValueError) as exc:
+                self.duration.observe(time.perf_counter() - start)
+                raise self._failed(exc) from exc
+            except httpx.TransportError as exc:
+                if started:
+                    self.duration.observe(time.perf_counter() - start)
+                    raise self._failed(exc) from exc
+                error = exc
+            if attempt == self.max_retries:
+                break
+            self.retries += 1
+            await asyncio.sleep(self.delay(attempt, retry_after))
+        self.duration.observe(time.perf_counter() - start)
+        raise self._failed(error) from error
+
+    def stats(self) -> Dict[str, object]:
+        return {**super().stats(), "url": self.base_url}
+
+
+def _backend_from_env() -> ModelBackend:
+    kind = os.getenv("ITT_MODEL_BACKEND", "simulated").lower()
+    if kind == "simulated":
+        return SimulatedBackend()
+    if kind == "http":
+        return HttpBackend(
+            base_url=os.getenv("ITT_MODEL_URL", "http://127.0.0.1:8100"),
+            api_key=os.getenv("ITT_MODEL_API_KEY") or None,
+            timeout=float(os.getenv("ITT_MODEL_TIMEOUT", "30")),
+            connect_timeout=float(os.getenv("ITT_MODEL_CONNECT_TIMEOUT", "2")),
+            max_connections=int(os.getenv("ITT_MODEL_MAX_CONNECTIONS", "100")),
+            keepalive=int(os.getenv("ITT_MODEL_KEEPALIVE", "20")),
+            retries=int(os.getenv("ITT_MODEL_RETRIES", "2")),
+        )
+    raise ValueError(f"ITT_MODEL_BACKEND must be 'simulated' or 'http', got {kind!r}")
+
+
+backend = _backend_from_env()
+metrics.register_collector(lambda: backend.metric_lines())
+
+
+def use(new_backend: ModelBackend) -> None:
+    """Replace the shared backend (benchmarks and tests)"""
+    global backend
+    backend = new_backend
+
+
+async def complete(agent: str, prompt: str, history: History = ()) -> Completion:
+    """Run one completion on the shared backend"""
+    return await backend.complete(agent, prompt, history)
+
+
+def stream(agent: str, prompt: str, history: History = ()) -> AsyncIterator[str]:
+    """Stream one completion's tokens from the shared backend"""
+    return backend.stream(agent, prompt, history)
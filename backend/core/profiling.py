@@ -0,0 +1,173 @@
+"""
+On-demand request profiling.
+
+An admin adds ``X-Profile: 1`` (or ``?profile=1``) to any request. A
+sampled share of those (``ITT_PROFILE_SAMPLE_RATE``) runs under cProfile
+through the whole stack: middleware, routing, dependencies, the handler
+and serialization. The hot functions with their self and cumulative time
+are kept in a bounded ring buffer, listed at ``/api/diagnostics/profiles``;
+the response carries ``X-Profile-Id`` pointing at its profile.
+
+Only one request is profiled at a time (cProfile hooks the whole thread),
+and other coroutines that run while it is suspended appear in its profile.
+Requests without the flag pay one header scan; with ``ITT_PROFILING=0``
+the middleware is not installed at all.
+
+- ``ITT_PROFILING``            ``0`` disables profiling (default on)
+- ``ITT_PROFILE_SAMPLE_RATE``  share of flagged requests profiled (default 1.0)
+- ``ITT_PROFILE_HISTORY``      profiles kept (default 20)
+"""
+import cProfile
+import itertools
+import os
+import pstats
+import random
+import sys
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+from urllib.parse import parse_qs
+
+from fastapi import HTTPException
+
+from core.security import principal_from_header
+
+# Functions kept per profile for each ordering (self and cumulative time)
+TOP_FUNCTIONS = 40
+
+PROFILE_HEADER = b"x-profile"
+AUTHORIZATION_HEADER = b"authorization"
+
+PROFILING_ENABLED = os.getenv("ITT_PROFILING", "1").lower() not in ("0", "false", "no", "off")
+
+_PATH_PREFIXES = sorted({os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep, *(p + os.sep for p in sys.path if p)},
+                        key=len, reverse=True)
+
+
+def _location(filename: str, line: int, name: str) -> str:
+    """``fastapi/routing.py:191(run_endpoint_function)``"""
+    for prefix in _PATH_PREFIXES:
+        if filename.startswith(prefix):
+            filename = filename[len(prefix):]
+            break
+    return f"{filename}:{line}({name})" if line else name
+
+
+def hot_functions(profiler: cProfile.Profile, limit: int = TOP_FUNCTIONS) -> List[Dict[str, Any]]:
+    """Top functions by cumulative time plus any others among the top by self time"""
+    stats = pstats.Stats(profiler).stats
+    rows = [
+        {
+            "function": _location(*key),
+            "calls": calls,
+            "primitiveCalls": primitive,
+            "selfSeconds": round(self_time, 6),
+            "cumulativeSeconds": round(cumulative, 6),
+        }
+        for key, (primitive, calls, self_time, cumulative, _) in stats.items()
+    ]
+    by_cumulative = sorted(rows, key=lambda row: row["cumulativeSeconds"], reverse=True)[:limit]
+    by_self = sorted(rows, key=lambda row: row["selfSeconds"], reverse=True)[:limit]
+    kept = {id(row): row for row in by_cumulative + by_self}
+    return sorted(kept.values(), key=lambda row: row["cumulativeSeconds"], reverse=True)
+
+
+class ProfileStore:
+    """Ring buffer of recent request profiles"""
+
+    def __init__(self, history: int = 20):
+        self._profiles: Deque[Dict[str, Any]] = deque(maxlen=history)
+        self._ids = itertools.count(1)
+
+    def next_id(self) -> str:
+        return f"p{next(self._ids)}"
+
+    def add(self, profile: Dict[str, Any]) -> None:
+        self._profiles.append(profile)
+
+    def get(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        return next((profile for profile in self._profiles if profile["id"] == profile_id), None)
+
+    def summaries(self) -> List[Dict[str, Any]]:
+        """Every kept profile without its function table, newest first"""
+        return [
+            {**{key: value for key, value in profile.items() if key != "functions"}, "hottest": profile["functions"][:5]}
+            for profile in reversed(self._profiles)
+        ]
+
+    def clear(self) -> None:
+        self._profiles.clear()
+
+
+store = ProfileStore(history=int(os.getenv("ITT_PROFILE_HISTORY", "20")))
+
+
+def _flagged(scope) -> bool:
+    query = scope.get("query_string", b"")
+    # Parse only when it could be there; most requests carry no such parameter
+    if b"profile" in query and parse_qs(query.decode("latin-1")).get("profile", [""])[-1] in ("1", "true"):
+        return True
+    for name, value in scope["headers"]:
+        if name == PROFILE_HEADER:
+            return value in (b"1", b"true")
+    return False
+
+
+def _is_admin(scope) -> bool:
+    for name, value in scope["headers"]:
+        if name == AUTHORIZATION_HEADER:
+            try:
+                return principal_from_header(value.decode("latin-1")).role == "admin"
+            except HTTPException:
+                return False
+    return False
+
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling flagged admin requests"""
+
+    def __init__(self, app, store: ProfileStore = store, sample_rate: Optional[float] = None):
+        self.app = app
+        self.store = store
+        self.sample_rate = float(os.getenv("ITT_PROFILE_SAMPLE_RATE", "1.0")) if sample_rate is None else sample_rate
+        self._active = False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _flagged(scope):
+            await self.app(scope, receive, send)
+            return
+        if self._active or random.random() >= self.sample_rate or not _is_admin(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = self.store.next_id()
+        status = 500
+
+        async def send_with_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message = {**message, "headers": [*message.get("headers", ()), (b"x-profile-id", profile_id.encode())]}
+            await send(message)
+
+        self._active = True
+        profiler = cProfile.Profile()
+        started = datetime.now()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            profiler.disable()
+            elapsed = time.perf_counter() - start
+            self._active = False
+            self.store.add({
+                "id": profile_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status,
+                "startedAt": started.isoformat(),
+                "durationMs": round(elapsed * 1e3, 3),
+                "functions": hot_functions(profiler),
+            })
@@ -0,0 +1,216 @@
+"""
+Templated response cache for agent replies.
+
+Agent replies are deterministic for a given (agent, resolved intent) except
+for a few time-derived fields: record ids such as ``INV-…``/``DECK-…``, the
+current date and the ``timestamp``. A reply builder receives those through
+``ReplyFields``. On a cache miss the builder runs once with placeholder
+fields; the validated ``AgentResponse`` is serialized and split at the
+placeholders into a byte template. Every later request for the same
+(agent, intent) only substitutes the current values into that template, so
+it skips the branch logic, model construction, validation and JSON encoding.
+
+Replies that are built fresh (cache disabled, or agents whose output
+depends on more than the intent) go through ``respond``. By default it
+returns the model and the route's ``response_model`` validates and
+serializes it a second time. The opt-in fast path serializes the already
+validated model once, straight to JSON bytes with orjson, and the same
+encoder is used for the batch/WebSocket/SSE envelopes. Output conformance
+is checked by ``tests/test_responses.py`` instead of at request time.
+
+- ``ITT_RESPONSE_CACHE_SIZE``  templates kept (LRU, default 256, 0 disables)
+- ``ITT_RESPONSE_CACHE_TTL``   seconds a template lives (default 300)
+- ``ITT_FAST_RESPONSES``       ``1`` enables the fast path (default off)
+"""
+import json
+import os
+import re
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from fastapi.responses import Response
+
+from core.cache import TTLCache
+from models import AgentResponse
+
+try:
+    import orjson
+except ImportError:  # optional: the stdlib encoder is used instead
+    orjson = None
+
+FAST_RESPONSES = os.getenv("ITT_FAST_RESPONSES", "0").lower() in ("1", "true", "yes", "on")
+
+
+def dumps(obj: Any) -> bytes:
+    """Compact JSON bytes, encoded with orjson on the fast path"""
+    if FAST_RESPONSES and orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    if FAST_RESPONSES and orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def encode(response: AgentResponse) -> bytes:
+    """Serialize a reply that was validated when it was constructed"""
+    if FAST_RESPONSES:
+        # Every AgentResponse field is a plain JSON value; skip the model serializer
+        return dumps(response.__dict__)
+    return response.model_dump_json().encode()
+
+
+class ReplyFields:
+    """Per-request dynamic values available to reply builders"""
+
+    def __init__(self, now: datetime):
+        self._now = now
+
+    @property
+    def epoch(self) -> str:
+        """Unix seconds, used in ids like ``DECK-1736950000``"""
+        return str(int(self._now.timestamp()))
+
+    @property
+    def short_id(self) -> str:
+        """Last five digits of the epoch, used in ids like ``INV-50000``"""
+        return str(int(self._now.timestamp()) % 100000)
+
+    @property
+    def date(self) -> str:
+        return self._now.strftime("%Y-%m-%d")
+
+    @property
+    def timestamp(self) -> str:
+        return self._now.isoformat()
+
+
+class _TemplateFields(ReplyFields):
+    """Placeholder values that mark where the dynamic fields go"""
+    epoch = "{{@epoch}}"
+    short_id = "{{@short_id}}"
+    date = "{{@date}}"
+    timestamp = "{{@timestamp}}"
+
+
+_PLACEHOLDER = re.compile(r"\{\{@(\w+)\}\}")
+_TEMPLATE_FIELDS = _TemplateFields(datetime.min)
+
+
+def fill(value: Any, fields: ReplyFields) -> Any:
+    """Substitute ``{{@name}}`` placeholders throughout a JSON-like value"""
+    if isinstance(fields, _TemplateFields):
+        return value
+    if isinstance(value, str):
+        return _PLACEHOLDER.sub(lambda match: getattr(fields, match.group(1)), value) if "{{@" in value else value
+    if isinstance(value, dict):
+        return {key: fill(item, fields) for key, item in value.items()}
+    if isinstance(value, list):
+        return [fill(item, fields) for item in value]
+    return value
+
+
+ReplyBuilder = Callable[[Optional[str], ReplyFields], AgentResponse]
+
+
+class ResponseTemplate:
+    """Serialized reply split into literal byte segments and field names"""
+    __slots__ = ("segments", "fields")
+
+    def __init__(self, body: str):
+        parts = _PLACEHOLDER.split(body)
+        self.segments: List[bytes] = [part.encode() for part in parts[0::2]]
+        self.fields: Tuple[str, ...] = tuple(parts[1::2])
+
+    def render(self, fields: ReplyFields) -> bytes:
+        if not self.fields:
+            return self.segments[0]
+        values = {name: getattr(fields, name).encode() for name in set(self.fields)}
+        out = [self.segments[0]]
+        for name, segment in zip(self.fields, self.segments[1:]):
+            out.append(values[name])
+            out.append(segment)
+        return b"".join(out)
+
+
+def build_template(builder: ReplyBuilder, intent: Optional[str]) -> ResponseTemplate:
+    """Run a builder once with placeholder fields and templatize its JSON"""
+    response = builder(intent, _TEMPLATE_FIELDS)
+    response.timestamp = _TEMPLATE_FIELDS.timestamp
+    return ResponseTemplate(response.model_dump_json())
+
+
+class ResponseCache:
+    """(agent, intent) -> ResponseTemplate, with LRU eviction and TTL"""
+
+    def __init__(self, maxsize: int = 256, ttl: float = 300.0):
+        self._templates: TTLCache[ResponseTemplate] = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def body(self, agent: str, intent: Optional[str], builder: ReplyBuilder, now: Optional[datetime] = None) -> bytes:
+        """Serialized reply for the agent/intent with current dynamic fields"""
+        key = (agent, intent)
+        template = self._templates.get(key)
+        if template is None:
+            template = build_template(builder, intent)
+            self._templates.set(key, template)
+        return template.render(ReplyFields(now or datetime.now()))
+
+    @property
+    def enabled(self) -> bool:
+        return self._templates.maxsize > 0
+
+    def clear(self) -> None:
+        self._templates.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return self._templates.stats()
+
+
+cache = ResponseCache(
+    maxsize=int(os.getenv("ITT_RESPONSE_CACHE_SIZE", "256")),
+    ttl=float(os.getenv("ITT_RESPONSE_CACHE_TTL", "300")),
+)
+
+
+def respond(response: AgentResponse) -> Union[AgentResponse, Response]:
+    """Return a freshly built reply from an agent endpoint"""
+    if FAST_RESPONSES:
+        return Response(content=encode(response), media_type="application/json")
+    return response
+
+
+def reply(agent: str, intent: Optional[str], builder: ReplyBuilder) -> Union[AgentResponse, Response]:
+    """HTTP response for an agent reply, served from the template cache"""
+    if not cache.enabled:
+        return respond(builder(intent, ReplyFields(datetime.now())))
+    return Response(content=cache.body(agent, intent, builder), media_type="application/json")
+
+
+def response_body(result: Union[Response, AgentResponse]) -> bytes:
+    """JSON body of whatever an agent endpoint returned"""
+    if isinstance(result, Response):
+        return result.body
+    return encode(result)
+
+
+def response_dict(result: Union[Response, AgentResponse]) -> Dict[str, Any]:
+    """Decoded body of whatever an agent endpoint returned"""
+    if isinstance(result, Response):
+        return loads(result.body)
+    return result.model_dump(mode="json")
+
+
+def response_message(result: Union[Response, AgentResponse]) -> str:
+    """The markdown ``message`` of whatever an agent endpoint returned"""
+    if isinstance(result, Response):
+        return loads(result.body)["message"]
+    return result.message
+
+
+def splice(fields: Dict[str, Any], key: str, body: bytes) -> bytes:
+    """JSON object of `fields` plus `key` holding an already serialized body"""
+    head = dumps(fields)
+    separator = b"," if len(head) > 2 else b""
+    return b"".join((head[:-1], separator, dumps(key), b":", body, b"}"))
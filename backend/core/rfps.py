@@ -0,0 +1,389 @@
+"""
+Vector matching of RFP opportunities for the RFP Hunter agent.
+
+RFPs come from a newline-delimited JSON file (``ITT_RFP_FILE``, one
+``{"id", "title", "agency", "valueMin", "valueMax", "due", "description"}``
+object per line). Each one is embedded with a hashing vectorizer: its
+words and word pairs are hashed into ``ITT_RFP_DIMENSIONS`` buckets,
+weighted ``1 + log(tf)`` and L2-normalized. Hashing needs no vocabulary,
+so an RFP's vector never changes once computed. Corpus-wide IDF weights
+are applied to the query side only, from per-bucket document frequencies
+that are simply incremented as RFPs arrive.
+
+The vectors are stored as one float32 matrix file that is only ever
+appended to and is memory-mapped for scoring. A sync embeds only RFPs
+that are new or whose content changed (by content hash). A changed RFP
+gets a new row that supersedes its old one, and an RFP removed from the
+file is masked out. Nothing already embedded is embedded again.
+
+A query is scored against every RFP with one matrix-vector product over
+the columns of its hashed terms, and so is our capability profile (the services the Capabilities Expert
+describes). Results are ranked by query relevance plus capability fit,
+or by fit alone when the query names no subject ("find new RFPs"). An
+RFP's match percentage is that ranking score relative to the top-ranked
+RFP's, so the percentages always follow the order of the results.
+
+- ``ITT_RFP_FILE``        RFP corpus, NDJSON (default ``data/rfps.ndjson``)
+- ``ITT_RFP_INDEX``       directory of the embedding matrix (default ``rfps/`` in ``ITT_DATA_DIR``)
+- ``ITT_RFP_DIMENSIONS``  hashed feature buckets (default 2048; changing it re-embeds the corpus)
+- ``ITT_RFP_TOP_K``       RFPs returned per query (default 5)
+- ``ITT_RFP_REFRESH``     seconds between checks of the corpus file for new RFPs (default 60, 0 disables)
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from core import metrics, storage
+from core.text import tokenize
+
+try:
+    import fcntl
+except ImportError:  # POSIX only; elsewhere a single writer process is assumed
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+
+# Weight of capability fit next to query relevance in the ranking
+FIT_WEIGHT = 0.5
+
+# Query words that ask for RFPs without naming a subject
+QUERY_STOPWORDS = frozenset("find search show list me new open rfp rfps opportunities opportunity bids bid".split())
+
+# Fields of an RFP kept next to its vector (the description is only embedded)
+FIELDS = ("id", "title", "agency", "valueMin", "valueMax", "due")
+
+
+def features(text: str, stopwords: Iterable[str] = ()) -> List[str]:
+    """Words and adjacent word pairs of a text"""
+    skip = frozenset(stopwords)
+    words = [word for word in tokenize(text) if word not in skip]
+    return words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+
+
+def embed(texts: Sequence[str], dimensions: int, stopwords: Iterable[str] = ()) -> np.ndarray:
+    """L2-normalized hashed term-frequency vectors, one row per text"""
+    rows: List[int] = []
+    buckets: List[int] = []
+    for row, text in enumerate(texts):
+        for feature in features(text, stopwords):
+            rows.append(row)
+            buckets.append(zlib.crc32(feature.encode()) % dimensions)
+    counts = np.zeros((len(texts), dimensions), dtype=np.float32)
+    np.add.at(counts, (np.array(rows, dtype=np.int64), np.array(buckets, dtype=np.int64)), 1.0)
+    vectors = np.where(counts > 0, 1.0 + np.log(np.maximum(counts, 1.0)), 0.0).astype(np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1.0)
+
+
+def rfp_text(rfp: Dict[str, Any]) -> str:
+    return "\n".join(str(rfp.get(field) or "") for field in ("title", "agency", "description"))
+
+
+def content_hash(rfp: Dict[str, Any]) -> str:
+    return hashlib.sha1(json.dumps(rfp, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def read_corpus(path: Path) -> Dict[str, Dict[str, Any]]:
+    """RFPs in the corpus file by id (a later line with the same id wins)"""
+    rfps: Dict[str, Dict[str, Any]] = {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    rfp = json.loads(line)
+                    rfps[str(rfp["id"])] = rfp
+                except (ValueError, KeyError, TypeError):
+                    logger.warning("Skipping malformed RFP on line %d of %s", number, path)
+    except FileNotFoundError:
+        logger.warning("RFP corpus %s does not exist", path)
+    return rfps
+
+
+@dataclass(frozen=True)
+class Match:
+    """One ranked RFP"""
+    rfp: Dict[str, Any]
+    relevance: float
+    fit: float
+    match: int
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**self.rfp, "match": self.match, "relevance": round(self.relevance, 4)}
+
+
+class _Snapshot:
+    """One consistent view of the matrix, its rows and the derived weights"""
+
+    def __init__(self, vectors: np.ndarray, rows: List[Dict[str, Any]], df: np.ndarray, live: Dict[str, int]):
+        self.vectors = vectors
+        self.rows = rows
+        self.df = df
+        self.live = live
+        self.active = np.zeros(len(rows), dtype=bool)
+        self.active[list(live.values())] = True
+        self.idf = (np.log((1.0 + len(live)) / (1.0 + df)) + 1.0).astype(np.float32)
+        self.fit = np.zeros(len(rows), dtype=np.float32)
+
+    def weigh(self, vector: np.ndarray) -> np.ndarray:
+        """A query embedding with IDF weights applied, renormalized"""
+        weighted = vector * self.idf * self.idf
+        norm = float(np.linalg.norm(weighted))
+        return weighted / norm if norm else weighted
+
+
+class RfpIndex:
+    """Append-only embedding matrix of the RFP corpus with capability-fit scores"""
+
+    def __init__(self, source: Path, root: Path, dimensions: int = 2048, top_k: int = 5, refresh: float = 60.0):
+        self.source = source
+        self.root = root
+        self.dimensions = dimensions
+        self.top_k = top_k
+        self.refresh = refresh
+        self.profile = ""
+        self._snapshot: Optional[_Snapshot] = None
+        self._source_stat: Optional[Tuple[int, int]] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._refresher: Optional[asyncio.Task] = None
+        self.embedded = 0
+        self.syncs = 0
+        self.last_sync: Dict[str, Any] = {}
+        self.query_time = metrics.Histogram(metrics.DEFAULT_BUCKETS)
+
+    @property
+    def _vectors_path(self) -> Path:
+        return self.root / "vectors.f32"
+
+    @property
+    def _rows_path(self) -> Path:
+        return self.root / "rows.ndjson"
+
+    @property
+    def _state_path(self) -> Path:
+        return self.root / "state.json"
+
+    # Everything below until ``sync`` runs in a worker thread
+
+    def _load(self) -> Tuple[List[Dict[str, Any]], np.ndarray]:
+        """Rows and document frequencies on disk, repaired after an interrupted append"""
+        try:
+            state = json.loads(self._state_path.read_text())
+        except (FileNotFoundError, ValueError):
+            state = {}
+        if state.get("version") != FORMAT_VERSION or state.get("dimensions") != self.dimensions:
+            for path in (self._vectors_path, self._rows_path):
+                path.unlink(missing_ok=True)
+            state = {}
+        rows = []
+        if self._rows_path.exists():
+            with open(self._rows_path, encoding="utf-8") as f:
+                rows = [json.loads(line) for line in f if line.endswith("\n")]
+        stored = self._vectors_path.stat().st_size // (4 * self.dimensions) if self._vectors_path.exists() else 0
+        count = min(len(rows), stored)
+        if stored != count:
+            os.truncate(self._vectors_path, count * 4 * self.dimensions)
+        if len(rows) != count:
+            rows = rows[:count]
+            self._write_rows(rows)
+        # Document frequencies are saved with the number of rows they cover
+        df, covered = np.zeros(self.dimensions, dtype=np.int64), 0
+        if state and (self.root / "df.npy").exists():
+            saved = np.load(self.root / "df.npy")
+            if int(saved[-1]) <= count:
+                df, covered = saved[:-1], int(saved[-1])
+        if covered < count:
+            df += np.count_nonzero(self._matrix(count)[covered:], axis=0)
+        return rows, df
+
+    def _write_rows(self, rows: List[Dict[str, Any]]) -> None:
+        staging = self._rows_path.with_suffix(".tmp")
+        with open(staging, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(row, ensure_ascii=False) + "\n" for row in rows)
+        os.replace(staging, self._rows_path)
+
+    def _matrix(self, count: int) -> np.ndarray:
+        if not count:
+            return np.zeros((0, self.dimensions), dtype=np.float32)
+        return np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(count, self.dimensions))
+
+    def _sync(self) -> Tuple[_Snapshot, Dict[str, Any]]:
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self.root / "lock", "w") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            stat = os.stat(self.source) if self.source.exists() else None
+            corpus = read_corpus(self.source)
+            rows, df = self._load()
+            latest = {row["id"]: index for index, row in enumerate(rows)}
+            fresh = []
+            for rfp_id, rfp in corpus.items():
+                digest = content_hash(rfp)
+                index = latest.get(rfp_id)
+                if index is None or rows[index]["hash"] != digest:
+                    fresh.append((rfp, digest))
+            if fresh:
+                vectors = embed([rfp_text(rfp) for rfp, _ in fresh], self.dimensions)
+                with open(self._vectors_path, "ab") as f:
+                    f.write(vectors.tobytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+                added = [{**{field: rfp.get(field) for field in FIELDS}, "id": str(rfp["id"]), "hash": digest}
+                         for rfp, digest in fresh]
+                with open(self._rows_path, "a", encoding="utf-8") as f:
+                    f.writelines(json.dumps(row, ensure_ascii=False) + "\n" for row in added)
+                for offset, row in enumerate(added):
+                    latest[row["id"]] = len(rows) + offset
+                rows.extend(added)
+                df += np.count_nonzero(vectors, axis=0)
+            np.save(self.root / "df.tmp.npy", np.append(df, len(rows)))
+            os.replace(self.root / "df.tmp.npy", self.root / "df.npy")
+            state = {"version": FORMAT_VERSION, "dimensions": self.dimensions}
+            (self.root / "state.json.tmp").write_text(json.dumps(state))
+            os.replace(self.root / "state.json.tmp", self._state_path)
+        live = {rfp_id: index for rfp_id, index in latest.items() if rfp_id in corpus}
+        snapshot = _Snapshot(self._matrix(len(rows)), rows, df, live)
+        self._score_profile(snapshot)
+        self._source_stat = (stat.st_mtime_ns, stat.st_size) if stat else None
+        return snapshot, {"rfps": len(live), "rows": len(rows), "embedded": len(fresh)}
+
+    def _score_profile(self, snapshot: _Snapshot) -> None:
+        if self.profile and len(snapshot.rows):
+            profile = snapshot.weigh(embed([self.profile], self.dimensions)[0])
+            snapshot.fit = np.asarray(snapshot.vectors @ profile, dtype=np.float32)
+
+    def _source_changed(self) -> bool:
+        try:
+            stat = os.stat(self.source)
+        except FileNotFoundError:
+            return self._source_stat is not None
+        return (stat.st_mtime_ns, stat.st_size) != self._source_stat
+
+    async def sync(self, force: bool = False) -> Dict[str, Any]:
+        """Embed new and changed RFPs in a worker thread and switch to the result"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if not force and self._snapshot is not None and not self._source_changed():
+                return self.last_sync
+            started = time.perf_counter()
+            snapshot, stats = await asyncio.to_thread(self._sync)
+            self._snapshot = snapshot
+            self.syncs += 1
+            self.embedded += stats["embedded"]
+            self.last_sync = {**stats, "seconds": round(time.perf_counter() - started, 3), "at": time.time()}
+            return self.last_sync
+
+    def set_profile(self, profile: str) -> None:
+        """Text describing what we deliver, scored against every RFP as its capability fit"""
+        if profile == self.profile:
+            return
+        self.profile = profile
+        if self._snapshot is not None:
+            self._score_profile(self._snapshot)
+
+    async def ensure(self) -> Optional[_Snapshot]:
+        """The current snapshot, loading or building the matrix on first use"""
+        if self._snapshot is None:
+            await self.sync()
+            if self.refresh > 0 and self._refresher is None:
+                self._refresher = asyncio.get_running_loop().create_task(self._refresh())
+        return self._snapshot
+
+    async def _refresh(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh)
+            try:
+                await self.sync()
+            except Exception:
+                logger.exception("RFP corpus sync failed; still serving %d RFPs",
+                                 len(self._snapshot.live) if self._snapshot else 0)
+
+    async def stop(self) -> None:
+        if self._refresher is not None:
+            self._refresher.cancel()
+            await asyncio.gather(self._refresher, return_exceptions=True)
+            self._refresher = None
+
+    async def match(self, query: str, k: Optional[int] = None) -> Tuple[List[Match], int]:
+        """Top RFPs for a query and how many RFPs it matched"""
+        snapshot = await self.ensure()
+        if snapshot is None or not snapshot.live:
+            return [], 0
+        start = time.perf_counter()
+        k = k or self.top_k
+        query_vector = embed([query], self.dimensions, QUERY_STOPWORDS)[0]
+        if query_vector.any():
+            # Only the query's own buckets contribute, so only those columns are read
+            weighted = snapshot.weigh(query_vector)
+            columns = np.flatnonzero(weighted)
+            relevance = np.asarray(snapshot.vectors[:, columns] @ weighted[columns], dtype=np.float32)
+            candidates = snapshot.active & (relevance > 0)
+            scores = np.where(candidates, relevance + FIT_WEIGHT * snapshot.fit, -np.inf)
+        else:
+            relevance = np.zeros(len(snapshot.rows), dtype=np.float32)
+            candidates = snapshot.active
+            scores = np.where(candidates, snapshot.fit, -np.inf)
+        found = int(np.count_nonzero(candidates))
+        top = np.flatnonzero(candidates)
+        if len(top) > k:
+            top = top[np.argpartition(scores[top], -k)[-k:]]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        best = float(scores[top[0]]) if len(top) and scores[top[0]] > 0 else 1.0
+        matches = [Match({key: value for key, value in snapshot.rows[index].items() if key != "hash"},
+                         float(relevance[index]), float(snapshot.fit[index]), max(0, round(100 * float(scores[index]) / best)))
+                   for index in top.tolist()]
+        self.query_time.observe(time.perf_counter() - start)
+        return matches, found
+
+    def snapshot(self) -> Dict[str, Any]:
+        current = self._snapshot
+        return {
+            "source": str(self.source),
+            "rfps": len(current.live) if current else 0,
+            "rows": len(current.rows) if current else 0,
+            "dimensions": self.dimensions,
+            "bytesOnDisk": self._vectors_path.stat().st_size if self._vectors_path.exists() else 0,
+            "syncs": self.syncs,
+            "embedded": self.embedded,
+            "lastSync": self.last_sync,
+        }
+
+    def metric_lines(self) -> List[str]:
+        current = self._snapshot
+        return (
+            metrics.family("itt_rfp_corpus_size", "gauge", "RFPs available for matching", [({}, len(current.live) if current else 0)])
+            + metrics.family("itt_rfp_embedded_total", "counter", "RFPs embedded into the matrix", [({}, self.embedded)])
+            + metrics.histogram("itt_rfp_match_seconds", "Time to score and rank the corpus for one query", [({}, self.query_time)])
+        )
+
+
+def _index_from_env() -> RfpIndex:
+    return RfpIndex(
+        Path(os.getenv("ITT_RFP_FILE") or Path(__file__).resolve().parent.parent / "data" / "rfps.ndjson"),
+        Path(os.getenv("ITT_RFP_INDEX") or storage.DATA_DIR / "rfps"),
+        dimensions=int(os.getenv("ITT_RFP_DIMENSIONS", "2048")),
+        top_k=int(os.getenv("ITT_RFP_TOP_K", "5")),
+        refresh=float(os.getenv("ITT_RFP_REFRESH", "60")),
+    )
+
+
+index = _index_from_env()
+metrics.register_collector(index.metric_lines)
+
+
+async def match(query: str, k: Optional[int] = None) -> Tuple[List[Match], int]:
+    """Top RFPs for a query in the shared RFP index"""
+    return await index.match(query, k)
@@ -0,0 +1,482 @@
+"""
+Local full-text index behind the Knowledge Base agent.
+
+Markdown files under ``ITT_KNOWLEDGE_DIR`` are split into passages (a
+heading and the paragraphs under it, about ``PASSAGE_WORDS`` words each)
+and indexed in an inverted index ranked with BM25. The index lives on disk
+as flat arrays that are memory-mapped when it is opened: the sorted term
+dictionary, the postings (passage ids and term frequencies, grouped by
+term), per-passage lengths and BM25 length norms, and the passage text.
+Opening an index reads only its small manifest, and a query only pages in
+the postings of its own terms, so startup is immediate and the resident
+footprint stays small however large the corpus is.
+
+Reindexing is incremental. Files whose size and modification time are
+unchanged keep their passages: their postings are renumbered and copied
+from the current index with a few array operations, and only new or
+changed files are read and tokenized. Every build writes a new generation
+directory and then switches the ``CURRENT`` pointer atomically, so a
+reader (in this or another worker process) never sees a half-written
+index. The index is built on first use if none exists, and rescanned for
+changes every ``ITT_KNOWLEDGE_REFRESH`` seconds in a worker thread.
+
+- ``ITT_KNOWLEDGE_DIR``      corpus directory (default the repository's ``md/`` guides)
+- ``ITT_KNOWLEDGE_GLOB``     files indexed, relative to the corpus (default ``**/*.md``)
+- ``ITT_KNOWLEDGE_INDEX``    index directory (default ``knowledge/`` in ``ITT_DATA_DIR``)
+- ``ITT_KNOWLEDGE_TOP_K``    passages returned per query (default 5)
+- ``ITT_KNOWLEDGE_REFRESH``  seconds between rescans of the corpus (default 300, 0 disables)
+"""
+import asyncio
+import bisect
+import glob
+import json
+import logging
+import math
+import mmap
+import os
+import re
+import shutil
+import time
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from stat import S_ISREG
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core import metrics, storage
+from core.text import tokenize
+
+logger = logging.getLogger(__name__)
+
+# Words per passage before a section is split at the next paragraph break
+PASSAGE_WORDS = 120
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+FORMAT_VERSION = 1
+
+_HEADING = re.compile(r"^#{1,6}\s+(.*?)\s*#*\s*$")
+
+
+def split_passages(text: str, words: int = PASSAGE_WORDS) -> List[Tuple[str, str]]:
+    """``(heading, body)`` passages of a markdown document"""
+    passages: List[Tuple[str, str]] = []
+    heading = ""
+    lines: List[str] = []
+    count = 0
+
+    def flush() -> None:
+        body = "\n".join(lines).strip()
+        if body:
+            passages.append((heading, body))
+        lines.clear()
+
+    for line in text.splitlines():
+        match = _HEADING.match(line)
+        if match:
+            flush()
+            heading, count = match.group(1), 0
+        elif not line.strip() and count >= words:
+            flush()
+            count = 0
+        else:
+            lines.append(line)
+            count += len(line.split())
+    flush()
+    return passages
+
+
+@dataclass(frozen=True)
+class Hit:
+    """One ranked passage"""
+    file: str
+    heading: str
+    text: str
+    score: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"file": self.file, "heading": self.heading, "score": round(self.score, 4), "passage": self.text}
+
+
+class _Terms:
+    """Sorted term dictionary over a memory-mapped blob, searchable with ``bisect``"""
+
+    def __init__(self, blob, offsets: np.ndarray):
+        self._blob = blob
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int) -> bytes:
+        return self._blob[int(self._offsets[index]):int(self._offsets[index + 1])]
+
+    def find(self, term: str) -> int:
+        key = term.encode()
+        index = bisect.bisect_left(self, key)
+        return index if index < len(self) and self[index] == key else -1
+
+    def decode(self) -> List[str]:
+        blob = bytes(self._blob[:int(self._offsets[-1])]) if len(self) else b""
+        offsets = self._offsets.tolist()
+        return [blob[start:end].decode() for start, end in zip(offsets, offsets[1:])]
+
+
+def _map_file(path: Path):
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class IndexReader:
+    """One generation of the on-disk index, memory-mapped"""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        with open(directory / "manifest.json", encoding="utf-8") as f:
+            manifest = json.load(f)
+        self.files: List[Tuple[str, int, int, int, int]] = [tuple(entry) for entry in manifest["files"]]
+        self.passages: int = manifest["passages"]
+        self.avgdl: float = manifest["avgdl"]
+        self.k1: float = manifest["k1"]
+        self.b: float = manifest["b"]
+
+        def array(name: str) -> np.ndarray:
+            return np.load(directory / f"{name}.npy", mmap_mode="r")
+
+        self.terms = _Terms(_map_file(directory / "terms.bin"), array("term_offsets"))
+        self.postings = array("postings")
+        self.ids = array("ids")
+        self.tfs = array("tfs")
+        self.doclen = array("doclen")
+        self.norm = array("norm")
+        self.passage_file = array("passage_file")
+        self.text_offsets = array("text_offsets")
+        self._text = _map_file(directory / "text.bin")
+
+    @property
+    def size(self) -> int:
+        """Bytes on disk"""
+        return sum(path.stat().st_size for path in self.directory.iterdir())
+
+    def text(self, passage: int) -> Tuple[str, str]:
+        """``(heading, body)`` of a passage"""
+        raw = self._text[int(self.text_offsets[passage]):int(self.text_offsets[passage + 1])].decode()
+        heading, _, body = raw.partition("\n")
+        return heading, body
+
+    def search(self, query: str, k: int) -> List[Hit]:
+        """Top ``k`` passages for a query by BM25"""
+        n = self.passages
+        if not n:
+            return []
+        scores: Optional[np.ndarray] = None
+        for term in set(tokenize(query)):
+            index = self.terms.find(term)
+            if index < 0:
+                continue
+            start, end = int(self.postings[index]), int(self.postings[index + 1])
+            ids = self.ids[start:end]
+            tfs = self.tfs[start:end].astype(np.float32)
+            df = end - start
+            idf = math.log(1.0 + (n - df + 0.5) / (df + 0.5))
+            if scores is None:
+                scores = np.zeros(n, dtype=np.float32)
+            scores[ids] += idf * tfs * (self.k1 + 1.0) / (tfs + self.norm[ids])
+        if scores is None:
+            return []
+        matched = np.flatnonzero(scores)
+        if len(matched) > k:
+            matched = matched[np.argpartition(scores[matched], -k)[-k:]]
+        ranked = matched[np.argsort(-scores[matched], kind="stable")]
+        hits = []
+        for passage in ranked.tolist():
+            heading, body = self.text(passage)
+            hits.append(Hit(self.files[int(self.passage_file[passage])][0], heading, body, float(scores[passage])))
+        return hits
+
+
+def scan(corpus: Path, pattern: str) -> Dict[str, Tuple[int, int]]:
+    """``{relative path: (mtime_ns, size)}`` of the files to index"""
+    found = {}
+    for name in glob.iglob(os.path.join(glob.escape(str(corpus)), pattern), recursive=True):
+        stat = os.stat(name)
+        if S_ISREG(stat.st_mode):
+            found[Path(os.path.relpath(name, corpus)).as_posix()] = (stat.st_mtime_ns, stat.st_size)
+    return found
+
+
+def _generations(root: Path) -> List[Path]:
+    return sorted(root.glob("gen-*"), key=lambda path: int(path.name[4:]))
+
+
+def current_generation(root: Path) -> Optional[Path]:
+    try:
+        name = (root / "CURRENT").read_text().strip()
+    except FileNotFoundError:
+        return None
+    return root / name if name else None
+
+
+def build(corpus: Path, pattern: str, root: Path, previous: Optional[IndexReader] = None,
+          k1: float = K1, b: float = B) -> Tuple[Optional[Path], Dict[str, int]]:
+    """
+    Write a new index generation for the corpus, reusing ``previous`` for
+    unchanged files. Returns the new generation (``None`` when nothing
+    changed) and counts of the files reused and reindexed.
+    """
+    found = scan(corpus, pattern)
+    old = {entry[0]: entry for entry in previous.files} if previous is not None else {}
+    changed = {path for path, stat in found.items() if path not in old or tuple(old[path][1:3]) != stat}
+    removed = [path for path in old if path not in found]
+    stats = {"files": len(found), "reused": len(found) - len(changed), "reindexed": len(changed), "removed": len(removed)}
+    if previous is not None and not changed and not removed:
+        return None, stats
+
+    files: List[List[Any]] = []
+    doclen: List[np.ndarray] = []
+    text_chunks: List[bytes] = []
+    text_lengths: List[np.ndarray] = []
+    remap = np.full(previous.passages if previous is not None else 0, -1, dtype=np.int64)
+    if previous is not None:
+        old_doclen, old_offsets = np.asarray(previous.doclen), np.asarray(previous.text_offsets)
+    new_terms: Dict[str, int] = {}
+    new_term_ids: List[int] = []
+    new_ids: List[int] = []
+    new_tfs: List[int] = []
+    start = 0
+    for path in sorted(found):
+        mtime, size = found[path]
+        if path not in changed:
+            _, _, _, old_start, count = old[path]
+            remap[old_start:old_start + count] = np.arange(start, start + count)
+            doclen.append(old_doclen[old_start:old_start + count])
+            offsets = old_offsets[old_start:old_start + count + 1]
+            text_chunks.append(previous._text[int(offsets[0]):int(offsets[-1])])
+            text_lengths.append(np.diff(offsets))
+        else:
+            try:
+                document = (corpus / path).read_text(encoding="utf-8", errors="replace")
+            except OSError:
+                logger.warning("Could not read %s; skipping it", corpus / path)
+                continue
+            lengths, raw_lengths = [], []
+            for offset, (heading, body) in enumerate(split_passages(document)):
+                tokens = Counter(tokenize(f"{heading}\n{body}"))
+                for term, tf in tokens.items():
+                    new_term_ids.append(new_terms.setdefault(term, len(new_terms)))
+                    new_ids.append(start + offset)
+                    new_tfs.append(min(tf, 0xFFFF))
+                lengths.append(sum(tokens.values()))
+                raw = f"{heading}\n{body}".encode()
+                text_chunks.append(raw)
+                raw_lengths.append(len(raw))
+            count = len(lengths)
+            text_lengths.append(np.array(raw_lengths, dtype=np.int64))
+            doclen.append(np.array(lengths, dtype=np.uint32))
+        files.append([path, mtime, size, start, count])
+        start += count
+
+    # Postings kept from unchanged files, renumbered, plus the new ones
+    if previous is not None and len(previous.ids):
+        old_term_ids = np.repeat(np.arange(len(previous.terms)), np.diff(previous.postings))
+        kept_ids = remap[previous.ids]
+        keep = kept_ids >= 0
+        old_term_ids, kept_ids, kept_tfs = old_term_ids[keep], kept_ids[keep], np.asarray(previous.tfs)[keep]
+        used_terms = np.flatnonzero(np.bincount(old_term_ids, minlength=len(previous.terms)))
+        old_vocabulary = previous.terms.decode()
+        old_terms = [old_vocabulary[index] for index in used_terms.tolist()]
+    else:
+        old_term_ids = kept_ids = used_terms = np.zeros(0, dtype=np.int64)
+        kept_tfs = np.zeros(0, dtype=np.uint16)
+        old_terms = []
+    vocabulary = sorted(set(old_terms).union(new_terms))
+    position = {term: index for index, term in enumerate(vocabulary)}
+    old_map = np.zeros(len(previous.terms) if previous is not None else 0, dtype=np.int64)
+    old_map[used_terms] = [position[term] for term in old_terms]
+    new_map = np.array([position[term] for term in new_terms], dtype=np.int64)
+    # Files keep their path order and both vocabularies are sorted, so the
+    # kept postings are still ordered by (term, passage): only the new ones
+    # need sorting, then they are merged in
+    stride = start + 1
+    kept_keys = old_map[old_term_ids] * stride + kept_ids
+    new_keys = new_map[np.array(new_term_ids, dtype=np.int64)] * stride + np.array(new_ids, dtype=np.int64)
+    order = np.argsort(new_keys, kind="stable")
+    new_keys = new_keys[order]
+    at = np.searchsorted(kept_keys, new_keys)
+    keys = np.insert(kept_keys, at, new_keys)
+    tfs = np.insert(kept_tfs, at, np.array(new_tfs, dtype=np.uint16)[order])
+    term_ids, ids = np.divmod(keys, stride)
+    postings = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(term_ids, minlength=len(vocabulary)), out=postings[1:])
+
+    lengths = np.concatenate(doclen).astype(np.uint32) if doclen else np.zeros(0, dtype=np.uint32)
+    avgdl = float(lengths.mean()) if len(lengths) else 0.0
+    norm = (k1 * (1.0 - b + b * lengths / avgdl) if avgdl else np.zeros(len(lengths))).astype(np.float32)
+    encoded = [term.encode() for term in vocabulary]
+    term_offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(term) for term in encoded], out=term_offsets[1:])
+    text_offsets = np.zeros(start + 1, dtype=np.int64)
+    if text_lengths:
+        np.cumsum(np.concatenate(text_lengths), out=text_offsets[1:])
+
+    root.mkdir(parents=True, exist_ok=True)
+    generations = _generations(root)
+    number = int(generations[-1].name[4:]) + 1 if generations else 1
+    staging = root / f"tmp-{os.getpid()}-{number}"
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir()
+    (staging / "terms.bin").write_bytes(b"".join(encoded))
+    (staging / "text.bin").write_bytes(b"".join(text_chunks))
+    for name, value in (("term_offsets", term_offsets), ("postings", postings), ("ids", ids.astype(np.uint32)),
+                        ("tfs", tfs), ("doclen", lengths), ("norm", norm),
+                        ("passage_file", np.repeat(np.arange(len(files), dtype=np.uint32), [entry[4] for entry in files])),
+                        ("text_offsets", text_offsets)):
+        np.save(staging / f"{name}.npy", value)
+    manifest = {"version": FORMAT_VERSION, "files": files, "passages": start, "avgdl": avgdl, "k1": k1, "b": b}
+    (staging / "manifest.json").write_text(json.dumps(manifest))
+    generation = root / f"gen-{number}"
+    os.rename(staging, generation)
+    pointer = root / f"CURRENT.{os.getpid()}"
+    pointer.write_text(generation.name)
+    os.replace(pointer, root / "CURRENT")
+    # Older generations stay readable through open maps until their readers go away
+    for stale in _generations(root):
+        if stale != generation:
+            shutil.rmtree(stale, ignore_errors=True)
+    return generation, stats
+
+
+class SearchIndex:
+    """The corpus index: opened (or built) on first search and kept up to date in the background"""
+
+    def __init__(self, corpus: Path, root: Path, pattern: str = "**/*.md", top_k: int = 5, refresh: float = 300.0):
+        self.corpus = corpus
+        self.root = root
+        self.pattern = pattern
+        self.top_k = top_k
+        self.refresh = refresh
+        self._reader: Optional[IndexReader] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._refresher: Optional[asyncio.Task] = None
+        self.builds = 0
+        self.queries = 0
+        self.last_build: Dict[str, Any] = {}
+        self.query_time = metrics.Histogram(metrics.DEFAULT_BUCKETS)
+
+    @property
+    def reader(self) -> Optional[IndexReader]:
+        return self._reader
+
+    def _open(self) -> Optional[IndexReader]:
+        generation = current_generation(self.root)
+        if generation is None:
+            return None
+        if self._reader is not None and self._reader.directory == generation:
+            return self._reader
+        try:
+            return IndexReader(generation)
+        except (OSError, ValueError, KeyError):
+            logger.warning("Knowledge index %s is unreadable; rebuilding it", generation)
+            return None
+
+    async def reindex(self) -> Dict[str, Any]:
+        """Index new and changed files in a worker thread and switch to the result"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            started = time.perf_counter()
+            # Another process may have moved the index on since it was opened
+            previous = self._open() or self._reader
+            generation, stats = await asyncio.to_thread(build, self.corpus, self.pattern, self.root, previous)
+            self._reader = IndexReader(generation) if generation is not None else previous
+            self.builds += generation is not None
+            self.last_build = {**stats, "seconds": round(time.perf_counter() - started, 3), "at": time.time()}
+            return self.last_build
+
+    async def ensure(self) -> Optional[IndexReader]:
+        """The open index, opening or building it on first use"""
+        if self._reader is None:
+            self._reader = self._open()
+            if self._reader is None:
+                await self.reindex()
+            if self.refresh > 0:
+                if self._lock is None:
+                    self._lock = asyncio.Lock()
+                async with self._lock:
+                    if self._refresher is None or self._refresher.done():
+                        self._refresher = asyncio.get_running_loop().create_task(self._refresh())
+        return self._reader
+
+    async def _refresh(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh)
+            try:
+                await self.reindex()
+            except Exception:
+                logger.exception("Knowledge index refresh failed; still serving generation %s",
+                                 self._reader.directory.name if self._reader else None)
+
+    async def stop(self) -> None:
+        if self._refresher is not None:
+            self._refresher.cancel()
+            await asyncio.gather(self._refresher, return_exceptions=True)
+            self._refresher = None
+
+    async def search(self, query: str, k: Optional[int] = None) -> List[Hit]:
+        """Top passages for a query"""
+        reader = await self.ensure()
+        if reader is None:
+            return []
+        start = time.perf_counter()
+        hits = reader.search(query, k or self.top_k)
+        self.query_time.observe(time.perf_counter() - start)
+        self.queries += 1
+        return hits
+
+    def snapshot(self) -> Dict[str, Any]:
+        reader = self._reader
+        return {
+            "corpus": str(self.corpus),
+            "generation": reader.directory.name if reader else None,
+            "documents": len(reader.files) if reader else 0,
+            "passages": reader.passages if reader else 0,
+            "terms": len(reader.terms) if reader else 0,
+            "bytesOnDisk": reader.size if reader else 0,
+            "builds": self.builds,
+            "queries": self.queries,
+            "lastBuild": self.last_build,
+        }
+
+    def metric_lines(self) -> List[str]:
+        reader = self._reader
+        return (
+            metrics.family("itt_knowledge_passages", "gauge", "Passages in the knowledge index",
+                           [({}, reader.passages if reader else 0)])
+            + metrics.family("itt_knowledge_builds_total", "counter", "Knowledge index generations written", [({}, self.builds)])
+            + metrics.histogram("itt_knowledge_query_seconds", "Time to rank one knowledge query", [({}, self.query_time)])
+        )
+
+
+def _index_from_env() -> SearchIndex:
+    return SearchIndex(
+        Path(os.getenv("ITT_KNOWLEDGE_DIR") or Path(__file__).resolve().parents[2] / "md"),
+        Path(os.getenv("ITT_KNOWLEDGE_INDEX") or storage.DATA_DIR / "knowledge"),
+        pattern=os.getenv("ITT_KNOWLEDGE_GLOB", "**/*.md"),
+        top_k=int(os.getenv("ITT_KNOWLEDGE_TOP_K", "5")),
+        refresh=float(os.getenv("ITT_KNOWLEDGE_REFRESH", "300")),
+    )
+
+
+index = _index_from_env()
+metrics.register_collector(index.metric_lines)
+
+
+async def search(query: str, k: Optional[int] = None) -> List[Hit]:
+    """Top passages for a query in the shared knowledge index"""
+    return await index.search(query, k)
@@ -0,0 +1,28 @@
+"""
+Local on-disk state (job queue, conversation memory and other data that
+must survive restarts).
+
+Everything the backend persists lives under one data directory, created
+when the first database is opened. SQLite databases are opened in WAL mode
+with ``synchronous=NORMAL``: readers never block the writer and a commit is
+one sequential WAL append, durable across process crashes (an OS crash may
+lose the last commits).
+
+- ``ITT_DATA_DIR``  directory for local state (default ``backend/var``)
+"""
+import os
+import sqlite3
+from pathlib import Path
+
+DATA_DIR = Path(os.getenv("ITT_DATA_DIR") or Path(__file__).resolve().parent.parent / "var")
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """SQLite connection in WAL mode, usable from the one thread that owns it"""
+    if path != ":memory:":
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.row_factory = sqlite3.Row
+    return connection
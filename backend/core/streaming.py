@@ -0,0 +1,125 @@
+"""
+Server-Sent Events variants of the agent endpoints.
+
+``add_stream_routes(router)`` registers ``<path>/stream`` next to every
+agent POST route on a router. The stream sends a ``thinking`` status as soon
+as the request is accepted, advances through ``searching`` and
+``processing`` while the agent works, then delivers the markdown in chunks
+followed by the structured ``data`` and a final ``complete`` event. Each
+event's payload matches the frontend ``AgentStreamEvent`` type.
+
+The JSON endpoints are left untouched; the stream runs the same handler,
+after the same admission rate limits.
+"""
+import asyncio
+from typing import AsyncIterator, Awaitable, Callable, List
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from fastapi.routing import APIRoute
+
+from core.agents import AgentHandler
+from core.responses import dumps, response_dict
+from models import AgentRequest, AgentResponse
+
+# Status transitions shown while the agent is still working
+PROGRESS_STATUSES = ("thinking", "searching", "processing")
+
+# Seconds between status transitions
+STATUS_INTERVAL = 0.3
+
+# Upper bound on characters per content event
+CHUNK_SIZE = 120
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def sse_event(payload: dict) -> bytes:
+    """Encode one SSE event whose data is the JSON payload"""
+    return b"event: " + payload["type"].encode() + b"\ndata: " + dumps(payload) + b"\n\n"
+
+
+def chunk_markdown(text: str, size: int = CHUNK_SIZE) -> List[str]:
+    """Split markdown on line boundaries into chunks of at most `size` characters"""
+    chunks: List[str] = []
+    current = ""
+    for line in text.splitlines(keepends=True):
+        while len(line) > size:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(line[:size])
+            line = line[size:]
+        if len(current) + len(line) > size:
+            chunks.append(current)
+            current = ""
+        current += line
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+async def agent_events(handler: AgentHandler, request: AgentRequest) -> AsyncIterator[bytes]:
+    """Run an agent handler and narrate it as SSE events"""
+    task = asyncio.ensure_future(handler(request))
+    try:
+        for status in PROGRESS_STATUSES:
+            yield sse_event({"type": "status", "status": status})
+            done, _ = await asyncio.wait({task}, timeout=STATUS_INTERVAL)
+            if done:
+                break
+        response = response_dict(await task)
+    except HTTPException as exc:
+        yield sse_event({"type": "error", "status": "error", "content": str(exc.detail)})
+        return
+    except Exception:
+        yield sse_event({"type": "error", "status": "error", "content": "Agent failed to respond"})
+        return
+    finally:
+        if not task.done():
+            task.cancel()
+
+    for chunk in chunk_markdown(response["message"]):
+        yield sse_event({"type": "content", "content": chunk})
+    if response.get("data") is not None:
+        yield sse_event({"type": "data", "data": response["data"]})
+    yield sse_event({
+        "type": "complete",
+        "status": response["status"],
+        "success": response["success"],
+        "timestamp": response["timestamp"],
+    })
+
+
+def stream_endpoint(handler: AgentHandler) -> Callable[[AgentRequest], Awaitable[StreamingResponse]]:
+    """
+    Build the SSE route endpoint for an agent handler.
+
+    Handlers exposing ``check`` (admission rate limits) and ``run`` have the
+    check applied before the response starts, so a 429 keeps its status and
+    ``Retry-After`` instead of becoming an ``error`` event on a 200 stream.
+    """
+    check = getattr(handler, "check", None)
+    run = getattr(handler, "run", handler)
+
+    async def endpoint(request: AgentRequest) -> StreamingResponse:
+        if check is not None:
+            check()
+        return StreamingResponse(agent_events(run, request), media_type="text/event-stream", headers=SSE_HEADERS)
+
+    endpoint.__name__ = f"{handler.__name__}_stream"
+    endpoint.__doc__ = f"Server-Sent Events stream of {handler.__name__} (status, content chunks, data, complete)"
+    return endpoint
+
+
+def add_stream_routes(router: APIRouter) -> None:
+    """Register a ``/stream`` SSE variant for every agent route on the router"""
+    for route in list(router.routes):
+        if isinstance(route, APIRoute) and route.response_model is AgentResponse and "POST" in route.methods:
+            router.add_api_route(
+                f"{route.path}/stream",
+                stream_endpoint(route.endpoint),
+                methods=["POST"],
+                summary=f"{route.summary} (stream)" if route.summary else None,
+                response_class=StreamingResponse,
+            )
@@ -0,0 +1,15 @@
+"""Text tokenization shared by the local search indexes"""
+import re
+from typing import List
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have how i if in is it its of on or our so that the their then there "
+    "these this to was we what when where which who why will with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric terms without stopwords"""
+    return [token for token in _TOKEN.findall(text.lower()) if token not in STOPWORDS]
@@ -0,0 +1,125 @@
+"""
+Stateless HMAC-signed auth tokens.
+
+Tokens are standard HS256 JWTs carrying the claims authorization needs
+(user id, role, expiry), so verifying one never touches the user
+directory. Successfully verified tokens go into a bounded LRU/TTL cache,
+letting hot tokens skip the base64/HMAC/JSON work entirely.
+
+- ``ITT_AUTH_SECRET``       signing key (random per process if unset, which
+                            invalidates tokens on restart)
+- ``ITT_TOKEN_TTL``         token lifetime in seconds (default 8 hours)
+- ``ITT_TOKEN_CACHE_SIZE``  verified-token cache capacity (default 10000)
+- ``ITT_TOKEN_CACHE_TTL``   how long a verified token stays cached (default 300s)
+"""
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from core.cache import TTLCache
+from models import User
+
+
+class InvalidToken(ValueError):
+    """Raised when a token is malformed, forged or expired"""
+
+
+@dataclass(frozen=True)
+class TokenClaims:
+    user_id: str
+    role: str
+    expires_at: int
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+# Only HS256 tokens we issued ourselves are accepted, so the header is fixed
+_HEADER = _b64encode(json.dumps({"alg": "HS256", "typ": "JWT"}, separators=(",", ":")).encode())
+
+
+class TokenService:
+    """Issues and verifies signed tokens, caching verified ones"""
+
+    def __init__(self, secret: bytes, ttl: int = 8 * 3600, cache_size: int = 10_000, cache_ttl: float = 300.0):
+        self._secret = secret
+        self.ttl = ttl
+        self.cache: TTLCache[TokenClaims] = TTLCache(maxsize=cache_size, ttl=cache_ttl, clock=time.time)
+
+    def _sign(self, signing_input: bytes) -> str:
+        return _b64encode(hmac.new(self._secret, signing_input, hashlib.sha256).digest())
+
+    def issue(self, user: User, now: Optional[float] = None) -> str:
+        """Mint a token for a user"""
+        issued_at = int(time.time() if now is None else now)
+        payload = {"sub": user.id, "role": user.role, "iat": issued_at, "exp": issued_at + self.ttl}
+        signing_input = f"{_HEADER}.{_b64encode(json.dumps(payload, separators=(',', ':')).encode())}"
+        return f"{signing_input}.{self._sign(signing_input.encode())}"
+
+    def verify_uncached(self, token: str) -> TokenClaims:
+        """Check signature and expiry without consulting the cache"""
+        try:
+            header, payload, signature = token.split(".")
+        except ValueError:
+            raise InvalidToken("Malformed token")
+        if header != _HEADER:
+            raise InvalidToken("Unsupported token header")
+
+        expected = self._sign(f"{header}.{payload}".encode())
+        # Compare bytes: compare_digest raises TypeError for non-ASCII str, and headers carry arbitrary latin-1
+        if not hmac.compare_digest(expected.encode(), signature.encode("utf-8", "surrogateescape")):
+            raise InvalidToken("Bad token signature")
+
+        try:
+            claims = json.loads(_b64decode(payload))
+            result = TokenClaims(user_id=str(claims["sub"]), role=str(claims["role"]), expires_at=int(claims["exp"]))
+        except (ValueError, KeyError, TypeError):
+            raise InvalidToken("Malformed token claims")
+
+        if result.expires_at <= time.time():
+            raise InvalidToken("Token expired")
+        return result
+
+    def verify(self, token: str) -> TokenClaims:
+        """Verify a token, serving repeat verifications from the cache"""
+        claims = self.cache.get(token)
+        if claims is not None:
+            return claims
+        claims = self.verify_uncached(token)
+        # Never let a cached entry outlive the token itself
+        self.cache.set(token, claims, ttl=claims.expires_at - time.time())
+        return claims
+
+
+def _service_from_env() -> TokenService:
+    secret = os.getenv("ITT_AUTH_SECRET")
+    return TokenService(
+        secret=secret.encode() if secret else secrets.token_bytes(32),
+        ttl=int(os.getenv("ITT_TOKEN_TTL", str(8 * 3600))),
+        cache_size=int(os.getenv("ITT_TOKEN_CACHE_SIZE", "10000")),
+        cache_ttl=float(os.getenv("ITT_TOKEN_CACHE_TTL", "300")),
+    )
+
+
+service = _service_from_env()
+
+
+def issue_token(user: User) -> str:
+    """Mint a token for a user with the shared service"""
+    return service.issue(user)
+
+
+def verify_token(token: str) -> TokenClaims:
+    """Verify a token with the shared service"""
+    return service.verify(token)
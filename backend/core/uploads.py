@@ -0,0 +1,122 @@
+"""Streamed CSV and NDJSON request bodies, parsed into records batch by batch"""
+import csv
+import io
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+FORMATS = ("csv", "ndjson")
+
+
+def body_format(requested: Optional[str], content_type: str) -> str:
+    """The ``format`` query parameter, else NDJSON for JSON content types, else CSV"""
+    return requested or ("ndjson" if "json" in content_type else "csv")
+
+
+class _RecordScanner:
+    """Finds where the last complete CSV record in each chunk ends
+
+    Follows the ``csv`` module's default dialect: a quote opens a field only
+    at the start of the field, ``""`` inside a quoted field is a literal
+    quote, and newlines inside quoted fields belong to the field. The state
+    carries over between chunks, so each byte is looked at once.
+    """
+
+    def __init__(self):
+        self.quoted = False
+        self.opens = True  # whether a quote at the next byte opens a field
+
+    def end(self, chunk: bytes) -> int:
+        """Offset just past the last record-ending newline in ``chunk``, or -1"""
+        end = -1
+        index = 0
+        closed = -2  # offset of the last closing quote
+        while True:
+            found = chunk.find(b'"', index)
+            stop = len(chunk) if found < 0 else found
+            if not self.quoted:
+                newline = chunk.rfind(b"\n", index, stop)
+                if newline >= 0:
+                    end = newline + 1
+            if found < 0:
+                break
+            if self.quoted:
+                self.quoted = False
+                closed = found
+            elif found == closed + 1 or (found == 0 and self.opens) or chunk[found - 1:found] in (b",", b"\n", b"\r"):
+                self.quoted = True
+            index = found + 1
+        if chunk:
+            self.opens = not self.quoted and (closed == len(chunk) - 1 or chunk[-1:] in (b",", b"\n", b"\r"))
+        return end
+
+
+async def batches(chunks: AsyncIterator[bytes], kind: str, size: int) -> AsyncIterator[Tuple[List[Dict[str, Any]], int]]:
+    """``(records, rejected)`` every ``size`` records and once at the end of the body
+
+    CSV bodies start with a header row; rows with a different number of
+    fields, and NDJSON lines that are not JSON objects, count as rejected.
+    Quoted CSV fields may contain newlines. Only the unfinished record at the
+    end of the body so far is kept between chunks; everything before it is
+    decoded and parsed once.
+    """
+    header: Optional[List[str]] = None
+    pending: List[Dict[str, Any]] = []
+    rejected = 0
+    tail: List[bytes] = []
+    scanner = _RecordScanner()
+    encoding = "utf-8-sig"
+
+    def take(data: bytes) -> None:
+        nonlocal header, rejected, encoding
+        text = data.decode(encoding, errors="replace")
+        encoding = "utf-8"
+        if kind == "ndjson":
+            for line in text.split("\n"):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    record = None
+                if isinstance(record, dict):
+                    pending.append(record)
+                else:
+                    rejected += 1
+            return
+        # ``data`` holds whole records only, so a fresh reader never sees half of one
+        reader = csv.reader(io.StringIO(text, newline=""))
+        while True:
+            try:
+                values = next(reader)
+            except StopIteration:
+                break
+            except csv.Error:  # a field over csv.field_size_limit()
+                rejected += 1
+                continue
+            if len(values) <= 1 and not "".join(values).strip():
+                continue
+            if header is None:
+                header = values
+            elif len(values) == len(header):
+                pending.append(dict(zip(header, values)))
+            else:
+                rejected += 1
+
+    async for chunk in chunks:
+        end = chunk.rfind(b"\n") + 1 if kind == "ndjson" else scanner.end(chunk)
+        if end <= 0:
+            tail.append(chunk)
+            continue
+        take(b"".join([*tail, chunk[:end]]))
+        tail = [chunk[end:]]
+        if len(pending) >= size:
+            yield list(pending), rejected
+            pending.clear()
+            rejected = 0
+    if scanner.quoted:
+        # A quoted field that is never closed
+        tail.clear()
+        rejected += 1
+    take(b"".join(tail))
+    if pending or rejected:
+        yield list(pending), rejected
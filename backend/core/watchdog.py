@@ -0,0 +1,174 @@
+"""
+Event-loop lag monitor and blocking-call detector.
+
+A heartbeat task on the event loop sleeps for ``interval`` seconds and
+records how late it woke up: that is the scheduling lag every other
+coroutine saw at the same moment. A daemon thread checks the heartbeat;
+once the loop has not ticked for ``threshold`` seconds it grabs the loop
+thread's current stack with ``sys._current_frames``, i.e. the code that is
+blocking the loop right now (a sync ``time.sleep``, CPU-heavy parsing, a
+blocking client call...). Each stall is logged as a warning with that
+stack, kept in a bounded history for ``GET /api/diagnostics/loop`` and
+counted in ``/api/metrics``.
+
+- ``ITT_WATCHDOG``            ``0`` disables the watchdog (default on)
+- ``ITT_WATCHDOG_INTERVAL``   heartbeat period in seconds (default 0.05)
+- ``ITT_WATCHDOG_THRESHOLD``  stall that triggers a capture (default 0.25)
+"""
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+from core import metrics
+
+logger = logging.getLogger(__name__)
+
+# Stalls kept for the diagnostics endpoint
+HISTORY = 50
+
+# Innermost frames kept per captured stack
+STACK_DEPTH = 30
+
+# Recent lag samples used for the percentiles
+SAMPLES = 1200
+
+
+class LoopWatchdog:
+    """Measures event-loop lag and captures the stack of whatever blocks it"""
+
+    def __init__(self, interval: float = 0.05, threshold: float = 0.25, history: int = HISTORY):
+        self.interval = interval
+        self.threshold = threshold
+        self.stalls: Deque[Dict[str, Any]] = deque(maxlen=history)
+        self.stall_count = 0
+        self.max_lag = 0.0
+        self.last_lag = 0.0
+        self._lags: Deque[float] = deque(maxlen=SAMPLES)
+        self._last_beat = time.monotonic()
+        self._loop_thread: Optional[int] = None
+        self._current: Optional[Dict[str, Any]] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start monitoring the running event loop"""
+        if self.running:
+            return
+        self._loop_thread = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    async def _heartbeat(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._last_beat = now
+            self._record(max(0.0, now - expected))
+
+    def _record(self, lag: float) -> None:
+        self.last_lag = lag
+        self._lags.append(lag)
+        if lag > self.max_lag:
+            self.max_lag = lag
+        stall = self._current
+        if stall is not None:
+            # The loop is running again; the stall lasted (at least) as long as this tick was late
+            self._current = None
+            stall["blockedSeconds"] = round(lag, 4)
+            stall["resolved"] = True
+            logger.warning("Event loop was blocked for %.3fs", stall["blockedSeconds"])
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.interval):
+            # Time since the heartbeat was due, i.e. how long the loop has been stuck
+            stalled = time.monotonic() - self._last_beat - self.interval
+            if stalled >= self.threshold and self._current is None:
+                self._capture(stalled)
+
+    def _capture(self, stalled: float) -> None:
+        frame = sys._current_frames().get(self._loop_thread)
+        stack = traceback.format_stack(frame)[-STACK_DEPTH:] if frame is not None else []
+        stall = {
+            "detectedAt": datetime.now().isoformat(),
+            "blockedSeconds": round(stalled, 4),
+            "resolved": False,
+            "stack": [line.rstrip() for line in stack],
+        }
+        self._current = stall
+        self.stalls.append(stall)
+        self.stall_count += 1
+        logger.warning("Event loop blocked for %.3fs so far; loop thread stack:\n%s", stalled, "".join(stack))
+
+    def percentile(self, q: float) -> float:
+        ordered = sorted(self._lags)
+        if not ordered:
+            return 0.0
+        return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current lag statistics and recent stalls, newest first"""
+        return {
+            "running": self.running,
+            "intervalSeconds": self.interval,
+            "thresholdSeconds": self.threshold,
+            "lagSeconds": {
+                "last": round(self.last_lag, 6),
+                "p50": round(self.percentile(50), 6),
+                "p99": round(self.percentile(99), 6),
+                "max": round(self.max_lag, 6),
+            },
+            "stallCount": self.stall_count,
+            "stalls": list(reversed(self.stalls)),
+        }
+
+    def metric_lines(self) -> List[str]:
+        return (
+            metrics.family("itt_event_loop_lag_seconds", "gauge", "Event-loop scheduling lag at the last heartbeat",
+                           [({}, self.last_lag)])
+            + metrics.family("itt_event_loop_lag_max_seconds", "gauge", "Largest event-loop lag observed",
+                             [({}, self.max_lag)])
+            + metrics.family("itt_event_loop_stalls_total", "counter", "Times the event loop was blocked past the threshold",
+                             [({}, self.stall_count)])
+        )
+
+
+def _watchdog_from_env() -> LoopWatchdog:
+    return LoopWatchdog(
+        interval=float(os.getenv("ITT_WATCHDOG_INTERVAL", "0.05")),
+        threshold=float(os.getenv("ITT_WATCHDOG_THRESHOLD", "0.25")),
+    )
+
+
+WATCHDOG_ENABLED = os.getenv("ITT_WATCHDOG", "1").lower() not in ("0", "false", "no", "off")
+
+watchdog = _watchdog_from_env()
+metrics.register_collector(watchdog.metric_lines)
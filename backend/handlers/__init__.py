@@ -0,0 +1 @@
+# Custom agent handlers, referenced from the catalog as "module:function"
@@ -0,0 +1,36 @@
+"""Engineering agents whose replies are computed from local data instead of catalog templates"""
+from core import responses, search
+from core.catalog import DEFAULT_INTENT, AgentSpec
+from models import AgentRequest, AgentResponse
+
+# Characters of each passage shown in the reply message
+SNIPPET_CHARS = 280
+
+
+def snippet(text: str, limit: int = SNIPPET_CHARS) -> str:
+    """Passage text flattened to one line and cut at a word boundary"""
+    flat = " ".join(text.split())
+    if len(flat) <= limit:
+        return flat
+    return flat[:limit].rsplit(" ", 1)[0] + " …"
+
+
+async def knowledge(agent: AgentSpec, request: AgentRequest):
+    """Knowledge Base: top BM25 passages from the local documentation index"""
+    hits = await search.search(request.message)
+    reader = search.index.reader
+    data = {
+        "query": request.message,
+        "documentsIndexed": len(reader.files) if reader else 0,
+        "passagesIndexed": reader.passages if reader else 0,
+        "results": [hit.to_dict() for hit in hits],
+    }
+    if not hits:
+        default = agent.responses[DEFAULT_INTENT]
+        return responses.respond(AgentResponse(success=True, message=default["message"], data={**default.get("data", {}), **data}))
+    lines = [f"**Top {len(hits)} passages for \"{request.message}\":**", ""]
+    for rank, hit in enumerate(hits, 1):
+        title = f"{hit.heading} — " if hit.heading else ""
+        lines.append(f"{rank}. **{title}`{hit.file}`**")
+        lines.append(f"   {snippet(hit.text)}")
+    return responses.respond(AgentResponse(success=True, message="\n".join(lines), data=data))
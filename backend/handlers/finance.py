@@ -0,0 +1,112 @@
+"""Finance agents whose replies are computed from local data instead of catalog templates"""
+from typing import Any, Dict, Optional
+
+from core import intents, responses
+from core.catalog import DEFAULT_INTENT, AgentSpec, reply_builder
+from core.ledger import ACTUAL, BUDGET, find_period, ledger, period_label
+from models import AgentRequest, AgentResponse
+
+# Departments listed in the budget reply
+TOP_DEPARTMENTS = 5
+
+
+def usd(value: float) -> str:
+    """``-80000.0`` -> ``"-$80,000"``"""
+    return f"{'-' if value < 0 else ''}${abs(value):,.0f}"
+
+
+def mentioned_department(message: str) -> Optional[str]:
+    lowered = message.lower()
+    return next((name for name in ledger.departments if name and name.lower() in lowered), None)
+
+
+def no_ledger(agent: AgentSpec):
+    default = agent.responses[DEFAULT_INTENT]
+    return responses.respond(AgentResponse(success=True, message=default["message"],
+                                           data={**default.get("data", {}), **ledger.summary()}))
+
+
+async def budget_analyst(agent: AgentSpec, request: AgentRequest):
+    """Budget Analyst: budget vs actual spend from the ledger rollups"""
+    await ledger.ensure()
+    period = find_period(request.message) or ledger.latest(BUDGET, quarter=False) or ledger.latest(ACTUAL, quarter=False)
+    if period is None:
+        return no_ledger(agent)
+    department = mentioned_department(request.message)
+    report = ledger.variance(period, department)
+    scope = f"{department} - {period_label(period)}" if department else period_label(period)
+    lines = [
+        f"**Budget vs Actual ({scope}):**",
+        "",
+        f"💰 Budget: {usd(report['totalBudget'])}",
+        f"📉 Spent: {usd(report['spent'])}" + (f" ({report['usedPercent']:.0f}%)" if report["usedPercent"] is not None else ""),
+        f"✅ Remaining: {usd(report['remaining'])}",
+    ]
+    if not department and report["departments"]:
+        lines += ["", "**By Department:**"]
+        for row in report["departments"][:TOP_DEPARTMENTS]:
+            if row["usedPercent"] is None:
+                lines.append(f"- ⚠️ {row['department']}: {usd(row['spent'])} spent, not budgeted")
+            else:
+                flag = "⚠️ " if row["usedPercent"] > 100 else ""
+                lines.append(f"- {flag}{row['department']}: {usd(row['spent'])} of {usd(row['budget'])} ({row['usedPercent']:.0f}%)")
+    return responses.respond(AgentResponse(success=True, message="\n".join(lines), data=report))
+
+
+def pnl_reply(period: str, department: Optional[str]) -> Dict[str, Any]:
+    report = ledger.pnl(period, department)
+    scope = f"{period_label(period)} {department}" if department else period_label(period)
+    lines = [
+        f"**{scope} P&L Summary:**",
+        "",
+        f"📊 Revenue: {usd(report['revenue'])}",
+        f"💰 Gross Profit: {usd(report['grossProfit'])}" + (f" ({report['grossMargin']:.0f}%)" if report["grossMargin"] is not None else ""),
+        f"📈 Net Income: {usd(report['netIncome'])}" + (f" ({report['netMargin']:.0f}%)" if report["netMargin"] is not None else ""),
+    ]
+    if report["revenueChange"] is not None:
+        lines += ["", f"*Revenue {report['revenueChange']:+.0f}% vs {period_label(report['previousPeriod'])}*"]
+    return {"message": "\n".join(lines), "data": report}
+
+
+def cash_flow_reply(period: str, department: Optional[str]) -> Dict[str, Any]:
+    report = ledger.cash_flow(period, department)
+    scope = f"{period_label(period)} {department}" if department else period_label(period)
+    lines = [
+        f"**{scope} Cash Flow:**",
+        "",
+        f"🏭 Operating: {usd(report['operating'])}",
+        f"🏗️ Investing: {usd(report['investing'])}",
+        f"🏦 Financing: {usd(report['financing'])}",
+        f"💵 Net Cash Flow: {usd(report['netCashFlow'])}",
+    ]
+    return {"message": "\n".join(lines), "data": report}
+
+
+def breakdown_reply(period: str, department: Optional[str]) -> Dict[str, Any]:
+    by = "account" if department else "department"
+    totals: Dict[str, Dict[str, float]] = {}
+    for kind, field in (("revenue", "revenue"), ("cogs", "spend"), ("expense", "spend")):
+        for row in ledger.rollup(by, period, "actual", department, kind=kind):
+            entry = totals.setdefault(row[by], {by: row[by], "revenue": 0.0, "spend": 0.0})
+            entry[field] = round(entry[field] + row["amount"], 2)
+    rows = sorted(totals.values(), key=lambda entry: -(entry["revenue"] + entry["spend"]))
+    scope = f"{period_label(period)} {department}" if department else period_label(period)
+    lines = [f"**{scope} by {by.title()}:**", ""]
+    lines += [f"- {entry[by]}: revenue {usd(entry['revenue'])}, spend {usd(entry['spend'])}" for entry in rows]
+    return {"message": "\n".join(lines), "data": {"period": period, "by": by, "rows": rows}}
+
+
+REPORTS = {"pnl": pnl_reply, "cashflow": cash_flow_reply, "breakdown": breakdown_reply}
+
+
+async def financial_reporter(agent: AgentSpec, request: AgentRequest):
+    """Financial Reporter: P&L, cash flow and breakdowns from the ledger rollups"""
+    intent = intents.resolve(agent.id, request.message)
+    if intent not in REPORTS:
+        return responses.reply(agent.id, intent, reply_builder(agent))
+    await ledger.ensure()
+    period = find_period(request.message) or ledger.latest(ACTUAL)
+    if period is None:
+        return no_ledger(agent)
+    reply = REPORTS[intent](period, mentioned_department(request.message))
+    return responses.respond(AgentResponse(success=True, **reply))
@@ -0,0 +1,31 @@
+"""Marketing agents whose replies are computed from local data instead of catalog templates"""
+from core import intents, leads, responses
+from core.catalog import DEFAULT_INTENT, AgentSpec, reply_builder
+from models import AgentRequest, AgentResponse
+
+# Hot leads listed in the scoring reply
+TOP_LEADS = 3
+
+
+async def lead_generator(agent: AgentSpec, request: AgentRequest):
+    """Lead Generator: tier counts from the lead store's aggregates; lead creation stays templated"""
+    intent = intents.resolve(agent.id, request.message)
+    if intent == "create":
+        return responses.reply(agent.id, intent, reply_builder(agent))
+    await leads.store.ensure()
+    summary = leads.store.summary()
+    if intent != "score" or not summary["totalLeads"]:
+        default = agent.responses[DEFAULT_INTENT]
+        return responses.respond(AgentResponse(success=True, message=default["message"], data={**default.get("data", {}), **summary}))
+    top = leads.store.top(TOP_LEADS, "hot")
+    lines = [
+        f"**Lead Scoring Results ({summary['totalLeads']:,} leads, average {summary['averageScore']}):**",
+        "",
+        f"- Hot (80+): {summary['hotLeads']:,} leads",
+        f"- Warm (50-79): {summary['warmLeads']:,} leads",
+        f"- Cold (<50): {summary['coldLeads']:,} leads",
+    ]
+    if top:
+        lines += ["", "**Top Hot Leads:**"]
+        lines += [f"{rank}. {lead['name'] or lead['id']} ({lead['company']}) - {lead['score']}" for rank, lead in enumerate(top, 1)]
+    return responses.respond(AgentResponse(success=True, message="\n".join(lines), data={**summary, "topLeads": top}))
@@ -0,0 +1,56 @@
+"""Sales agents whose replies are computed from local data instead of catalog templates"""
+from functools import lru_cache
+from typing import Optional
+
+from core import responses, rfps
+from core.catalog import DEFAULT_INTENT, AgentSpec, catalog
+from models import AgentRequest, AgentResponse
+
+# Catalog agent whose answers describe the services RFPs are matched against
+CAPABILITIES_AGENT = "sales-capabilities"
+
+# Match percentage (ranking score relative to the top result) flagged as a strong match
+HIGH_MATCH = 75
+
+
+@lru_cache(maxsize=1)
+def capability_profile() -> str:
+    """Everything the Capabilities Expert says about our services, as one text"""
+    spec = next(agent for agent in catalog.department("sales").agents if agent.id == CAPABILITIES_AGENT)
+    parts = []
+    for reply in spec.responses.values():
+        parts.append(reply["message"])
+        for value in (reply.get("data") or {}).values():
+            parts.extend(value if isinstance(value, list) else [])
+    return "\n".join(str(part) for part in parts)
+
+
+def money(low: Optional[float], high: Optional[float]) -> str:
+    """``15000000, 20000000`` -> ``"$15-20M"``"""
+    if not high:
+        return "value n/a"
+    millions = [f"{value / 1e6:.1f}".rstrip("0").rstrip(".") for value in (low or high, high)]
+    return f"${millions[0]}M" if millions[0] == millions[1] else f"${millions[0]}-{millions[1]}M"
+
+
+async def rfp_search(agent: AgentSpec, request: AgentRequest):
+    """RFP Hunter: RFPs ranked by relevance to the query and fit with our capabilities, scored against the best match"""
+    rfps.index.set_profile(capability_profile())
+    matches, found = await rfps.match(request.message)
+    if not matches:
+        default = agent.responses[DEFAULT_INTENT]
+        return responses.respond(AgentResponse(success=True, message=default["message"],
+                                               data={**default.get("data", {}), "totalFound": 0, "results": []}))
+    results = [match.to_dict() for match in matches]
+    lines = [f"**RFPs Found ({found}), best matches first:**", ""]
+    for rank, rfp in enumerate(results, 1):
+        star = "⭐ " if rfp["match"] >= HIGH_MATCH else ""
+        lines.append(f"{rank}. {star}{rfp['agency']} - {rfp['title']} - {money(rfp['valueMin'], rfp['valueMax'])} - "
+                     f"Due {rfp['due']} - Match: {rfp['match']}%")
+    data = {
+        "totalFound": found,
+        "highMatch": sum(rfp["match"] >= HIGH_MATCH for rfp in results),
+        "totalValue": sum(rfp["valueMax"] or 0 for rfp in results),
+        "results": results,
+    }
+    return responses.respond(AgentResponse(success=True, message="\n".join(lines), data=data))
@@ -1,8 +1,39 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, List
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from datetime import datetime
 
-from routers import auth, employees, hr, finance, marketing, sales, engineering
+from core import catalog, intents, jobs, memory, metrics, model, profiling
+from core.agents import agents
+from core.security import authorize, permissions
+from core.watchdog import WATCHDOG_ENABLED, watchdog
+from routers import auth, employees, agents as agents_router, diagnostics, jobs as jobs_router
+
+# Shutdown hooks of the department data stores loaded below
+department_stops: List[Callable[[], Awaitable[None]]] = []
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build shared runtime structures once before serving requests"""
+    intents.compile_all()
+    permissions.build(app.routes)
+    agents.build(app.routes)
+    await model.backend.start()
+    await memory.memory.start()
+    await jobs.queue.start()
+    if WATCHDOG_ENABLED:
+        watchdog.start()
+    yield
+    await watchdog.stop()
+    await jobs.queue.stop()
+    for stop in department_stops:
+        await stop()
+    await memory.memory.stop()
+    await model.backend.close()
+
 
 app = FastAPI(
     title="InTimeTec Portal API",
@@ -26,6 +57,7 @@ All protected endpoints require a Bearer token in the Authorization header.
         "name": "InTimeTec",
         "email": "support@intimetec.com",
     },
+    lifespan=lifespan,
 )
 
 # CORS middleware
@@ -37,14 +69,45 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route request metrics (outermost inside profiling, so CORS and error handling are timed too)
+if metrics.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+
+# Admin-only cProfile of requests flagged with X-Profile: 1 (outermost, so the whole stack is profiled)
+if profiling.PROFILING_ENABLED:
+    app.add_middleware(profiling.ProfilingMiddleware)
+
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(employees.router, prefix="/api/employees", tags=["Employees"])
-app.include_router(hr.router, prefix="/api/hr", tags=["HR Department"])
-app.include_router(finance.router, prefix="/api/finance", tags=["Finance Department"])
-app.include_router(marketing.router, prefix="/api/marketing", tags=["Marketing Department"])
-app.include_router(sales.router, prefix="/api/sales", tags=["Sales Department"])
-app.include_router(engineering.router, prefix="/api/engineering", tags=["Engineering Department"])
+# Department agents, generated from catalog/ for the departments in ITT_DEPARTMENTS
+catalog.include_departments(app, dependencies=[Depends(authorize)])
+# Department data stores (and NumPy) are imported only with their department, like the catalog handlers
+if "engineering" in catalog.enabled_departments():
+    from core import search
+    from routers import knowledge
+    department_stops.append(search.index.stop)
+    app.include_router(knowledge.diagnostics, prefix="/api/diagnostics", tags=["Diagnostics"])
+if "sales" in catalog.enabled_departments():
+    from core import rfps
+    from routers import rfps as rfps_router
+    department_stops.append(rfps.index.stop)
+    app.include_router(rfps_router.diagnostics, prefix="/api/diagnostics", tags=["Diagnostics"])
+# Lead store import, top leads and scoring weights, next to the Lead Generator agent
+if "marketing" in catalog.enabled_departments():
+    from routers import leads as leads_router
+    app.include_router(leads_router.router, prefix="/api/marketing/leads", tags=["Marketing Department"],
+                       dependencies=[Depends(authorize)])
+    app.include_router(leads_router.diagnostics, prefix="/api/diagnostics", tags=["Diagnostics"])
+# Transaction ledger import and its P&L, cash-flow, variance and rollup reports, next to the Finance agents
+if "finance" in catalog.enabled_departments():
+    from routers import ledger as ledger_router
+    app.include_router(ledger_router.router, prefix="/api/finance/ledger", tags=["Finance Department"],
+                       dependencies=[Depends(authorize)])
+    app.include_router(ledger_router.diagnostics, prefix="/api/diagnostics", tags=["Diagnostics"])
+app.include_router(agents_router.router, prefix="/api/agents", tags=["Agents"])
+app.include_router(jobs_router.router, prefix="/api/jobs", tags=["Jobs"])
+app.include_router(diagnostics.router, prefix="/api/diagnostics", tags=["Diagnostics"])
 
 
 @app.get("/api/health", tags=["Health"])
@@ -53,6 +116,12 @@ async def health_check():
     return {"status": "ok", "timestamp": datetime.now().isoformat()}
 
 
+@app.get("/api/metrics", tags=["Health"], response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Per-route request counts, errors, in-flight requests and latency histograms (Prometheus text format)"""
+    return PlainTextResponse(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=4000)
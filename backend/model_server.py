@@ -0,0 +1,110 @@
+"""
+Local stand-in for the model service used by the ``http`` model backend.
+
+Implements the contract in ``core.model``: ``POST /v1/complete`` answers
+after a sampled delay with a canned completion, or streams it token by
+token as Server-Sent Events when ``"stream": true``. Delays follow each
+agent's latency profile from the catalog by default (``--fixed`` or
+``--median`` replace them), and ``--error-rate`` answers a share of
+requests with 503 so client retries can be exercised. ``GET /stats``
+reports requests served and distinct client connections seen, which shows
+how well the caller pools its connections.
+
+Run from the backend directory, then start the API against it:
+    python model_server.py --port 8100
+    ITT_MODEL_BACKEND=http ITT_MODEL_URL=http://127.0.0.1:8100 python main.py
+"""
+import argparse
+import asyncio
+import json
+import random
+from typing import Any, AsyncIterator, Dict, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from core import latency
+from core.catalog import catalog, enabled_departments
+
+MODEL_NAME = "itt-standin-1"
+
+
+def completion_text(agent: str, prompt: str, tokens: int) -> str:
+    words = (prompt or "request").split()
+    return " ".join([f"[{agent}]"] + [words[i % len(words)] for i in range(tokens - 1)])
+
+
+def create_app(scheduler: Optional[latency.LatencyScheduler] = None, tokens: int = 64, token_delay: float = 0.0,
+               error_rate: float = 0.0, scale: float = 1.0, seed: Optional[int] = None) -> FastAPI:
+    """Stand-in model API; `scheduler` supplies the per-agent time to first token (catalog profiles by default)"""
+    if scheduler is None:
+        scheduler = latency.LatencyScheduler(scale=scale, seed=seed)
+        for key in enabled_departments():
+            scheduler.register_defaults({agent.id: agent.latency for agent in catalog.department(key).agents})
+    rng = random.Random(seed)
+    stats = {"requests": 0, "errors": 0, "streams": 0}
+    connections = set()
+    app = FastAPI(title="Model stand-in", docs_url=None, redoc_url=None)
+
+    @app.post("/v1/complete")
+    async def complete(request: Request):
+        body: Dict[str, Any] = await request.json()
+        agent = body.get("agent", "")
+        stats["requests"] += 1
+        if request.client is not None:
+            connections.add((request.client.host, request.client.port))
+        if error_rate and rng.random() < error_rate:
+            stats["errors"] += 1
+            return JSONResponse({"detail": "Model overloaded"}, status_code=503, headers={"Retry-After": "0"})
+
+        await scheduler.simulate(agent)
+        text = completion_text(agent, body.get("prompt", ""), tokens)
+        context = " ".join(turn.get("content", "") for turn in body.get("history", ()))
+        usage = {"promptTokens": len(body.get("prompt", "").split()) + len(context.split()), "completionTokens": tokens}
+        if not body.get("stream"):
+            return {"text": text, "model": MODEL_NAME, "usage": usage}
+
+        stats["streams"] += 1
+
+        async def events() -> AsyncIterator[bytes]:
+            for word in text.split(" "):
+                yield b"data: " + json.dumps({"token": word + " "}).encode() + b"\n\n"
+                if token_delay:
+                    await asyncio.sleep(token_delay)
+            yield b"data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.get("/stats")
+    async def server_stats():
+        return {**stats, "connections": len(connections)}
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--fixed", type=float, help="every completion takes this many seconds")
+    parser.add_argument("--median", type=float, help="lognormal delays with this median instead of the catalog profiles")
+    parser.add_argument("--sigma", type=float, default=0.4)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplier applied to every delay")
+    parser.add_argument("--tokens", type=int, default=64, help="tokens per completion")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="seconds between streamed tokens")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 503")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    scheduler = None
+    if args.fixed is not None or args.median is not None:
+        scheduler = latency.LatencyScheduler(scale=args.scale, seed=args.seed)
+        scheduler.configure("*", latency.fixed(args.fixed) if args.fixed is not None else latency.lognormal(args.median, args.sigma))
+    app = create_app(scheduler, tokens=args.tokens, token_delay=args.token_delay, error_rate=args.error_rate,
+                     scale=args.scale, seed=args.seed)
+    import uvicorn
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -38,6 +38,27 @@ class AgentResponse(BaseModel):
     timestamp: str = Field(default_factory=lambda: datetime.now().isoformat())
 
 
+class AgentBatchItem(BaseModel):
+    agent: str = Field(..., example="finance-report")
+    message: str = Field(..., min_length=1, example="Show me the Q4 P&L summary")
+
+
+class AgentBatchRequest(BaseModel):
+    items: List[AgentBatchItem] = Field(..., min_length=1, max_length=50)
+    concurrency: Optional[int] = Field(None, ge=1, example=5)
+
+
+# Job Models
+class JobRequest(AgentRequest):
+    priority: Literal["high", "normal", "low"] = Field("normal", example="high")
+
+
+# Lead Models
+class LeadWeights(BaseModel):
+    weights: Dict[str, float] = Field(default_factory=dict, example={"demo": 25, "recency": 10})
+    industries: Dict[str, float] = Field(default_factory=dict, example={"healthcare": 1.0})
+
+
 # Mock Data - InTimeTec Leadership & Staff
 MOCK_USERS: List[User] = [
     User(id="1", name="Kuldeep Mathur", email="kuldeep.mathur@intimetec.com", role="admin", department="IT & Security", avatar="/avatars/admin.png"),
@@ -57,11 +78,3 @@ MOCK_USERS: List[User] = [
     User(id="13", name="Rajeev Kumar", email="rajeev.kumar@intimetec.com", role="cio", department="ANZ", avatar="/avatars/cto.png"),
     User(id="14", name="Venkatesh Bachu", email="venkatesh.bachu@intimetec.com", role="coo", department="ANZ", avatar="/avatars/md.png"),
 ]
-
-
-def find_user_by_email(email: str) -> Optional[User]:
-    """Find a user by email address"""
-    for user in MOCK_USERS:
-        if user.email.lower() == email.lower():
-            return user
-    return None
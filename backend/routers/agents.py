@@ -0,0 +1,194 @@
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import Response
+from pydantic import ValidationError
+from typing import Any, Dict, Optional, Set
+import asyncio
+import os
+
+from models import AgentBatchRequest, AgentRequest
+from core.agents import agents
+from core import memory, responses
+from core.catalog import catalog
+from core.responses import response_body
+from core.security import Principal, current_principal, get_principal, permissions, principal_from_header, require_roles
+
+router = APIRouter()
+
+# Agent requests a single socket may have running at once; reading pauses
+# (backpressure) until one of them completes
+MAX_IN_FLIGHT = 32
+
+# Default and maximum number of batch items run at the same time
+BATCH_CONCURRENCY = int(os.getenv("ITT_BATCH_CONCURRENCY", "8"))
+
+
+def dispatch_error(status_code: int, detail: str, retry_after: Optional[str] = None) -> Dict[str, Any]:
+    error = {"status": status_code, "detail": detail}
+    if retry_after is not None:
+        error["retryAfter"] = int(retry_after)
+    return {"ok": False, "error": error}
+
+
+async def dispatch(principal: Principal, agent_key: Any, message: Any) -> Dict[str, Any]:
+    """Authorize and run one message against an agent; failures become error results"""
+    agent = agents.get(str(agent_key or ""))
+    if agent is None:
+        return dispatch_error(404, "Unknown agent")
+    if not permissions.allows(principal.role, agent.path):
+        return dispatch_error(403, "Not authorized for this agent")
+    try:
+        request = AgentRequest(message=message)
+    except ValidationError:
+        return dispatch_error(422, "A non-empty message is required")
+
+    current_principal.set(principal)
+    try:
+        result = await agent.handler(request)
+    except HTTPException as exc:
+        return dispatch_error(exc.status_code, str(exc.detail), (exc.headers or {}).get("Retry-After"))
+    except Exception:
+        return dispatch_error(500, "Agent failed to respond")
+    return {"agent": agent.id, "ok": True, "response": result}
+
+
+def encode_result(result: Dict[str, Any]) -> bytes:
+    """JSON of a dispatch result, with the agent's serialized reply spliced in as-is"""
+    if "response" not in result:
+        return responses.dumps(result)
+    fields = dict(result)
+    body = response_body(fields.pop("response"))
+    return responses.splice(fields, "response", body)
+
+
+@router.post("/batch", summary="Batch Agent Requests")
+async def batch_agents(batch: AgentBatchRequest, principal: Principal = Depends(get_principal)):
+    """
+    Run several agent prompts concurrently (e.g. an executive dashboard).
+
+    Items run at most `concurrency` at a time (capped by the server's
+    ITT_BATCH_CONCURRENCY), so the batch takes roughly as long as its
+    slowest agent. Results come back in request order; a failing item gets
+    `ok: false` with an error instead of failing the whole batch.
+    """
+    limit = min(batch.concurrency or BATCH_CONCURRENCY, BATCH_CONCURRENCY)
+    slots = asyncio.Semaphore(limit)
+
+    async def run(item):
+        async with slots:
+            return {"agent": item.agent, **await dispatch(principal, item.agent, item.message)}
+
+    results = await asyncio.gather(*(run(item) for item in batch.items))
+    body = b"[" + b",".join(encode_result(result) for result in results) + b"]"
+    return Response(content=responses.splice({"success": True}, "results", body), media_type="application/json")
+
+
+@router.get("/catalog", summary="Agent Catalog")
+async def agent_catalog(principal: Principal = Depends(get_principal)):
+    """Agents served by this deployment that the caller may use, by department"""
+    departments = []
+    for department in catalog.loaded():
+        prefix = department.prefix
+        departments.append({
+            "id": department.key,
+            "name": department.name,
+            "agents": [
+                {"id": agent.id, "name": agent.name, "endpoint": prefix + agent.path, "description": agent.description}
+                for agent in department.agents
+                if permissions.allows(principal.role, prefix + agent.path)
+            ],
+        })
+    return {"success": True, "data": [department for department in departments if department["agents"]]}
+
+
+def conversation_agent(agent_key: str, principal: Principal) -> str:
+    agent = agents.get(agent_key)
+    if agent is None:
+        raise HTTPException(status_code=404, detail="Unknown agent")
+    if not permissions.allows(principal.role, agent.path):
+        raise HTTPException(status_code=403, detail="Not authorized for this agent")
+    return agent.id
+
+
+@router.get("/conversations/{agent_key}", summary="Conversation History")
+async def get_conversation(agent_key: str, principal: Principal = Depends(get_principal)):
+    """The caller's recent turns with an agent, oldest first (the context the agent sees)"""
+    agent_id = conversation_agent(agent_key, principal)
+    return {"success": True, "data": {"agent": agent_id, "turns": await memory.history(principal.user_id, agent_id)}}
+
+
+@router.delete("/conversations/{agent_key}", summary="Clear Conversation")
+async def clear_conversation(agent_key: str, principal: Principal = Depends(get_principal)):
+    """Start a fresh conversation with an agent, forgetting every earlier turn"""
+    agent_id = conversation_agent(agent_key, principal)
+    await memory.memory.clear(principal.user_id, agent_id)
+    return {"success": True}
+
+
+@router.get("/cache", summary="Response Cache Statistics", dependencies=[Depends(require_roles("admin"))])
+async def response_cache_stats():
+    """Hit/miss counters and size of the agent response template cache (admin only)"""
+    return {"success": True, "data": responses.cache.stats()}
+
+
+@router.websocket("/ws")
+async def agent_socket(websocket: WebSocket, token: Optional[str] = None):
+    """
+    Multiplexed agent conversations over one WebSocket.
+
+    Authenticate with `?token=<token>` (or an Authorization header), then
+    send frames like `{"id": "c1", "agent": "sales-deck", "message": "..."}`.
+    `agent` is an agent id or endpoint path. Each frame runs concurrently and
+    its reply, `{"id": "c1", "agent": ..., "ok": true, "response": {...}}`,
+    is sent as soon as it completes, so replies may arrive out of order.
+    """
+    authorization = f"Bearer {token}" if token else websocket.headers.get("authorization")
+    try:
+        principal = principal_from_header(authorization)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    await websocket.accept()
+
+    slots = asyncio.Semaphore(MAX_IN_FLIGHT)
+    send_lock = asyncio.Lock()
+    in_flight: Set[asyncio.Task] = set()
+
+    async def reply(payload: Dict[str, Any]) -> None:
+        async with send_lock:
+            await websocket.send_text(encode_result(payload).decode())
+
+    async def handle(frame: Dict[str, Any]) -> None:
+        try:
+            result = await dispatch(principal, frame.get("agent"), frame.get("message"))
+            await reply({"id": frame.get("id"), "agent": frame.get("agent"), **result})
+        except (WebSocketDisconnect, RuntimeError):
+            # Socket went away while this frame was running
+            pass
+        finally:
+            slots.release()
+
+    try:
+        while True:
+            await slots.acquire()
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", status.WS_1000_NORMAL_CLOSURE))
+            try:
+                # Binary frames carry "bytes" instead of "text"
+                if message.get("text") is None:
+                    raise ValueError
+                frame = responses.loads(message["text"])
+                if not isinstance(frame, dict):
+                    raise ValueError
+            except ValueError:
+                slots.release()
+                await reply({"id": None, **dispatch_error(400, "Frames must be JSON objects")})
+                continue
+            task = asyncio.create_task(handle(frame))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        for task in in_flight:
+            task.cancel()
@@ -1,11 +1,19 @@
-from fastapi import APIRouter, HTTPException, Header
-from typing import Optional
-import time
+from fastapi import APIRouter, Depends, HTTPException
 
-from models import LoginRequest, LoginResponse, User, MOCK_USERS, find_user_by_email
+from models import LoginRequest, LoginResponse, User
+from core import latency
+from core.directory import directory
+from core.security import Principal, get_principal
+from core.tokens import issue_token
 
 router = APIRouter()
 
+latency.register_defaults({
+    "auth-login": latency.fixed(0.5),
+    "auth-logout": latency.fixed(0.0),
+    "auth-me": latency.fixed(0.0),
+})
+
 
 @router.post("/login", response_model=LoginResponse, summary="User Login")
 async def login(request: LoginRequest):
@@ -20,16 +28,16 @@ async def login(request: LoginRequest):
     - marketing@intimetec.com
     - sales@intimetec.com
     """
-    # Simulate network delay
-    time.sleep(0.5)
+    # Simulate network delay (non-blocking)
+    await latency.simulate("auth-login")
 
-    user = find_user_by_email(request.email)
+    user = directory.get_by_email(request.email)
 
     if not user:
         return LoginResponse(success=False, error="Invalid credentials. User not found.")
 
-    # Generate mock token
-    token = f"mock-jwt-token-{user.id}-{int(time.time() * 1000)}"
+    # Signed token carrying the user id, role and expiry
+    token = issue_token(user)
 
     return LoginResponse(success=True, user=user, token=token)
 
@@ -37,26 +45,19 @@ async def login(request: LoginRequest):
 @router.post("/logout", summary="User Logout")
 async def logout():
     """Log out the current user"""
+    await latency.simulate("auth-logout")
     return {"success": True, "message": "Logged out successfully"}
 
 
 @router.get("/me", summary="Get Current User")
-async def get_current_user(authorization: Optional[str] = Header(None)):
+async def get_current_user(principal: Principal = Depends(get_principal)):
     """
     Get the currently authenticated user's information.
 
     Requires Bearer token in Authorization header.
     """
-    if not authorization or not authorization.startswith("Bearer mock-jwt-token-"):
-        raise HTTPException(status_code=401, detail="Not authenticated")
-
-    # Extract user ID from mock token
-    token_parts = authorization.split("-")
-    if len(token_parts) < 4:
-        raise HTTPException(status_code=401, detail="Invalid token")
-
-    user_id = token_parts[3]
-    user = next((u for u in MOCK_USERS if u.id == user_id), None)
+    await latency.simulate("auth-me")
+    user = directory.get(principal.user_id)
 
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -0,0 +1,76 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Literal
+
+from core import admission, coalescing, jobs, memory, model, profiling
+from core.security import require_roles
+from core.watchdog import watchdog
+
+router = APIRouter(dependencies=[Depends(require_roles("admin"))])
+
+
+@router.get("/loop", summary="Event Loop Health")
+async def event_loop_health():
+    """
+    Event-loop scheduling lag and recent stalls (admin only).
+
+    Each stall carries the stack of the code that was blocking the loop when
+    the watchdog caught it, e.g. a synchronous sleep or blocking I/O inside
+    an async handler.
+    """
+    return {"success": True, "data": watchdog.snapshot()}
+
+
+@router.get("/admission", summary="Admission Control")
+async def admission_state():
+    """Per-agent limits, admitted/queued/rejected counters and current load (admin only)"""
+    return {"success": True, "data": {"enabled": admission.controller.enabled, "agents": admission.controller.snapshot()}}
+
+
+@router.get("/coalescing", summary="Request Coalescing")
+async def coalescing_state():
+    """Per-agent upstream model calls made, joined in flight and reused within the window (admin only)"""
+    return {"success": True, "data": coalescing.coalescer.snapshot()}
+
+
+@router.get("/jobs", summary="Job Queue")
+async def job_queue():
+    """Queued jobs by priority, running jobs and the agents that accept jobs (admin only)"""
+    return {"success": True, "data": jobs.queue.snapshot()}
+
+
+@router.get("/memory", summary="Conversation Memory")
+async def conversation_memory():
+    """Conversations held in memory and the background writer's progress (admin only)"""
+    return {"success": True, "data": memory.memory.snapshot()}
+
+
+@router.get("/model", summary="Model Backend")
+async def model_backend():
+    """Active model backend with its call, retry and failure counts (admin only)"""
+    return {"success": True, "data": model.backend.stats()}
+
+
+@router.get("/profiles", summary="Request Profiles")
+async def list_profiles():
+    """
+    Recent request profiles, newest first, with their five hottest functions (admin only).
+
+    Profile a request by sending it with `X-Profile: 1` (or `?profile=1`)
+    as an admin; its response carries `X-Profile-Id`.
+    """
+    return {"success": True, "data": profiling.store.summaries()}
+
+
+@router.get("/profiles/{profile_id}", summary="Request Profile")
+async def get_profile(
+    profile_id: str,
+    sort: Literal["cumulative", "self"] = "cumulative",
+    limit: int = Query(default=40, ge=1, le=200),
+):
+    """One request profile's hot functions, by cumulative or self time (admin only)"""
+    profile = profiling.store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    key = "selfSeconds" if sort == "self" else "cumulativeSeconds"
+    functions = sorted(profile["functions"], key=lambda row: row[key], reverse=True)[:limit]
+    return {"success": True, "data": {**profile, "functions": functions}}
@@ -1,21 +1,106 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Iterable, Optional, Set
+import base64
 
-from models import User, MOCK_USERS
+from models import User
+from core import latency
+from core.directory import directory
 
 router = APIRouter()
 
+latency.register_defaults({
+    "employees-list": latency.fixed(0.0),
+    "employees-export": latency.fixed(0.0),
+    "employees-get": latency.fixed(0.0),
+})
 
-@router.get("/", summary="List All Employees")
-async def list_employees():
-    """Get a list of all employees"""
-    return {"success": True, "data": MOCK_USERS}
+# Lines per chunk written by the NDJSON export
+EXPORT_CHUNK_SIZE = 500
+
+
+def parse_fields(fields: Optional[str]) -> Optional[Set[str]]:
+    """Validate a comma-separated field projection against the User model"""
+    if not fields:
+        return None
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested - set(User.model_fields)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown field(s): {', '.join(sorted(unknown))}")
+    return requested
+
+
+def encode_cursor(user_id: str) -> str:
+    return base64.urlsafe_b64encode(user_id.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> str:
+    try:
+        return base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    except ValueError:  # binascii.Error, UnicodeDecodeError, and non-ASCII input
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def ndjson_lines(users: Iterable[User], include: Optional[Set[str]]) -> AsyncIterator[bytes]:
+    """Serialize users lazily, one chunk of NDJSON lines at a time"""
+    chunk = []
+    for user in users:
+        chunk.append(user.model_dump_json(include=include))
+        if len(chunk) == EXPORT_CHUNK_SIZE:
+            yield ("\n".join(chunk) + "\n").encode()
+            chunk = []
+    if chunk:
+        yield ("\n".join(chunk) + "\n").encode()
+
+
+@router.get("/", summary="List Employees")
+async def list_employees(
+    department: Optional[str] = Query(None, description="Only employees in this department"),
+    role: Optional[str] = Query(None, description="Only employees with this role"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,name,avatar"),
+    limit: int = Query(50, ge=1, le=500, description="Page size"),
+    cursor: Optional[str] = Query(None, description="nextCursor from the previous page"),
+):
+    """
+    Get a page of employees.
+
+    Pages are cursor-based: pass the returned `nextCursor` to fetch the next
+    page; it is null on the last page.
+    """
+    await latency.simulate("employees-list")
+    include = parse_fields(fields)
+    after = decode_cursor(cursor) if cursor else None
+
+    try:
+        users, last_id = directory.page(limit, after=after, department=department, role=role)
+    except KeyError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    return {
+        "success": True,
+        "data": [user.model_dump(include=include) for user in users],
+        "nextCursor": encode_cursor(last_id) if last_id is not None else None,
+    }
+
+
+@router.get("/export", summary="Export Employees (NDJSON)")
+async def export_employees(
+    department: Optional[str] = Query(None, description="Only employees in this department"),
+    role: Optional[str] = Query(None, description="Only employees with this role"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,name,avatar"),
+):
+    """Stream every matching employee as newline-delimited JSON"""
+    await latency.simulate("employees-export")
+    include = parse_fields(fields)
+    users = directory.iter_users(department=department, role=role)
+    return StreamingResponse(ndjson_lines(users, include), media_type="application/x-ndjson")
 
 
 @router.get("/{employee_id}", summary="Get Employee by ID")
 async def get_employee(employee_id: str):
     """Get a specific employee by their ID"""
-    user = next((u for u in MOCK_USERS if u.id == employee_id), None)
+    await latency.simulate("employees-get")
+    user = directory.get(employee_id)
 
     if not user:
         raise HTTPException(status_code=404, detail="Employee not found")
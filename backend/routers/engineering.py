@@ -1,246 +0,0 @@
-from fastapi import APIRouter
-import asyncio
-
-from models import AgentRequest, AgentResponse
-
-router = APIRouter()
-
-
-@router.post("/training", response_model=AgentResponse, summary="Training Assistant")
-async def training_agent(request: AgentRequest):
-    """
-    AI Agent for learning and development.
-
-    Capabilities:
-    - Recommend courses and certifications
-    - Create learning paths
-    - Track progress
-    """
-    await asyncio.sleep(0.9)
-    msg = request.message.lower()
-
-    if "certification" in msg or "cloud" in msg:
-        return AgentResponse(
-            success=True,
-            message="""**Cloud Architecture Certification Path:**
-
-**AWS Track (Recommended):**
-1. Solutions Architect Associate (2-3 months)
-2. Solutions Architect Pro (3-4 months)
-3. DevOps Engineer Pro (2-3 months)
-
-**Company Support:**
-- All exam fees covered
-- $500 study materials budget
-- Certification bonus: $500-$2,000""",
-            data={"recommendedPath": "AWS Solutions Architect", "totalCertifications": 3}
-        )
-    elif "kubernetes" in msg or "k8s" in msg:
-        return AgentResponse(
-            success=True,
-            message="""**Kubernetes Learning Path:**
-
-Week 1-2: Basics & Official Docs
-Week 3-6: KodeKloud CKA Course
-Week 7-10: Killer.sh Practice
-
-**Internal Resources:**
-- K8s Best Practices Guide
-- Sandbox cluster access
-- #kubernetes-help Slack""",
-            data={"topic": "Kubernetes", "totalWeeks": 10}
-        )
-    else:
-        return AgentResponse(
-            success=True,
-            message="Hi! I'm your Training Assistant. I help with:\n- Certification paths\n- Learning resources\n- Skill development",
-            data={"availableCourses": 150, "certificationsTracked": 45}
-        )
-
-
-@router.post("/knowledge", response_model=AgentResponse, summary="Knowledge Base")
-async def knowledge_agent(request: AgentRequest):
-    """AI Agent for internal documentation and code examples (RAG-powered)"""
-    await asyncio.sleep(1.1)
-    msg = request.message.lower()
-
-    if "authentication" in msg or "auth" in msg:
-        return AgentResponse(
-            success=True,
-            message="""**Authentication in Microservices:**
-
-We use JWT-based auth with API Gateway:
-
-```
-Client → API Gateway → Auth Service
-              ↓
-         Services A, B, C
-```
-
-**Key Patterns:**
-1. Gateway validates JWT
-2. User context via headers
-3. Service-to-service: mTLS""",
-            data={"topic": "Authentication", "documentsFound": 3}
-        )
-    elif "ci/cd" in msg or "pipeline" in msg:
-        return AgentResponse(
-            success=True,
-            message="""**Standard CI/CD Pipeline:**
-
-```yaml
-jobs:
-  test → security → build → deploy
-```
-
-- GitHub Actions for CI
-- ArgoCD for CD
-- Kubernetes deployments""",
-            data={"topic": "CI/CD", "template": "GitHub Actions"}
-        )
-    else:
-        return AgentResponse(
-            success=True,
-            message="Hi! I'm your Knowledge Base. I search:\n- Internal docs\n- Code examples\n- Best practices\n- Architecture guides",
-            data={"documentsIndexed": 1250, "codeSnippets": 480}
-        )
-
-
-@router.post("/code-review", response_model=AgentResponse, summary="Code Reviewer")
-async def code_review_agent(request: AgentRequest):
-    """AI Agent for code analysis and review"""
-    await asyncio.sleep(1.3)
-    msg = request.message.lower()
-
-    if "review" in msg or "check" in msg:
-        return AgentResponse(
-            success=True,
-            message="""**Code Review Results:**
-
-🔴 **Critical (1):** SQL Injection at line 15
-🟡 **Warnings (2):** Missing error handling
-🟢 **Suggestions (3):** Add type annotations
-
-**Score: 72/100**
-
-Would you like auto-fix suggestions?""",
-            data={"criticalIssues": 1, "warnings": 2, "score": 72}
-        )
-    elif "security" in msg:
-        return AgentResponse(
-            success=True,
-            message="""**Security Scan Results:**
-
-🔴 XSS Vulnerability (Line 89)
-🔴 Hardcoded Secret (Line 12)
-🟡 Insecure dependency: lodash
-
-**Security Score: 58/100**""",
-            data={"critical": 2, "high": 1, "securityScore": 58}
-        )
-    else:
-        return AgentResponse(
-            success=True,
-            message="Hi! I'm your Code Reviewer. I check:\n- Bugs & logic errors\n- Security vulnerabilities\n- Performance issues\n- Style compliance",
-            data={"reviewsCompleted": 1250, "avgIssuesFound": 3.2}
-        )
-
-
-@router.post("/architecture", response_model=AgentResponse, summary="Architecture Advisor")
-async def architecture_agent(request: AgentRequest):
-    """AI Agent for system design and architecture guidance"""
-    await asyncio.sleep(1.4)
-    msg = request.message.lower()
-
-    if "notification" in msg or "real-time" in msg:
-        return AgentResponse(
-            success=True,
-            message="""**Real-Time Notification Architecture:**
-
-```
-Client ← WebSocket Gateway ← Redis Pub/Sub
-                                    ↑
-              Notification Service ← Event Queue
-```
-
-**Tech Stack:**
-- WebSocket: Socket.io
-- Message Broker: Redis Pub/Sub
-- Queue: SQS/RabbitMQ""",
-            data={"pattern": "Event-Driven", "scalability": "Horizontal"}
-        )
-    elif "kafka" in msg or "rabbitmq" in msg:
-        return AgentResponse(
-            success=True,
-            message="""**Kafka vs RabbitMQ:**
-
-| Criteria | Kafka | RabbitMQ |
-|----------|-------|----------|
-| Throughput | 1M+/sec | 50K/sec |
-| Replay | ✅ Yes | ❌ No |
-| Complexity | Higher | Lower |
-
-**Recommendation:** RabbitMQ for simpler ops""",
-            data={"recommendation": "RabbitMQ"}
-        )
-    else:
-        return AgentResponse(
-            success=True,
-            message="Hi! I'm your Architecture Advisor. I help with:\n- System design\n- Technology selection\n- Scalability planning\n- Design patterns",
-            data={"designAreas": ["System Design", "Tech Selection", "Patterns"]}
-        )
-
-
-@router.post("/devops", response_model=AgentResponse, summary="DevOps Helper")
-async def devops_agent(request: AgentRequest):
-    """AI Agent for DevOps, CI/CD, and infrastructure"""
-    await asyncio.sleep(1.1)
-    msg = request.message.lower()
-
-    if "deployment" in msg or "fail" in msg:
-        return AgentResponse(
-            success=True,
-            message="""**Debugging Deployment Failure:**
-
-**1. Check Build Logs:**
-```bash
-kubectl logs -l app=myapp --previous
-```
-
-**2. Check Pod Status:**
-```bash
-kubectl describe pod <pod-name>
-```
-
-**Common Issues:**
-- OOMKilled → Increase memory
-- CrashLoopBackOff → Check app logs""",
-            data={"diagnosticAreas": ["Build", "Container", "Probes"]}
-        )
-    elif "github action" in msg or "workflow" in msg:
-        return AgentResponse(
-            success=True,
-            message="""**GitHub Actions Workflow:**
-
-```yaml
-name: CI/CD
-on: [push]
-jobs:
-  test:
-    runs-on: ubuntu-latest
-    steps:
-      - uses: actions/checkout@v4
-      - run: npm ci
-      - run: npm test
-  deploy:
-    needs: test
-    if: github.ref == 'refs/heads/main'
-```""",
-            data={"jobs": ["test", "build", "deploy"]}
-        )
-    else:
-        return AgentResponse(
-            success=True,
-            message="Hi! I'm your DevOps Helper. I assist with:\n- Deployment debugging\n- CI/CD pipelines\n- Kubernetes issues\n- Docker optimization",
-            data={"tools": ["Kubernetes", "Docker", "GitHub Actions"]}
-        )
@@ -0,0 +1,73 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator
+
+from core import jobs
+from core.jobs import Job
+from core.security import Principal, get_principal
+from core.streaming import SSE_HEADERS, sse_event
+
+router = APIRouter()
+
+# Longest long-poll a client may ask for
+MAX_WAIT = 30.0
+
+
+async def owned_job(job_id: str, principal: Principal) -> Job:
+    """The job if the caller submitted it (admins see every job)"""
+    job = await jobs.queue.get(job_id)
+    if job is None or (job.user_id != principal.user_id and principal.role != "admin"):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/", summary="My Jobs")
+async def list_jobs(
+    limit: int = Query(20, ge=1, le=100),
+    principal: Principal = Depends(get_principal),
+):
+    """The caller's most recent jobs, newest first"""
+    return {"success": True, "data": [job.to_dict() for job in await jobs.queue.for_user(principal.user_id, limit)]}
+
+
+@router.get("/{job_id}", summary="Job Status")
+async def get_job(
+    job_id: str,
+    wait: float = Query(0.0, ge=0.0, le=MAX_WAIT, description="Seconds to wait for the job to finish (long poll)"),
+    principal: Principal = Depends(get_principal),
+):
+    """
+    Status of a job, with the agent's reply in `result` once it succeeded.
+
+    With `wait` the request is held until the job finishes or the time is
+    up, whichever comes first.
+    """
+    job = await owned_job(job_id, principal)
+    if wait and not job.done:
+        job = await jobs.queue.wait(job_id, wait) or job
+    return {"success": True, "data": job.to_dict()}
+
+
+async def job_events(job_id: str) -> AsyncIterator[bytes]:
+    async for job in jobs.queue.changes(job_id):
+        if job.status == "succeeded":
+            yield sse_event({"type": "complete", "status": job.status, "job": job.to_dict()})
+        elif job.done:
+            yield sse_event({"type": "error", "status": job.status, "content": job.error or "Job was cancelled", "job": job.to_dict()})
+        else:
+            yield sse_event({"type": "status", "status": job.status, "job": job.to_dict()})
+
+
+@router.get("/{job_id}/events", summary="Job Events")
+async def subscribe_job(job_id: str, principal: Principal = Depends(get_principal)):
+    """Server-Sent Events: the job's status now and on every change, ending with `complete` or `error`"""
+    await owned_job(job_id, principal)
+    return StreamingResponse(job_events(job_id), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@router.delete("/{job_id}", summary="Cancel Job")
+async def cancel_job(job_id: str, principal: Principal = Depends(get_principal)):
+    """Cancel a job that has not started yet"""
+    await owned_job(job_id, principal)
+    job = await jobs.queue.cancel(job_id)
+    return {"success": True, "data": job.to_dict()}
@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends
+
+from core import search
+from core.security import require_roles
+
+# Admin routes, mounted under /api/diagnostics when the Engineering department is enabled
+diagnostics = APIRouter(dependencies=[Depends(require_roles("admin"))])
+
+
+@diagnostics.get("/knowledge", summary="Knowledge Index")
+async def knowledge_index():
+    """Documents, passages and terms in the Knowledge Base index and its last build (admin only)"""
+    return {"success": True, "data": search.index.snapshot()}
+
+
+@diagnostics.post("/knowledge/reindex", summary="Reindex Knowledge Base")
+async def reindex_knowledge():
+    """Index new and changed documents now instead of at the next refresh (admin only)"""
+    await search.index.reindex()
+    return {"success": True, "data": search.index.snapshot()}
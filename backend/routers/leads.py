@@ -0,0 +1,68 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from typing import Literal, Optional
+
+from core import leads, uploads
+from core.security import require_roles
+from models import LeadWeights
+
+router = APIRouter()
+# Admin routes, mounted under /api/diagnostics when the Marketing department is enabled
+diagnostics = APIRouter(dependencies=[Depends(require_roles("admin"))])
+
+
+@router.post("/import", summary="Import Leads")
+async def import_leads(
+    request: Request,
+    format: Optional[Literal["csv", "ndjson"]] = Query(None, description="Body format (default: from Content-Type, else CSV)"),
+):
+    """
+    Bulk-import leads from a streamed CSV (header row first) or NDJSON body.
+
+    Columns: `id`, `name`, `company`, `industry`, `employees`, `opens`,
+    `clicks`, `visits`, `demo`, `decisionMaker`, `lastContact` (ISO date).
+    The body is processed as it arrives; rows that cannot be parsed are
+    counted in `rejected` and skipped.
+    """
+    kind = uploads.body_format(format, request.headers.get("content-type", ""))
+    return {"success": True, "data": await leads.store.import_stream(request.stream(), kind)}
+
+
+@router.get("/summary", summary="Lead Tiers")
+async def lead_summary():
+    """Hot/warm/cold counts overall and per industry, from the maintained aggregates"""
+    await leads.store.ensure()
+    return {"success": True, "data": {**leads.store.summary(), "byIndustry": leads.store.by_industry()}}
+
+
+@router.get("/top", summary="Top Leads")
+async def top_leads(
+    tier: Optional[Literal["hot", "warm", "cold"]] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+):
+    """Highest-scoring leads, optionally within one tier"""
+    await leads.store.ensure()
+    return {"success": True, "data": leads.store.top(limit, tier)}
+
+
+@router.get("/weights", summary="Scoring Weights")
+async def scoring_weights():
+    """Feature and industry weights used to score leads"""
+    await leads.store.ensure()
+    return {"success": True, "data": {"weights": leads.store.weights, "industries": leads.store.industry_weights}}
+
+
+@router.put("/weights", summary="Update Scoring Weights")
+async def update_scoring_weights(update: LeadWeights):
+    """Change some weights and re-score every lead with them"""
+    try:
+        seconds = await leads.store.configure(update.weights, update.industries)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return {"success": True, "data": {**leads.store.summary(), "rescoreSeconds": round(seconds, 3)}}
+
+
+@diagnostics.get("/leads", summary="Lead Store")
+async def lead_store():
+    """Leads by tier, store segments, scoring weights and import/re-score counters (admin only)"""
+    await leads.store.ensure()
+    return {"success": True, "data": leads.store.snapshot()}
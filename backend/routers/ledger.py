@@ -0,0 +1,90 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from typing import Literal, Optional
+
+from core import uploads
+from core.ledger import ACTUAL, BUDGET, ledger, period_window
+from core.security import require_roles
+
+router = APIRouter()
+# Admin routes, mounted under /api/diagnostics when the Finance department is enabled
+diagnostics = APIRouter(dependencies=[Depends(require_roles("admin"))])
+
+PERIOD = Query(None, description="YYYY, YYYY-Qn or YYYY-MM (default: the latest quarter with actuals)")
+
+
+def resolve_period(period: Optional[str], default: Optional[str]) -> str:
+    """The requested period, validated, else the default; 404 while the ledger is empty"""
+    if period is None:
+        if default is None:
+            raise HTTPException(status_code=404, detail="The ledger has no transactions for this report yet")
+        return default
+    try:
+        period_window(period)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return period
+
+
+@router.post("/import", summary="Append Transactions")
+async def import_transactions(
+    request: Request,
+    format: Optional[Literal["csv", "ndjson"]] = Query(None, description="Body format (default: from Content-Type, else CSV)"),
+):
+    """
+    Bulk-append transactions from a streamed CSV (header row first) or NDJSON body.
+
+    Fields: `date` (ISO), `department`, `account`, `amount`, and optionally
+    `scenario` (`actual` or `budget`), `type` (`revenue`, `cogs`, `expense`,
+    `capex`, `financing`) and `cash` (`false` for non-cash entries). Rows
+    that cannot be parsed are counted in `rejected` and skipped.
+    """
+    kind = uploads.body_format(format, request.headers.get("content-type", ""))
+    return {"success": True, "data": await ledger.import_stream(request.stream(), kind)}
+
+
+@router.get("/pnl", summary="Profit and Loss")
+async def profit_and_loss(period: Optional[str] = PERIOD, department: Optional[str] = Query(None)):
+    """Revenue, gross profit and net income, from the rollups"""
+    await ledger.ensure()
+    return {"success": True, "data": ledger.pnl(resolve_period(period, ledger.latest()), department)}
+
+
+@router.get("/cash-flow", summary="Cash Flow")
+async def cash_flow(period: Optional[str] = PERIOD, department: Optional[str] = Query(None)):
+    """Operating, investing and financing cash flows, from the rollups"""
+    await ledger.ensure()
+    return {"success": True, "data": ledger.cash_flow(resolve_period(period, ledger.latest()), department)}
+
+
+@router.get("/variance", summary="Budget Variance")
+async def budget_variance(
+    period: Optional[str] = Query(None, description="YYYY, YYYY-Qn or YYYY-MM (default: the latest budgeted year)"),
+    department: Optional[str] = Query(None),
+):
+    """Budgeted vs actual spend, overall and per department"""
+    await ledger.ensure()
+    default = ledger.latest(BUDGET, quarter=False) or ledger.latest(ACTUAL, quarter=False)
+    return {"success": True, "data": ledger.variance(resolve_period(period, default), department)}
+
+
+@router.get("/rollup", summary="Ledger Rollup")
+async def ledger_rollup(
+    by: Literal["department", "account", "type", "quarter", "month"] = Query("department"),
+    period: Optional[str] = Query(None, description="YYYY, YYYY-Qn or YYYY-MM (default: all periods)"),
+    scenario: Literal["actual", "budget"] = Query("actual"),
+    department: Optional[str] = Query(None),
+    account: Optional[str] = Query(None),
+    type: Optional[Literal["revenue", "cogs", "expense", "capex", "financing"]] = Query(None),
+):
+    """Amounts and transaction counts grouped by one dimension, from the rollups"""
+    await ledger.ensure()
+    if period is not None:
+        resolve_period(period, None)
+    return {"success": True, "data": ledger.rollup(by, period, scenario, department, account, type)}
+
+
+@diagnostics.get("/ledger", summary="Finance Ledger")
+async def ledger_store():
+    """Transactions, periods, parts and rollup size of the finance ledger (admin only)"""
+    await ledger.ensure()
+    return {"success": True, "data": ledger.snapshot()}
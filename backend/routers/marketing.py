@@ -1,143 +0,0 @@
-from fastapi import APIRouter
-import asyncio
-from datetime import datetime
-
-from models import AgentRequest, AgentResponse
-
-router = APIRouter()
-
-
-@router.post("/leads", response_model=AgentResponse, summary="Lead Generator")
-async def leads_agent(request: AgentRequest):
-    """
-    AI Agent for lead generation and management.
-
-    Capabilities:
-    - Create and qualify leads
-    - Score prospects
-    - Manage lead pipeline
-    """
-    await asyncio.sleep(0.9)
-    msg = request.message.lower()
-
-    if "add" in msg or "new" in msg or "create" in msg:
-        return AgentResponse(
-            success=True,
-            message=f"""**New Lead Created:**
-
-👤 Lead ID: LD-{int(datetime.now().timestamp()) % 100000}
-📊 Score: 72/100 (Hot)
-
-**Auto-Enrichment:**
-- Company Size: 500-1000 employees
-- Industry: Technology
-- Decision Maker: Yes""",
-            data={"leadId": f"LD-{int(datetime.now().timestamp()) % 100000}", "score": 72, "status": "hot"}
-        )
-    elif "score" in msg or "qualify" in msg:
-        return AgentResponse(
-            success=True,
-            message="**Lead Scoring Results:**\n\n- Hot (80+): 8 leads\n- Warm (50-79): 23 leads\n- Cold (<50): 16 leads",
-            data={"hotLeads": 8, "warmLeads": 23, "coldLeads": 16}
-        )
-    else:
-        return AgentResponse(
-            success=True,
-            message="Hi! I'm your Lead Generator. I help with:\n- Creating leads\n- Scoring prospects\n- Pipeline management",
-            data={"totalLeads": 234, "hotLeads": 28}
-        )
-
-
-@router.post("/campaign", response_model=AgentResponse, summary="Campaign Manager")
-async def campaign_agent(request: AgentRequest):
-    """AI Agent for marketing campaign planning and tracking"""
-    await asyncio.sleep(1.0)
-    msg = request.message.lower()
-
-    if "create" in msg or "launch" in msg:
-        return AgentResponse(
-            success=True,
-            message="""**Campaign Created - Q1 Product Launch:**
-
-🚀 Duration: Jan 15 - Mar 31
-💰 Budget: $50,000
-🎯 Goal: 500 qualified leads
-
-**Channel Mix:**
-- Google Ads: $20K
-- LinkedIn: $15K
-- Email: $5K
-- Content: $10K""",
-            data={"campaignId": f"CAMP-{int(datetime.now().timestamp())}", "budget": 50000, "leadGoal": 500}
-        )
-    else:
-        return AgentResponse(
-            success=True,
-            message="Hi! I'm your Campaign Manager. I can:\n- Create campaigns\n- Track performance\n- Analyze ROI",
-            data={"activeCampaigns": 5, "totalSpendMTD": 45000}
-        )
-
-
-@router.post("/content", response_model=AgentResponse, summary="Content Creator")
-async def content_agent(request: AgentRequest):
-    """AI Agent for content creation - blogs, social, email copy"""
-    await asyncio.sleep(1.5)
-    msg = request.message.lower()
-
-    if "blog" in msg:
-        return AgentResponse(
-            success=True,
-            message="""**Blog Post Draft:**
-
-# How AI is Revolutionizing Healthcare in 2025
-
-*Reading time: 6 minutes*
-
-AI algorithms now detect cancers with 94% accuracy...
-
-**SEO Score: 85/100**""",
-            data={"contentId": f"BLOG-{int(datetime.now().timestamp())}", "wordCount": 1200, "seoScore": 85}
-        )
-    else:
-        return AgentResponse(
-            success=True,
-            message="Hi! I'm your Content Creator. I write:\n- Blog posts\n- Social media content\n- Email campaigns\n- Ad copy",
-            data={"contentCreatedToday": 5, "contentQueue": 12}
-        )
-
-
-@router.post("/social", response_model=AgentResponse, summary="Social Media Agent")
-async def social_agent(request: AgentRequest):
-    """AI Agent for social media management"""
-    await asyncio.sleep(0.8)
-    return AgentResponse(
-        success=True,
-        message="Hi! I'm your Social Media Agent. I help with:\n- Scheduling posts\n- Analyzing engagement\n- Tracking trends",
-        data={"scheduledPosts": 15, "engagementRate": 4.2}
-    )
-
-
-@router.post("/analytics", response_model=AgentResponse, summary="Marketing Analyst")
-async def analytics_agent(request: AgentRequest):
-    """AI Agent for marketing analytics and ROI tracking"""
-    await asyncio.sleep(1.1)
-    msg = request.message.lower()
-
-    if "roi" in msg:
-        return AgentResponse(
-            success=True,
-            message="""**Marketing ROI - This Quarter:**
-
-📊 Spend: $125,000
-💰 Revenue: $625,000
-📈 **ROI: 5.0x** (400% return)
-
-Best Channel: Content/SEO (6.0x)""",
-            data={"totalSpend": 125000, "totalRevenue": 625000, "roi": 5.0}
-        )
-    else:
-        return AgentResponse(
-            success=True,
-            message="Hi! I'm your Marketing Analyst. I provide:\n- ROI analysis\n- Channel attribution\n- Performance reports",
-            data={"reportsAvailable": ["ROI", "Attribution", "Traffic"]}
-        )
@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends
+
+from core import rfps
+from core.security import require_roles
+
+# Admin routes, mounted under /api/diagnostics when the Sales department is enabled
+diagnostics = APIRouter(dependencies=[Depends(require_roles("admin"))])
+
+
+@diagnostics.get("/rfps", summary="RFP Matching")
+async def rfp_index():
+    """RFPs available to the RFP Hunter, rows in the embedding matrix and the last sync (admin only)"""
+    return {"success": True, "data": rfps.index.snapshot()}
+
+
+@diagnostics.post("/rfps/sync", summary="Sync RFP Corpus")
+async def sync_rfps():
+    """Embed new and changed RFPs from the corpus file now instead of at the next refresh (admin only)"""
+    await rfps.index.sync(force=True)
+    return {"success": True, "data": rfps.index.snapshot()}
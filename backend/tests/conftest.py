@@ -0,0 +1,34 @@
+"""
+Shared fixtures. The environment is set before any ``core`` module is
+imported, so every store writes under a throwaway data directory and agent
+calls neither sleep nor get rate limited.
+"""
+import os
+import tempfile
+
+# Removed when the test process exits
+_data_dir = tempfile.TemporaryDirectory(prefix="itt-tests-")
+os.environ["ITT_DATA_DIR"] = _data_dir.name
+os.environ.setdefault("ITT_LATENCY_MODE", "off")
+os.environ.setdefault("ITT_ADMISSION", "0")
+os.environ.setdefault("ITT_WATCHDOG", "0")
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from core.tokens import issue_token  # noqa: E402
+from main import app  # noqa: E402
+from models import MOCK_USERS  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def client():
+    """The application with its lifespan running"""
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="session")
+def admin_headers():
+    admin = next(user for user in MOCK_USERS if user.role == "admin")
+    return {"Authorization": f"Bearer {issue_token(admin)}"}
@@ -0,0 +1,186 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import HTTPException
+
+from core import admission, model
+from core.admission import AdmissionController, AgentGate, Rejected, TokenBucket
+from core.security import current_principal
+from core.tokens import TokenClaims, issue_token
+from models import MOCK_USERS
+
+AGENT, DEPARTMENT, PATH = "hr-onboarding", "hr", "/api/hr/onboarding"
+
+
+def as_user(user_id):
+    current_principal.set(TokenClaims(user_id=user_id, role="admin", expires_at=0))
+
+
+def headers_of(user):
+    return {"Authorization": f"Bearer {issue_token(user)}"}
+
+
+@pytest.fixture
+def controller(monkeypatch):
+    """A fresh, enabled controller in place of the shared one"""
+    fresh = AdmissionController(enabled=True)
+    monkeypatch.setattr(admission, "controller", fresh)
+    yield fresh
+    current_principal.set(None)
+
+
+# Token buckets
+
+def test_bucket_allows_a_burst_then_reports_the_wait():
+    bucket = TokenBucket(rate=2.0, capacity=3, now=0.0)
+    assert [bucket.take(0.0) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.take(0.0) == pytest.approx(0.5)
+    # Half a second refills one token
+    assert bucket.take(0.5) == 0.0
+    assert bucket.take(0.5) == pytest.approx(0.5)
+    assert bucket.refill_time() == pytest.approx(1.5)
+
+
+def test_user_limit_is_per_user_and_agent_limit_is_shared(controller):
+    controller.configure(AGENT, {"user_rate": 0.25, "user_burst": 2, "agent_rate": 1, "agent_burst": 3})
+    as_user("a")
+    controller.check(DEPARTMENT, AGENT)
+    controller.check(DEPARTMENT, AGENT)
+    with pytest.raises(HTTPException) as limited:
+        controller.check(DEPARTMENT, AGENT)
+    assert limited.value.status_code == 429
+    assert limited.value.headers["Retry-After"] == "4"
+
+    as_user("b")
+    controller.check(DEPARTMENT, AGENT)
+    with pytest.raises(HTTPException) as shared:
+        controller.check(DEPARTMENT, AGENT)
+    assert (shared.value.status_code, shared.value.detail) == (429, "Agent is receiving too many requests")
+    assert controller.snapshot()[AGENT]["counters"]["rate_limited"] == 2
+
+
+def test_disabled_controller_admits_everything(controller):
+    controller.configure(AGENT, {"user_rate": 0.1, "user_burst": 1})
+    controller.enabled = False
+    as_user("a")
+    for _ in range(5):
+        controller.check(DEPARTMENT, AGENT)
+
+
+# Concurrency gate
+
+def test_gate_queues_then_rejects_and_hands_slots_over():
+    async def main():
+        gate = AgentGate(limit=1, queue=1, timeout=5)
+        assert await gate.acquire() is False
+        waiting = asyncio.ensure_future(gate.acquire())
+        await asyncio.sleep(0)
+        assert (gate.active, gate.waiting) == (1, 1)
+        with pytest.raises(Rejected) as full:
+            await gate.acquire()
+        assert (full.value.status_code, full.value.retry_after) == (503, 5)
+
+        gate.release()
+        assert await waiting is True
+        assert (gate.active, gate.waiting) == (1, 0)
+        gate.release()
+        assert gate.active == 0
+
+    asyncio.run(main())
+
+
+def test_gate_times_out_and_frees_the_queue_place():
+    async def main():
+        gate = AgentGate(limit=1, queue=1, timeout=0.05)
+        await gate.acquire()
+        with pytest.raises(Rejected):
+            await gate.acquire()
+        assert gate.waiting == 0
+        gate.release()
+        assert await gate.acquire() is False
+
+    asyncio.run(main())
+
+
+def test_cancelled_waiter_does_not_leak_a_slot():
+    async def main():
+        gate = AgentGate(limit=1, queue=2, timeout=5)
+        await gate.acquire()
+        waiting = asyncio.ensure_future(gate.acquire())
+        await asyncio.sleep(0)
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+        gate.release()
+        assert (gate.active, gate.waiting) == (0, 0)
+
+    asyncio.run(main())
+
+
+# Through the application
+
+def test_rate_limited_requests_get_429_with_retry_after(client, controller):
+    controller.configure(AGENT, {"user_rate": 0.5, "user_burst": 1})
+    first, second = MOCK_USERS[0], next(user for user in MOCK_USERS if user.role == "ceo")
+    assert client.post(PATH, json={"message": "start"}, headers=headers_of(first)).status_code == 200
+
+    for path in (PATH, f"{PATH}/stream"):
+        response = client.post(path, json={"message": "start"}, headers=headers_of(first))
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "2"
+        assert response.json()["detail"] == "Rate limit exceeded for this agent"
+
+    assert client.post(PATH, json={"message": "start"}, headers=headers_of(second)).status_code == 200
+
+
+class GatedBackend(model.ModelBackend):
+    """Model calls that hold their slot until released"""
+    name = "gated"
+
+    def __init__(self):
+        super().__init__()
+        self.release = None
+
+    async def complete(self, agent, prompt, history=()):
+        self.calls += 1
+        if self.release is None:
+            self.release = asyncio.Event()
+        await self.release.wait()
+        return model.Completion(text="", model=self.name, seconds=0.0)
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_full_gate_gets_503_and_capacity_returns(client, admin_headers, controller, monkeypatch):
+    controller.configure(AGENT, {"concurrency": 1, "queue": 1, "queue_timeout": 5})
+    backend = GatedBackend()
+    monkeypatch.setattr(model, "backend", backend)
+
+    def post(message):
+        # Distinct messages, so the calls are not coalesced into one
+        return client.post(PATH, json={"message": message}, headers=admin_headers)
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        running = pool.submit(post, "start one")
+        wait_until(lambda: backend.calls == 1)
+        queued = pool.submit(post, "start two")
+        wait_until(lambda: controller.snapshot()[AGENT]["waiting"] == 1)
+
+        rejected = post("start three")
+        assert rejected.status_code == 503
+        assert rejected.headers["Retry-After"] == "5"
+
+        client.portal.call(backend.release.set)
+        assert running.result(timeout=5).status_code == 200
+        assert queued.result(timeout=5).status_code == 200
+
+    state = controller.snapshot()[AGENT]
+    assert (state["inFlight"], state["waiting"]) == (0, 0)
+    assert state["counters"] == {"admitted": 1, "queued": 1, "rate_limited": 0, "overloaded": 1}
+    assert post("start four").status_code == 200
@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+
+from core.coalescing import Coalescer, normalize
+
+
+class Upstream:
+    """Model call stand-in that counts calls and finishes when released"""
+
+    def __init__(self, error=None):
+        self.calls = 0
+        self.error = error
+        self.release = asyncio.Event()
+
+    async def __call__(self, message, history):
+        self.calls += 1
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return f"reply {self.calls} to {message}"
+
+
+async def gather_released(upstream, *calls):
+    tasks = [asyncio.ensure_future(call) for call in calls]
+    await asyncio.sleep(0)
+    upstream.release.set()
+    return await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def test_normalize_ignores_case_whitespace_and_trailing_punctuation():
+    assert normalize("  What are our  AI/ML capabilities?? ") == "what are our ai/ml capabilities"
+
+
+def test_identical_concurrent_requests_share_one_call():
+    async def main():
+        coalescer, upstream = Coalescer(), Upstream()
+        results = await gather_released(upstream, *(coalescer.run("agent", message, upstream)
+                                                     for message in ("Hello?", "hello", " HELLO ")))
+        assert upstream.calls == 1
+        assert len(set(results)) == 1
+        assert coalescer.snapshot()["agents"]["agent"] == {"upstream": 1, "joined": 2, "window": 0, "saved": 2}
+
+    asyncio.run(main())
+
+
+def test_different_agents_messages_and_histories_are_not_shared():
+    async def main():
+        coalescer, upstream = Coalescer(), Upstream()
+        history = [{"role": "user", "content": "earlier"}]
+        await gather_released(upstream, coalescer.run("agent", "hello", upstream),
+                              coalescer.run("other", "hello", upstream),
+                              coalescer.run("agent", "goodbye", upstream),
+                              coalescer.run("agent", "hello", upstream, history))
+        assert upstream.calls == 4
+
+    asyncio.run(main())
+
+
+def test_failure_is_shared_but_not_kept_for_the_window():
+    async def main():
+        coalescer, upstream = Coalescer(window=60), Upstream(RuntimeError("down"))
+        results = await gather_released(upstream, coalescer.run("agent", "hello", upstream),
+                                        coalescer.run("agent", "hello", upstream))
+        assert upstream.calls == 1
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+        upstream.error = None
+        assert await coalescer.run("agent", "hello", upstream) == "reply 2 to hello"
+
+    asyncio.run(main())
+
+
+def test_window_reuses_a_finished_completion():
+    async def main():
+        coalescer, upstream = Coalescer(window=60), Upstream()
+        upstream.release.set()
+        first = await coalescer.run("agent", "hello", upstream)
+        assert await coalescer.run("agent", "Hello!", upstream) == first
+        assert upstream.calls == 1
+
+        coalescer.clear()
+        assert await coalescer.run("agent", "hello", upstream) != first
+
+    asyncio.run(main())
+
+
+def test_cancelled_leader_does_not_fail_followers():
+    async def main():
+        coalescer, upstream = Coalescer(), Upstream()
+        leader = asyncio.ensure_future(coalescer.run("agent", "hello", upstream))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(coalescer.run("agent", "hello", upstream))
+        await asyncio.sleep(0)
+        leader.cancel()
+        upstream.release.set()
+        assert await follower == "reply 1 to hello"
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+
+    asyncio.run(main())
+
+
+def test_disabled_calls_every_time():
+    async def main():
+        coalescer, upstream = Coalescer(enabled=False), Upstream()
+        await gather_released(upstream, coalescer.run("agent", "hello", upstream),
+                              coalescer.run("agent", "hello", upstream))
+        assert upstream.calls == 2
+
+    asyncio.run(main())
@@ -0,0 +1,54 @@
+import base64
+
+import pytest
+
+from models import MOCK_USERS
+from routers.employees import decode_cursor, encode_cursor
+
+
+def pages(client, **params):
+    """Every page of a listing, following nextCursor"""
+    result, cursor = [], None
+    while True:
+        response = client.get("/api/employees/", params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200, response.text
+        body = response.json()
+        result.append([user["id"] for user in body["data"]])
+        cursor = body["nextCursor"]
+        if cursor is None:
+            return result
+
+
+@pytest.mark.parametrize("user_id", ["1", "14", "user:é/∑"])
+def test_cursor_round_trips(user_id):
+    cursor = encode_cursor(user_id)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == user_id
+
+
+@pytest.mark.parametrize("limit", [1, 5, 13, 14, 15, 500])
+def test_pages_cover_every_employee_once(client, limit):
+    result = pages(client, limit=limit)
+    assert [user_id for page in result for user_id in page] == [user.id for user in MOCK_USERS]
+    assert all(len(page) == limit for page in result[:-1])
+    assert 0 < len(result[-1]) <= limit
+
+
+def test_pages_of_a_filtered_listing(client):
+    executives = [user.id for user in MOCK_USERS if user.department == "Executive"]
+    result = pages(client, department="Executive", limit=2)
+    assert [user_id for page in result for user_id in page] == executives
+    assert [len(page) for page in result] == [2] * (len(executives) // 2) + ([len(executives) % 2] if len(executives) % 2 else [])
+
+
+@pytest.mark.parametrize("cursor", [
+    "é",                                                 # not ASCII
+    "!!!!",                                              # not base64
+    "a",                                                 # bad padding
+    base64.urlsafe_b64encode(b"\xff\xfe").decode(),      # not UTF-8
+    encode_cursor("no-such-employee"),                   # unknown id
+])
+def test_invalid_cursor_is_rejected(client, cursor):
+    response = client.get("/api/employees/", params={"cursor": cursor})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
@@ -0,0 +1,70 @@
+import random
+
+import pytest
+
+from core import intents
+from core.intents import IntentRegistry
+
+FILLER = ["quarterly", "update", "for", "the", "team", "please", "share", "thanks", "regarding", "our", "plan"]
+
+# Keywords that overlap: prefixes, suffixes, nested in each other and listed under several rules
+OVERLAPPING = [
+    ("payroll", ("payroll", "pay stub")),
+    ("pay", ("pay", "salary")),
+    ("raise", ("raise", "salary raise", "pay")),
+    ("stub", ("stub", "b")),
+    ("roll", ("roll", "oll", "rollout")),
+    ("out", ("out", "utter")),
+]
+
+
+def first_match(rules, message):
+    """The ``if "a" in msg or "b" in msg: ... elif ...`` chain the registry replaces"""
+    msg = message.lower()
+    for intent, keywords in rules:
+        if any(keyword in msg for keyword in keywords):
+            return intent
+    return None
+
+
+def messages(rules, count, seed):
+    """Messages mixing filler with several keywords of different rules, in random order and case"""
+    rng = random.Random(seed)
+    keywords = [keyword for _, words in rules for keyword in words]
+    for _ in range(count):
+        words = rng.sample(FILLER, rng.randint(0, 4)) + rng.sample(keywords, rng.randint(0, min(4, len(keywords))))
+        rng.shuffle(words)
+        message = rng.choice((" ", "", "-")).join(words)
+        yield message.upper() if rng.random() < 0.2 else message
+
+
+def test_catalog_intents_resolve_like_first_match_chains():
+    agents = intents.registry.agents()
+    assert agents
+    for number, agent in enumerate(agents):
+        rules = intents.registry.rules(agent)
+        for message in messages(rules, 500, seed=number):
+            assert intents.resolve(agent, message) == first_match(rules, message), (agent, message)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_overlapping_keywords_resolve_to_the_first_rule(seed):
+    registry = IntentRegistry()
+    rules = OVERLAPPING[seed:] + OVERLAPPING[:seed]
+    registry.register("agent", rules)
+    # Another agent sharing keywords must not change this agent's priorities
+    registry.register("other", list(reversed(rules)))
+    expected = registry.rules("agent")
+    for message in messages(expected, 2000, seed):
+        assert registry.resolve("agent", message) == first_match(expected, message), message
+
+
+def test_earlier_rules_win_wherever_their_keyword_appears():
+    registry = IntentRegistry()
+    registry.register("agent", OVERLAPPING)
+    assert registry.resolve("agent", "salary raise") == "pay"
+    assert registry.resolve("agent", "a stub before the PAYROLL") == "payroll"
+    assert registry.resolve("agent", "rollout") == "roll"
+    assert registry.resolve("agent", "flutter") == "out"
+    assert registry.resolve("agent", "nothing here") is None
+    assert registry.resolve("missing", "payroll") is None
@@ -0,0 +1,204 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from core.jobs import JobQueue, JobStore
+from core.security import Principal
+from models import AgentResponse
+from routers import jobs as jobs_router
+
+USER = Principal(user_id="5", role="marketing_staff", expires_at=0)
+
+
+class Agent:
+    """Job runner that records the messages it ran, holding each until released"""
+
+    def __init__(self, fail=False):
+        self.ran = []
+        self.fail = fail
+        self.release = asyncio.Event()
+
+    async def __call__(self, request):
+        await self.release.wait()
+        self.ran.append(request.message)
+        if self.fail:
+            raise RuntimeError("boom")
+        return AgentResponse(success=True, message=f"done: {request.message}")
+
+
+def queue_at(path, workers=1, max_queued=1000):
+    return JobQueue(JobStore(str(path / "jobs.db")), workers=workers, max_queued=max_queued)
+
+
+def test_job_runs_and_records_its_result(tmp_path):
+    async def main():
+        queue, agent = queue_at(tmp_path), Agent()
+        queue.register("agent", agent)
+        await queue.start()
+        try:
+            job = await queue.submit("agent", "hello", USER)
+            assert job.status == "queued"
+            agent.release.set()
+            job = await queue.wait(job.id, timeout=5)
+            assert job.status == "succeeded"
+            assert job.result["message"] == "done: hello"
+            assert [found.id for found in await queue.for_user(USER.user_id)] == [job.id]
+        finally:
+            await queue.stop()
+
+    asyncio.run(main())
+
+
+def test_higher_priority_runs_first_and_fifo_within_a_priority(tmp_path):
+    async def main():
+        queue, agent = queue_at(tmp_path), Agent()
+        queue.register("agent", agent)
+        await queue.start()
+        try:
+            # The single worker takes the first job and blocks on it, so the rest stay queued
+            jobs = [await queue.submit("agent", "first", USER)]
+            await asyncio.sleep(0.05)
+            for message, priority in (("low", "low"), ("normal 1", "normal"), ("high", "high"), ("normal 2", "normal")):
+                jobs.append(await queue.submit("agent", message, USER, priority))
+            agent.release.set()
+            for job in jobs:
+                assert (await queue.wait(job.id, timeout=5)).status == "succeeded"
+            assert agent.ran == ["first", "high", "normal 1", "normal 2", "low"]
+        finally:
+            await queue.stop()
+
+    asyncio.run(main())
+
+
+def test_failures_and_unknown_agents_fail_the_job(tmp_path):
+    async def main():
+        queue, agent = queue_at(tmp_path), Agent(fail=True)
+        agent.release.set()
+        queue.register("agent", agent)
+        await queue.start()
+        try:
+            failed = await queue.wait((await queue.submit("agent", "hello", USER)).id, timeout=5)
+            assert (failed.status, failed.error) == ("failed", "Agent failed to respond")
+            missing = await queue.wait((await queue.submit("missing", "hello", USER)).id, timeout=5)
+            assert missing.status == "failed"
+        finally:
+            await queue.stop()
+
+    asyncio.run(main())
+
+
+def test_cancel_only_while_queued(tmp_path):
+    async def main():
+        queue, agent = queue_at(tmp_path), Agent()
+        queue.register("agent", agent)
+        await queue.start()
+        try:
+            running = await queue.submit("agent", "running", USER)
+            await asyncio.sleep(0.05)
+            queued = await queue.submit("agent", "queued", USER)
+            assert (await queue.cancel(queued.id)).status == "cancelled"
+            with pytest.raises(HTTPException) as rejected:
+                await queue.cancel(running.id)
+            assert rejected.value.status_code == 409
+            agent.release.set()
+            assert (await queue.wait(running.id, timeout=5)).status == "succeeded"
+            assert agent.ran == ["running"]
+        finally:
+            await queue.stop()
+
+    asyncio.run(main())
+
+
+def test_full_or_stopped_queue_rejects_submits(tmp_path):
+    async def main():
+        queue, agent = queue_at(tmp_path, max_queued=1), Agent()
+        queue.register("agent", agent)
+        with pytest.raises(HTTPException) as stopped:
+            await queue.submit("agent", "hello", USER)
+        assert stopped.value.status_code == 503
+        await queue.start()
+        try:
+            await queue.submit("agent", "running", USER)
+            await asyncio.sleep(0.05)
+            await queue.submit("agent", "queued", USER)
+            with pytest.raises(HTTPException) as full:
+                await queue.submit("agent", "one too many", USER)
+            assert full.value.status_code == 503
+            assert full.value.headers["Retry-After"]
+        finally:
+            agent.release.set()
+            await queue.stop()
+
+    asyncio.run(main())
+
+
+def test_unfinished_jobs_run_again_after_a_restart(tmp_path):
+    async def main():
+        queue, agent = queue_at(tmp_path), Agent()
+        queue.register("agent", agent)
+        await queue.start()
+        running = await queue.submit("agent", "interrupted", USER)
+        await asyncio.sleep(0.05)
+        queued = await queue.submit("agent", "waiting", USER, "high")
+        await queue.stop()
+
+        restarted, agent = queue_at(tmp_path), Agent()
+        agent.release.set()
+        restarted.register("agent", agent)
+        await restarted.start()
+        try:
+            for job in (running, queued):
+                assert (await restarted.wait(job.id, timeout=5)).status == "succeeded"
+            assert sorted(agent.ran) == ["interrupted", "waiting"]
+        finally:
+            await restarted.stop()
+
+    asyncio.run(main())
+
+
+def test_changes_made_while_the_consumer_is_busy_end_with_the_final_state(tmp_path):
+    async def main():
+        queue, agent = queue_at(tmp_path), Agent()
+        queue.register("agent", agent)
+        await queue.start()
+        try:
+            job = await queue.submit("agent", "hello", USER)
+            seen = []
+            async for snapshot in queue.changes(job.id):
+                seen.append(snapshot.status)
+                if len(seen) == 1:
+                    # The job starts and finishes before the consumer asks for the next change
+                    agent.release.set()
+                    await queue.wait(job.id, timeout=5)
+            return seen
+        finally:
+            await queue.stop()
+
+    seen = asyncio.run(asyncio.wait_for(main(), timeout=5))
+    assert seen[0] in ("queued", "running")
+    assert seen[-1] == "succeeded"
+
+
+def test_event_stream_sends_the_terminal_event_after_a_slow_write(tmp_path, monkeypatch):
+    async def main():
+        queue, agent = queue_at(tmp_path), Agent(fail=True)
+        queue.register("agent", agent)
+        monkeypatch.setattr(jobs_router.jobs, "queue", queue)
+        await queue.start()
+        try:
+            job = await queue.submit("agent", "hello", USER)
+            events = []
+            async for event in jobs_router.job_events(job.id):
+                events.append(event.decode())
+                if len(events) == 1:
+                    agent.release.set()
+                    await queue.wait(job.id, timeout=5)
+            return events
+        finally:
+            await queue.stop()
+
+    events = asyncio.run(asyncio.wait_for(main(), timeout=5))
+    assert events[0].startswith("event: status\n")
+    assert events[-1].startswith("event: error\n")
+    assert "Agent failed to respond" in events[-1]
@@ -0,0 +1,93 @@
+import asyncio
+import random
+
+import pytest
+
+from core.leads import LeadStore
+
+HEADER = "Lead ID,Contact,Company,Industry,Employees,Email Opens,Clicks,Site Visits,Demo Requested,Decision Maker,Last Contact"
+
+
+def leads_csv(count, industries, seed, extra=()):
+    rng = random.Random(seed)
+    lines = [HEADER]
+    for number in range(count):
+        lines.append(",".join(str(value) for value in (
+            f"L{seed}-{number}", f"Contact {number}", f"Company {number}", rng.choice(industries),
+            rng.choice([5, 50, 500, 5000, 50000]), rng.randint(0, 15), rng.randint(0, 8), rng.randint(0, 15),
+            rng.choice(["yes", "no"]), rng.choice(["true", "false"]), rng.choice(["2026-10-01", "2026-01-15", ""]),
+        )))
+    return ("\n".join([*lines, *extra]) + "\n").encode()
+
+
+async def chunked(body, size=97):
+    for start in range(0, len(body), size):
+        yield body[start:start + size]
+
+
+def aggregates(store):
+    return store.summary(), store.by_industry()
+
+
+def assert_matches_full_load(store):
+    """Incrementally maintained aggregates equal those of scoring everything from disk"""
+    loaded = LeadStore(store.root, batch=store.batch)
+    asyncio.run(loaded.ensure())
+    (summary, industries), (expected_summary, expected_industries) = aggregates(store), aggregates(loaded)
+    assert industries == expected_industries
+    assert {key: value for key, value in summary.items() if key != "averageScore"} == \
+           {key: value for key, value in expected_summary.items() if key != "averageScore"}
+    assert summary["averageScore"] == pytest.approx(expected_summary["averageScore"], abs=0.1)
+
+
+def test_incremental_tier_counts_equal_a_full_rescore(tmp_path):
+    store = LeadStore(tmp_path / "leads", batch=37)
+
+    async def main():
+        first = await store.import_stream(chunked(leads_csv(150, ["technology", "healthcare", "retail"], 1)), "csv")
+        assert (first["imported"], first["rejected"]) == (150, 0)
+        # Same industries: only the new rows are scored and added to the counts
+        await store.import_stream(chunked(leads_csv(80, ["healthcare", "retail"], 2)), "csv")
+        # A new industry changes the weight table, so everything is re-scored
+        await store.import_stream(chunked(leads_csv(40, ["government", "technology"], 3)), "csv")
+
+    asyncio.run(main())
+    assert store.summary()["totalLeads"] == 270
+    assert sum(sum(tiers.values()) for tiers in store.by_industry().values()) == 270
+    assert_matches_full_load(store)
+
+    before = aggregates(store)
+    asyncio.run(store.rescore())
+    assert aggregates(store)[1] == before[1]
+
+
+def test_changed_weights_rescore_every_lead(tmp_path):
+    store = LeadStore(tmp_path / "leads", batch=50)
+
+    async def main():
+        await store.import_stream(chunked(leads_csv(120, ["technology", "education"], 4)), "csv")
+        await store.configure({"demo": 60.0}, {"Education": 1.0})
+
+    asyncio.run(main())
+    assert store.industry_weights["education"] == 1.0
+    assert_matches_full_load(store)
+    top = store.top(5)
+    assert [lead["score"] for lead in top] == sorted((lead["score"] for lead in top), reverse=True)
+    assert all(lead["tier"] == "hot" for lead in store.top(3, tier="hot"))
+
+
+def test_unusable_rows_are_rejected(tmp_path):
+    store = LeadStore(tmp_path / "leads")
+    bad = [
+        "B1,Bad Size,Co,technology,inf,1,1,1,no,no,2026-10-01",
+        "B2,Huge Opens,Co,technology,10,1e12,1,1,no,no,2026-10-01",
+        "B3,Bad Date,Co,technology,10,1,1,1,no,no,not a date",
+        "B4,Bad Count,Co,technology,ten,1,1,1,no,no,2026-10-01",
+    ]
+
+    async def main():
+        return await store.import_stream(chunked(leads_csv(10, ["technology"], 5, bad)), "csv")
+
+    result = asyncio.run(main())
+    assert (result["imported"], result["rejected"]) == (10, 4)
+    assert store.summary()["totalLeads"] == 10
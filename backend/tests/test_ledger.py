@@ -0,0 +1,167 @@
+import asyncio
+import csv
+import io
+import json
+import random
+from collections import defaultdict
+from datetime import date
+
+import pytest
+
+from core.ledger import Ledger, period_window
+
+DEPARTMENTS = ("Engineering", "Sales", "HR")
+
+# Account, type, cash
+ACCOUNTS = (("Product Revenue", "revenue", True), ("Cost of Services", "cogs", True), ("Salaries", "expense", True),
+            ("Servers", "capex", True), ("Loan Proceeds", "financing", True), ("Depreciation", "expense", False))
+
+
+def transactions(count, seed):
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(count):
+        account, kind, cash = rng.choice(ACCOUNTS)
+        rows.append({
+            "date": date(rng.choice((2025, 2026)), rng.randint(1, 12), rng.randint(1, 28)).isoformat(),
+            "department": rng.choice(DEPARTMENTS),
+            "account": account,
+            "type": kind,
+            "cash": cash,
+            "scenario": rng.choice(("actual", "actual", "budget")),
+            "amount": f"{rng.randint(1, 5_000_000) / 100:.2f}",
+        })
+    return rows
+
+
+def ndjson(rows):
+    return "".join(json.dumps(row) + "\n" for row in rows).encode()
+
+
+def csv_body(rows):
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=list(rows[0]))
+    writer.writeheader()
+    writer.writerows(rows)
+    return out.getvalue().encode()
+
+
+async def chunked(body, size=211):
+    for start in range(0, len(body), size):
+        yield body[start:start + size]
+
+
+def in_period(row, period):
+    first, last = period_window(period)
+    day = date.fromisoformat(row["date"])
+    return first <= day.year * 12 + day.month - 1 <= last
+
+
+def cents(row):
+    return round(float(row["amount"]) * 100)
+
+
+def scan(rows, period, scenario="actual"):
+    """Cents per account type, summed row by row"""
+    totals = defaultdict(int)
+    for row in rows:
+        if row["scenario"] == scenario and in_period(row, period):
+            totals[dict((name, kind) for name, kind, _ in ACCOUNTS)[row["account"]]] += cents(row)
+    return totals
+
+
+@pytest.fixture(scope="module")
+def loaded(tmp_path_factory):
+    """A ledger filled by three imports in small batches, and the rows imported"""
+    ledger = Ledger(tmp_path_factory.mktemp("ledger"), batch=29)
+    rows = transactions(400, seed=1)
+
+    async def main():
+        for start in range(0, len(rows), 150):
+            result = await ledger.import_stream(chunked(ndjson(rows[start:start + 150])), "ndjson")
+            assert result["rejected"] == 0
+
+    asyncio.run(main())
+    return ledger, rows
+
+
+@pytest.mark.parametrize("by", ["department", "account", "month"])
+def test_rollups_equal_a_scan(loaded, by):
+    ledger, rows = loaded
+    expected = defaultdict(lambda: [0, 0])
+    for row in rows:
+        if row["scenario"] == "actual" and in_period(row, "2025"):
+            key = row["date"][:7] if by == "month" else row[by]
+            expected[key][0] += cents(row)
+            expected[key][1] += 1
+    result = {entry[by]: [round(entry["amount"] * 100), entry["transactions"]] for entry in ledger.rollup(by, "2025")}
+    assert result == dict(expected)
+
+
+def test_statements_equal_a_scan(loaded):
+    ledger, rows = loaded
+    totals = scan(rows, "2025-Q4")
+    pnl = ledger.pnl("2025-Q4")
+    assert pnl["revenue"] == totals["revenue"] / 100
+    assert pnl["grossProfit"] == pytest.approx((totals["revenue"] - totals["cogs"]) / 100)
+    assert pnl["netIncome"] == pytest.approx((totals["revenue"] - totals["cogs"] - totals["expense"]) / 100)
+    assert pnl["revenueChange"] == round((totals["revenue"] - scan(rows, "2025-Q3")["revenue"]) * 100
+                                         / scan(rows, "2025-Q3")["revenue"], 1)
+
+    cash = scan([row for row in rows if row["cash"]], "2025-Q4")
+    flow = ledger.cash_flow("2025-Q4")
+    assert flow["operating"] == pytest.approx((cash["revenue"] - cash["cogs"] - cash["expense"]) / 100)
+    assert flow["investing"] == pytest.approx(-cash["capex"] / 100)
+    assert flow["financing"] == pytest.approx(cash["financing"] / 100)
+
+    budget, actual = scan(rows, "2026", "budget"), scan(rows, "2026")
+    variance = ledger.variance("2026")
+    assert variance["totalBudget"] == pytest.approx(sum(budget[kind] for kind in ("cogs", "expense", "capex")) / 100)
+    assert variance["spent"] == pytest.approx(sum(actual[kind] for kind in ("cogs", "expense", "capex")) / 100)
+    assert {row["department"] for row in variance["departments"]} == set(DEPARTMENTS)
+
+
+def test_reloaded_ledger_has_the_same_rollups(loaded):
+    ledger, _ = loaded
+    reloaded = Ledger(ledger.root)
+    asyncio.run(reloaded.ensure())
+    assert reloaded.summary() == ledger.summary()
+    for by in ("department", "account", "type", "quarter"):
+        assert reloaded.rollup(by) == ledger.rollup(by)
+
+
+def test_unusable_rows_are_rejected_without_touching_the_dictionaries(tmp_path):
+    ledger = Ledger(tmp_path / "ledger")
+    good = transactions(5, seed=2)
+    bad = [
+        {**good[0], "department": "Overflow", "account": "Overflow", "amount": "1e20"},
+        {**good[0], "department": "Infinite", "amount": "inf"},
+        {**good[0], "department": "Undated", "date": "someday"},
+        {**good[0], "department": "Unknown", "scenario": "forecast"},
+    ]
+
+    result = asyncio.run(ledger.import_stream(chunked(ndjson(good + bad)), "ndjson"))
+    assert (result["imported"], result["rejected"]) == (5, 4)
+    assert set(ledger.departments) <= set(DEPARTMENTS)
+    assert "Overflow" not in ledger.accounts
+
+
+def test_csv_rows_split_across_chunks_import_like_ndjson(tmp_path):
+    rows = transactions(60, seed=3)
+    # Quoted fields, one of them with a newline, so chunk boundaries also fall inside quotes
+    rows[7]["department"] = "Sales, EMEA"
+    rows[8]["department"] = "Sales\nAPAC"
+    from_csv, from_ndjson = Ledger(tmp_path / "csv", batch=7), Ledger(tmp_path / "ndjson", batch=7)
+
+    async def main():
+        # A chunk size much shorter than a row splits nearly every row
+        result = await from_csv.import_stream(chunked(csv_body(rows), size=13), "csv")
+        await from_ndjson.import_stream(chunked(ndjson(rows)), "ndjson")
+        return result
+
+    result = asyncio.run(main())
+    assert (result["imported"], result["rejected"]) == (60, 0)
+    assert {"Sales, EMEA", "Sales\nAPAC"} <= set(from_csv.departments)
+    assert from_csv.summary() == from_ndjson.summary()
+    for by in ("department", "account", "month"):
+        assert from_csv.rollup(by, "2025") == from_ndjson.rollup(by, "2025")
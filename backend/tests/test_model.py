@@ -0,0 +1,62 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from core.model import HttpBackend, ModelBackend
+
+
+def backend_answering(handler, retries=0):
+    backend = HttpBackend("http://model", retries=retries, backoff=0)
+    backend._client = httpx.AsyncClient(base_url="http://model", transport=httpx.MockTransport(handler))
+    return backend
+
+
+async def streamed(backend):
+    return [token async for token in backend.stream("agent", "prompt")]
+
+
+def test_backend_interface_is_abstract():
+    with pytest.raises(TypeError):
+        ModelBackend()
+
+
+def test_completion():
+    backend = backend_answering(lambda request: httpx.Response(200, json={"text": "hi", "model": "m"}))
+    completion = asyncio.run(backend.complete("agent", "prompt"))
+    assert (completion.text, completion.model, completion.attempts) == ("hi", "m", 1)
+
+
+def test_throttled_calls_are_retried():
+    answers = iter([httpx.Response(429, headers={"Retry-After": "0"}), httpx.Response(200, json={"text": "hi"})])
+    backend = backend_answering(lambda request: next(answers), retries=1)
+    assert asyncio.run(backend.complete("agent", "prompt")).attempts == 2
+    assert backend.retries == 1
+
+
+@pytest.mark.parametrize("answer", [
+    httpx.Response(200, text="<html>gateway</html>"),
+    httpx.Response(200, json=["not", "an", "object"]),
+    httpx.Response(500),
+])
+def test_bad_answers_are_upstream_errors(answer):
+    backend = backend_answering(lambda request: answer)
+    with pytest.raises(HTTPException) as failed:
+        asyncio.run(backend.complete("agent", "prompt"))
+    assert failed.value.status_code == 502
+    assert backend.failures == 1
+
+
+def test_malformed_stream_event_is_an_upstream_error():
+    body = b'data: {"token": "a"}\n\ndata: not json\n\n'
+    backend = backend_answering(lambda request: httpx.Response(200, content=body))
+    with pytest.raises(HTTPException) as failed:
+        asyncio.run(streamed(backend))
+    assert failed.value.status_code == 502
+
+
+def test_stream():
+    body = b'data: {"token": "a"}\n\ndata: {"token": "b"}\n\ndata: [DONE]\n\n'
+    backend = backend_answering(lambda request: httpx.Response(200, content=body))
+    assert asyncio.run(streamed(backend)) == ["a", "b"]
@@ -0,0 +1,29 @@
+import pytest
+
+from core.profiling import _flagged
+from core.tokens import issue_token
+from models import MOCK_USERS
+
+
+@pytest.mark.parametrize("query,headers,flagged", [
+    (b"profile=1", [], True),
+    (b"limit=5&profile=true", [], True),
+    (b"", [(b"x-profile", b"1")], True),
+    (b"noprofile=1", [], False),
+    (b"xprofile=10", [], False),
+    (b"profile=10", [], False),
+    (b"profile=0", [(b"x-profile", b"0")], False),
+])
+def test_flagged_matches_the_profile_parameter_exactly(query, headers, flagged):
+    assert _flagged({"query_string": query, "headers": headers}) is flagged
+
+
+def test_only_admins_are_profiled(client, admin_headers):
+    response = client.get("/api/auth/me", params={"profile": 1}, headers=admin_headers)
+    assert response.status_code == 200
+    assert response.headers.get("X-Profile-Id")
+
+    staff = next(user for user in MOCK_USERS if user.role == "hr_staff")
+    response = client.get("/api/auth/me", params={"profile": 1}, headers={"Authorization": f"Bearer {issue_token(staff)}"})
+    assert response.status_code == 200
+    assert "X-Profile-Id" not in response.headers
@@ -0,0 +1,44 @@
+"""Every agent reply, on every response path, is a valid ``AgentResponse``"""
+import re
+
+import pytest
+
+from core import responses
+from core.catalog import catalog
+from core.responses import ResponseCache
+from models import AgentResponse
+
+
+def cases():
+    """One request per intent of every catalog agent, plus one matching none"""
+    return [
+        pytest.param(department.prefix + agent.path, message, id=f"{agent.id}:{message}")
+        for department in catalog.loaded() for agent in department.agents
+        for message in [keywords[0] for _, keywords in agent.intents] + ["hello"]
+    ]
+
+
+def normalized(reply):
+    """Reply without the fields that legitimately differ between two calls"""
+    dumped = AgentResponse.model_validate(reply).model_dump(mode="json", exclude={"timestamp"})
+    return re.sub(r"\d", "0", responses.dumps(dumped).decode())
+
+
+def post(client, headers, path, message):
+    response = client.post(path, json={"message": message}, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+@pytest.mark.parametrize("path,message", cases())
+def test_reply_matches_model(client, admin_headers, monkeypatch, path, message):
+    monkeypatch.setattr(responses, "FAST_RESPONSES", False)
+    monkeypatch.setattr(responses, "cache", ResponseCache(maxsize=0))
+    expected = normalized(post(client, admin_headers, path, message))
+
+    # The fast path skips response_model validation, so it is checked here instead
+    monkeypatch.setattr(responses, "FAST_RESPONSES", True)
+    assert normalized(post(client, admin_headers, path, message)) == expected
+    monkeypatch.setattr(responses, "cache", ResponseCache(maxsize=256))
+    for _ in range(2):  # template miss, then hit
+        assert normalized(post(client, admin_headers, path, message)) == expected
@@ -0,0 +1,57 @@
+import asyncio
+import json
+import shutil
+from pathlib import Path
+
+from core.rfps import FIT_WEIGHT, RfpIndex
+
+CORPUS = Path(__file__).resolve().parent.parent / "data" / "rfps.ndjson"
+
+PROFILE = "Cloud migration, AWS and Azure, data analytics, AI/ML, custom software development and managed services"
+
+
+def index_at(tmp_path, source):
+    index = RfpIndex(source, tmp_path / "index", dimensions=512, refresh=0)
+    index.set_profile(PROFILE)
+    return index
+
+
+def test_match_percent_follows_the_ranking(tmp_path):
+    async def main():
+        index = index_at(tmp_path, CORPUS)
+        for query in ("cloud migration", "healthcare data analytics", "find new RFPs"):
+            matches, found = await index.match(query)
+            assert found >= len(matches) > 0
+            scores = [match.relevance + FIT_WEIGHT * match.fit for match in matches]
+            assert scores == sorted(scores, reverse=True)
+            percents = [match.match for match in matches]
+            assert percents[0] == 100
+            assert percents == sorted(percents, reverse=True)
+
+    asyncio.run(main())
+
+
+def test_sync_embeds_only_new_and_changed_rfps(tmp_path):
+    source = tmp_path / "rfps.ndjson"
+    shutil.copy(CORPUS, source)
+    rfps = [json.loads(line) for line in CORPUS.read_text().splitlines() if line.strip()]
+
+    async def main():
+        index = index_at(tmp_path, source)
+        assert (await index.sync())["embedded"] == len(rfps)
+
+        changed = {**rfps[0], "description": "Quantum networking research for satellite ground stations."}
+        added = {**rfps[1], "id": "NEW-1", "title": "Satellite ground station upgrade"}
+        with open(source, "a") as f:
+            f.write(json.dumps(changed) + "\n" + json.dumps(added) + "\n")
+        stats = await index.sync()
+        assert (stats["embedded"], stats["rfps"], stats["rows"]) == (2, len(rfps) + 1, len(rfps) + 2)
+
+        assert (await index.sync(force=True))["embedded"] == 0
+
+        # Matching sees the new RFP and the changed one's new content, once each
+        matches, _ = await index.match("quantum satellite ground station")
+        assert sorted(match.rfp["id"] for match in matches[:2]) == sorted([rfps[0]["id"], "NEW-1"])
+        assert len({match.rfp["id"] for match in matches}) == len(matches)
+
+    asyncio.run(main())
@@ -0,0 +1,99 @@
+import asyncio
+import os
+
+import numpy as np
+
+from core.search import IndexReader, SearchIndex, build, split_passages
+
+ARRAYS = ("postings", "ids", "tfs", "doclen", "norm", "passage_file", "text_offsets")
+
+GUIDES = {
+    "onboarding.md": "# Onboarding\n\nNew hires get a laptop on day one.\n\n## Accounts\n\nRequest VPN access from IT.",
+    "leave.md": "# Leave policy\n\nEmployees accrue two days of leave per month.",
+    "teams/cloud.md": "# Cloud\n\nWe migrate workloads to AWS and Azure.\n\n## Security\n\nAll laptops use disk encryption.",
+}
+
+
+def write(corpus, files):
+    for name, text in files.items():
+        path = corpus / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+
+
+def assert_same_index(left, right):
+    assert [entry[0] for entry in left.files] == [entry[0] for entry in right.files]
+    assert [entry[3:] for entry in left.files] == [entry[3:] for entry in right.files]
+    assert (left.passages, left.avgdl) == (right.passages, right.avgdl)
+    assert left.terms.decode() == right.terms.decode()
+    for name in ARRAYS:
+        np.testing.assert_array_equal(getattr(left, name), getattr(right, name), err_msg=name)
+    assert [left.text(passage) for passage in range(left.passages)] == [right.text(passage) for passage in range(right.passages)]
+
+
+def test_split_passages_keeps_headings():
+    assert split_passages("# Title\n\nIntro.\n\n## Part\n\nBody.") == [("Title", "Intro."), ("Part", "Body.")]
+
+
+def test_incremental_build_equals_full_rebuild(tmp_path):
+    corpus = tmp_path / "corpus"
+    write(corpus, GUIDES)
+    first, stats = build(corpus, "**/*.md", tmp_path / "incremental")
+    assert stats["reindexed"] == 3
+
+    # Change one file, add one and remove one, then build on top of the first generation
+    write(corpus, {"leave.md": "# Leave policy\n\nEmployees accrue three days of leave per month. Laptops too.",
+                   "benefits.md": "# Benefits\n\nHealth insurance covers the whole family."})
+    os.utime(corpus / "leave.md", ns=(1, 1))
+    (corpus / "onboarding.md").unlink()
+    incremental, stats = build(corpus, "**/*.md", tmp_path / "incremental", IndexReader(first))
+    assert (stats["reused"], stats["reindexed"], stats["removed"]) == (1, 2, 1)
+
+    full, _ = build(corpus, "**/*.md", tmp_path / "full")
+    assert_same_index(IndexReader(incremental), IndexReader(full))
+
+
+def test_unchanged_corpus_writes_no_generation(tmp_path):
+    corpus = tmp_path / "corpus"
+    write(corpus, GUIDES)
+    first, _ = build(corpus, "**/*.md", tmp_path / "index")
+    generation, stats = build(corpus, "**/*.md", tmp_path / "index", IndexReader(first))
+    assert generation is None
+    assert stats["reused"] == 3
+
+
+def test_search_ranks_matching_passages(tmp_path):
+    corpus = tmp_path / "corpus"
+    write(corpus, GUIDES)
+    index = SearchIndex(corpus, tmp_path / "index", refresh=0)
+
+    async def main():
+        try:
+            return await index.search("laptop disk encryption", k=2)
+        finally:
+            await index.stop()
+
+    hits = asyncio.run(main())
+    assert [(hit.file, hit.heading) for hit in hits] == [("teams/cloud.md", "Security"), ("onboarding.md", "Onboarding")]
+
+
+def test_concurrent_first_searches_start_one_refresher(tmp_path):
+    corpus = tmp_path / "corpus"
+    write(corpus, GUIDES)
+    index = SearchIndex(corpus, tmp_path / "index", refresh=60)
+
+    async def main():
+        try:
+            await asyncio.gather(*(index.search("leave") for _ in range(5)))
+            refreshers = [task for task in asyncio.all_tasks() if task.get_coro().__name__ == "_refresh"]
+            assert refreshers == [index._refresher]
+            # A finished refresher is replaced the next time the index is opened
+            await index.stop()
+            index._refresher = refreshers[0]
+            index._reader = None
+            await index.ensure()
+            assert index._refresher is not refreshers[0] and not index._refresher.done()
+        finally:
+            await index.stop()
+
+    asyncio.run(main())
@@ -0,0 +1,27 @@
+import pytest
+
+from core.tokens import InvalidToken, issue_token, verify_token
+from models import MOCK_USERS
+
+USER = MOCK_USERS[0]
+
+
+def test_issued_token_verifies():
+    claims = verify_token(issue_token(USER))
+    assert (claims.user_id, claims.role) == (USER.id, USER.role)
+
+
+@pytest.mark.parametrize("tamper", [
+    lambda token: token[:-2] + ("AA" if token[-2:] != "AA" else "BB"),
+    lambda token: token[:-1] + "é",
+    lambda token: token.rsplit(".", 1)[0],
+])
+def test_tampered_token_is_invalid(tamper):
+    with pytest.raises(InvalidToken):
+        verify_token(tamper(issue_token(USER)))
+
+
+def test_non_ascii_bearer_token_is_unauthorized(client):
+    token = issue_token(USER)[:-1] + "ÿ"
+    response = client.get("/api/auth/me", headers={"Authorization": f"Bearer {token}".encode("latin-1")})
+    assert response.status_code == 401
@@ -0,0 +1,85 @@
+import asyncio
+import csv
+import io
+import json
+
+import pytest
+
+from core import uploads
+
+ROWS = [
+    ["id", "name", "notes"],
+    ["1", "Plain", "no quotes"],
+    ["2", "Multi-line", "first line\nsecond line\n\nafter a blank line"],
+    ["3", "Quoted, comma", 'says "hi", then\nleaves'],
+    ["4", 'Inch " mark', "5\" screen"],
+    ["5", "", "last"],
+    ["6", '"Quoted"', 'crlf\r\ninside ""'],
+]
+
+
+def csv_body(rows):
+    out = io.StringIO()
+    csv.writer(out, lineterminator="\r\n").writerows(rows)
+    return out.getvalue().encode()
+
+
+async def chunked(body, size):
+    for start in range(0, len(body), size):
+        yield body[start:start + size]
+
+
+def parse(body, kind="csv", chunk=7, size=2):
+    async def main():
+        return [batch async for batch in uploads.batches(chunked(body, chunk), kind, size)]
+
+    found = asyncio.run(main())
+    return [record for records, _ in found for record in records], sum(rejected for _, rejected in found)
+
+
+def expected(rows):
+    return [dict(zip(rows[0], row)) for row in rows[1:]]
+
+
+@pytest.mark.parametrize("chunk", [1, 2, 5, 16, 1000])
+def test_quoted_fields_with_newlines_survive_any_chunking(chunk):
+    assert parse(csv_body(ROWS), chunk=chunk) == (expected(ROWS), 0)
+
+
+def test_a_body_split_at_every_offset_parses_the_same():
+    body = csv_body(ROWS)
+    for cut in range(1, len(body)):
+        async def main():
+            async def two():
+                yield body[:cut]
+                yield body[cut:]
+            return [batch async for batch in uploads.batches(two(), "csv", 10)]
+
+        assert asyncio.run(main()) == [(expected(ROWS), 0)], cut
+
+
+def test_bad_rows_and_an_unclosed_quote_are_rejected():
+    body = b'id,name\n1,one\n2,two,extra\n\n3,three\n4,"never closed\n5,five\n'
+    assert parse(body) == ([{"id": "1", "name": "one"}, {"id": "3", "name": "three"}], 2)
+
+
+def test_batches_are_yielded_as_records_arrive():
+    async def main():
+        body = csv_body([["n"], *([str(number)] for number in range(10))])
+        return [len(records) async for records, _ in uploads.batches(chunked(body, 4), "csv", 3)]
+
+    sizes = asyncio.run(main())
+    assert sum(sizes) == 10 and all(size >= 3 for size in sizes[:-1])
+
+
+def test_long_lines_arriving_in_many_chunks():
+    rows = [["id", "text"], ["1", "x" * 100_000], ["2", "y"]]
+    assert parse(csv_body(rows), chunk=64) == (expected(rows), 0)
+    # Fields over the csv module's size limit reject their row
+    oversized = [*rows, ["3", "z" * (csv.field_size_limit() + 1)], ["4", "w"]]
+    assert parse(csv_body(oversized), chunk=4096) == (expected(rows) + [{"id": "4", "text": "w"}], 1)
+
+
+def test_ndjson_lines_that_are_not_objects_are_rejected():
+    body = "".join(json.dumps(line) + "\n" for line in ({"a": 1}, [1], "text", {"a": "x\ny"})).encode()
+    assert parse(body + b"not json\n\n", kind="ndjson", chunk=3) == ([{"a": 1}, {"a": "x\ny"}], 3)
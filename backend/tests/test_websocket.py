@@ -0,0 +1,110 @@
+import asyncio
+import json
+import time
+
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+from core import model
+from core.tokens import issue_token
+from models import MOCK_USERS
+from routers import agents as agents_router
+
+AGENT = "hr-onboarding"
+
+
+class HeldBackend(model.ModelBackend):
+    """Holds model calls whose prompt starts with ``hold`` until released"""
+    name = "held"
+
+    def __init__(self):
+        super().__init__()
+        self.release = asyncio.Event()
+
+    async def complete(self, agent, prompt, history=()):
+        self.calls += 1
+        if prompt.startswith("hold"):
+            await self.release.wait()
+        return model.Completion(text="", model=self.name, seconds=0.0)
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    held = HeldBackend()
+    monkeypatch.setattr(model, "backend", held)
+    return held
+
+
+@pytest.fixture
+def token():
+    return issue_token(next(user for user in MOCK_USERS if user.role == "admin"))
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+@pytest.mark.parametrize("query", ["", "?token=not-a-token"])
+def test_unauthenticated_socket_is_closed_with_1008(client, query):
+    with pytest.raises(WebSocketDisconnect) as closed:
+        with client.websocket_connect(f"/api/agents/ws{query}"):
+            pass
+    assert closed.value.code == 1008
+
+
+def test_replies_arrive_as_each_frame_completes(client, backend, token):
+    with client.websocket_connect(f"/api/agents/ws?token={token}") as socket:
+        socket.send_json({"id": "slow", "agent": AGENT, "message": "hold on"})
+        wait_until(lambda: backend.calls == 1)
+        socket.send_json({"id": "fast", "agent": AGENT, "message": "quick one"})
+        first = socket.receive_json()
+        client.portal.call(backend.release.set)
+        second = socket.receive_json()
+    assert [first["id"], second["id"]] == ["fast", "slow"]
+    assert first["ok"] and second["ok"] and second["agent"] == AGENT
+    assert second["response"]["success"] is True
+
+
+def test_bad_frames_get_400_and_the_socket_stays_open(client, backend, token):
+    with client.websocket_connect(f"/api/agents/ws?token={token}") as socket:
+        # Binary frames are rejected even when they hold valid JSON
+        for frame in ("not json", "[1, 2]", b'{"id": "b", "agent": "hr-onboarding", "message": "hi"}'):
+            if isinstance(frame, bytes):
+                socket.send_bytes(frame)
+            else:
+                socket.send_text(frame)
+            reply = socket.receive_json()
+            assert reply["id"] is None and reply["ok"] is False
+            assert reply["error"]["status"] == 400
+
+        socket.send_json({"id": "unknown", "agent": "no-such-agent", "message": "hi"})
+        assert socket.receive_json()["error"]["status"] == 404
+        socket.send_json({"id": "empty", "agent": AGENT, "message": ""})
+        assert socket.receive_json()["error"]["status"] == 422
+        socket.send_json({"id": "ok", "agent": AGENT, "message": "hi"})
+        assert socket.receive_json()["ok"] is True
+
+
+def test_agents_outside_the_role_are_forbidden(client, backend):
+    hr = next(user for user in MOCK_USERS if user.role == "hr_staff")
+    with client.websocket_connect(f"/api/agents/ws?token={issue_token(hr)}") as socket:
+        socket.send_json({"id": "s", "agent": "sales-deck", "message": "hi"})
+        assert socket.receive_json()["error"]["status"] == 403
+
+
+def test_reading_pauses_while_the_socket_is_at_its_in_flight_limit(client, backend, token, monkeypatch):
+    monkeypatch.setattr(agents_router, "MAX_IN_FLIGHT", 2)
+    with client.websocket_connect(f"/api/agents/ws?token={token}") as socket:
+        for number in range(3):
+            socket.send_text(json.dumps({"id": str(number), "agent": AGENT, "message": f"hold {number}"}))
+        wait_until(lambda: backend.calls == 2)
+        time.sleep(0.1)
+        # The third frame is not read until one of the first two completes
+        assert backend.calls == 2
+        client.portal.call(backend.release.set)
+        replies = sorted(socket.receive_json()["id"] for _ in range(3))
+    assert replies == ["0", "1", "2"]
+    assert backend.calls == 3
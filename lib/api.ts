@@ -1,3 +1,5 @@
+import type { AgentStreamEvent } from '@/types';
+
 // API Configuration for External Backend
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:4000';
 
@@ -18,7 +20,7 @@ export async function apiFetch<T>(
 
   // Add auth token if available
   if (typeof window !== 'undefined') {
-    const token = localStorage.getItem('auth_token');
+    const token = localStorage.getItem('itt-token');
     if (token) {
       (defaultHeaders as Record<string, string>)['Authorization'] = `Bearer ${token}`;
     }
@@ -76,12 +78,131 @@ export const agentApi = {
       body: JSON.stringify({ message }),
     });
   },
+  // Run many prompts concurrently; results come back in request order
+  sendBatch: async (items: { agent: string; message: string }[], concurrency?: number) => {
+    return apiFetch<{
+      success: boolean;
+      results: {
+        agent: string;
+        ok: boolean;
+        response?: { success: boolean; message: string; data?: Record<string, unknown>; status: string; timestamp: string };
+        error?: { status: number; detail: string };
+      }[];
+    }>('/api/agents/batch', {
+      method: 'POST',
+      body: JSON.stringify({ items, concurrency }),
+    });
+  },
 };
 
+// Streaming Agent API (Server-Sent Events over POST)
+export const agentStreamApi = {
+  streamMessage: async (
+    endpoint: string,
+    message: string,
+    onEvent: (event: AgentStreamEvent) => void
+  ) => {
+    const token = typeof window !== 'undefined' ? localStorage.getItem('itt-token') : null;
+    const response = await fetch(`${API_BASE_URL}${endpoint}/stream`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+        ...(token ? { Authorization: `Bearer ${token}` } : {}),
+      },
+      body: JSON.stringify({ message }),
+    });
+
+    if (!response.ok || !response.body) {
+      throw new Error('Request failed');
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      // Events are separated by a blank line; keep any partial event buffered
+      const events = buffer.split('\n\n');
+      buffer = events.pop() ?? '';
+      for (const raw of events) {
+        const data = raw.split('\n').find((line) => line.startsWith('data: '));
+        if (data) {
+          onEvent(JSON.parse(data.slice(6)) as AgentStreamEvent);
+        }
+      }
+    }
+  },
+};
+
+// Multiplexed Agent WebSocket: one connection for every agent conversation
+type AgentReply = {
+  success: boolean;
+  message: string;
+  data?: Record<string, unknown>;
+  status: string;
+  timestamp: string;
+};
+
+export class AgentSocket {
+  private socket: WebSocket;
+  private ready: Promise<void>;
+  private nextId = 0;
+  private pending = new Map<string, { resolve: (reply: AgentReply) => void; reject: (error: Error) => void }>();
+
+  constructor(token: string) {
+    const wsBase = API_BASE_URL.replace(/^http/, 'ws');
+    this.socket = new WebSocket(`${wsBase}/api/agents/ws?token=${encodeURIComponent(token)}`);
+    this.ready = new Promise((resolve, reject) => {
+      this.socket.onopen = () => resolve();
+      this.socket.onerror = () => reject(new Error('WebSocket connection failed'));
+    });
+    this.socket.onmessage = (event) => {
+      const frame = JSON.parse(event.data);
+      const entry = this.pending.get(frame.id);
+      if (!entry) return;
+      this.pending.delete(frame.id);
+      if (frame.ok) {
+        entry.resolve(frame.response as AgentReply);
+      } else {
+        entry.reject(new Error(frame.error?.detail || 'Request failed'));
+      }
+    };
+    this.socket.onclose = () => {
+      this.pending.forEach(({ reject }) => reject(new Error('WebSocket closed')));
+      this.pending.clear();
+    };
+  }
+
+  // `agent` is an agent id (e.g. 'sales-deck') or its endpoint path
+  async send(agent: string, message: string): Promise<AgentReply> {
+    await this.ready;
+    const id = String(++this.nextId);
+    return new Promise((resolve, reject) => {
+      this.pending.set(id, { resolve, reject });
+      this.socket.send(JSON.stringify({ id, agent, message }));
+    });
+  }
+
+  close() {
+    this.socket.close();
+  }
+}
+
 // Employees API
 export const employeesApi = {
-  getAll: async () => {
-    return apiFetch<{ success: boolean; data: unknown[] }>('/api/employees');
+  getAll: async (params: { department?: string; role?: string; fields?: string; limit?: number; cursor?: string } = {}) => {
+    const query = new URLSearchParams(
+      Object.entries(params)
+        .filter(([, value]) => value !== undefined)
+        .map(([key, value]) => [key, String(value)])
+    ).toString();
+    return apiFetch<{ success: boolean; data: unknown[]; nextCursor: string | null }>(
+      `/api/employees/${query ? `?${query}` : ''}`
+    );
   },
   getById: async (id: string) => {
     return apiFetch<{ success: boolean; data: unknown }>(`/api/employees/${id}`);